@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器缓存基准
+对比临时配置（每次冷启动）与持久化配置目录（热缓存）下的页面加载：
+每轮都重新启动浏览器以模拟独立的运行，统计文章正文出现耗时、网络传输字节数与命中缓存的资源数。
+需要本机安装 Chrome 并能访问目标页面。
+
+使用方法：
+    python benchmarks/bench_browser_cache.py <URL> [URL ...] [--rounds N] [--cache-size MB]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper.scraper import JuejinScraper  # noqa: E402
+from selenium.webdriver.common.by import By  # noqa: E402
+from selenium.webdriver.support import expected_conditions as EC  # noqa: E402
+from selenium.webdriver.support.ui import WebDriverWait  # noqa: E402
+
+
+RESOURCE_STATS_JS = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let transferred = 0, cached = 0;
+for (const e of entries) {
+    transferred += e.transferSize || 0;
+    if (e.transferSize === 0 && e.decodedBodySize > 0) cached += 1;
+}
+return [transferred, cached, entries.length];
+"""
+
+
+def load_once(scraper: JuejinScraper, url: str):
+    """启动浏览器加载一次页面，返回 (正文出现耗时, 传输字节数, 缓存命中数, 资源数)"""
+    driver = scraper.setup_driver()
+    try:
+        start = time.perf_counter()
+        driver.get(url)
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.ID, "article-root")))
+        elapsed = time.perf_counter() - start
+        transferred, cached, total = driver.execute_script(RESOURCE_STATS_JS)
+        return elapsed, transferred, cached, total
+    finally:
+        driver.quit()
+        scraper.close()
+
+
+def run(scraper: JuejinScraper, urls, rounds: int):
+    timings, transferred, cached, total = [], 0, 0, 0
+    for _ in range(rounds):
+        for url in urls:
+            t, b, c, n = load_once(scraper, url)
+            timings.append(t)
+            transferred += b
+            cached += c
+            total += n
+    return statistics.median(timings), transferred / len(timings), cached, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器缓存基准")
+    parser.add_argument('urls', nargs='+', metavar='URL', help="文章URL")
+    parser.add_argument('--rounds', type=int, default=3, help="每个 URL 的加载轮数")
+    parser.add_argument('--cache-size', type=int, default=256, metavar='MB', help="持久化配置的缓存预算")
+    args = parser.parse_args()
+
+    profile_root = tempfile.mkdtemp(prefix="juejin_profile_bench_")
+    try:
+        cold = JuejinScraper(headless=True)
+        warm = JuejinScraper(headless=True, browser_profile=profile_root, cache_size_mb=args.cache_size)
+        # 预热：先用持久化配置完整加载一遍
+        for url in args.urls:
+            load_once(warm, url)
+
+        print(f"{'配置':<10}{'正文出现(ms)':>14}{'平均传输(KB)':>14}{'缓存命中/资源数':>18}")
+        for name, scraper in (("临时配置", cold), ("持久化配置", warm)):
+            median, avg_bytes, cached, total = run(scraper, args.urls, args.rounds)
+            print(f"{name:<10}{median * 1000:>14.0f}{avg_bytes / 1024:>14.0f}{f'{cached}/{total}':>18}")
+    finally:
+        shutil.rmtree(profile_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式导出基准
+生成合成的文章/评论数据，分别以 Parquet 与 NumPy 格式导出，统计写入耗时、文件大小与
+summary 聚合（点赞分布 + 活跃评论者 + 热门文章）耗时，并与逐行扫描 Markdown 统计评论者的方式对比。
+
+使用方法：
+    python benchmarks/bench_columnar.py [--articles N] [--comments N]
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper import columnar_export  # noqa: E402
+from juejin_scraper.columnar_export import ColumnarExporter, summarize  # noqa: E402
+from juejin_scraper.render import ArticleRenderer  # noqa: E402
+
+
+def synthetic_articles(n_articles: int, n_comments: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n_articles):
+        yield {
+            'title': f"合成文章 {i}", 'url': f"https://juejin.cn/post/{7000000000000000000 + i}",
+            'author_name': f"作者{rng.randrange(500)}", 'author_link': '', 'content': "正文",
+            'likes': int(rng.paretovariate(1.2)), 'comments': n_comments, 'collects': rng.randrange(100),
+            'publish_time': "2025-01-01", 'read_time': "5分钟", 'column': "无",
+            'comments_data': [
+                {
+                    'author': f"用户{int(rng.paretovariate(0.8)) % 20000}", 'content': "评论内容", 'time': "1天前",
+                    'likes': int(rng.paretovariate(1.5)) - 1, 'replies': 2,
+                    'sub_replies': [
+                        {'author': f"用户{rng.randrange(20000)}", 'content': "回复", 'time': "1天前",
+                         'likes': rng.randrange(5)}
+                        for _ in range(2)
+                    ],
+                }
+                for _ in range(n_comments)
+            ],
+        }
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def markdown_baseline(articles) -> float:
+    """渲染为 Markdown 后逐行用正则统计评论者（导出前的分析方式）"""
+    renderer = ArticleRenderer(max_comments=10 ** 9)
+    documents = [renderer.generate_markdown(article) for article in articles]
+    start = time.perf_counter()
+    authors = Counter()
+    pattern = re.compile(r'^### (\S+) 👍 (\d+)', re.MULTILINE)
+    for document in documents:
+        for author, _ in pattern.findall(document):
+            authors[author] += 1
+    authors.most_common(10)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列式导出基准")
+    parser.add_argument('--articles', type=int, default=5000, help="文章数")
+    parser.add_argument('--comments', type=int, default=50, help="每篇文章的评论数（每条评论 2 条回复）")
+    args = parser.parse_args()
+
+    articles = list(synthetic_articles(args.articles, args.comments))
+    rows = args.articles * args.comments * 3
+    print(f"合成数据：{args.articles} 篇文章，{rows} 行评论与回复")
+
+    formats = [fmt for fmt, available in (('parquet', columnar_export.pa is not None),
+                                          ('npz', columnar_export.np is not None)) if available]
+    print(f"{'格式':<10}{'写入(s)':>10}{'大小(MB)':>10}{'summary(s)':>12}")
+    for fmt in formats:
+        root = tempfile.mkdtemp(prefix=f"juejin_columnar_{fmt}_")
+        try:
+            start = time.perf_counter()
+            with ColumnarExporter(root, batch_size=500, fmt=fmt) as exporter:
+                for article in articles:
+                    exporter.add(article)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            summarize(root)
+            summary_time = time.perf_counter() - start
+            print(f"{fmt:<10}{write_time:>10.2f}{directory_size(root) / 1024 / 1024:>10.1f}{summary_time:>12.3f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"Markdown 逐行统计评论者：{markdown_baseline(articles):.3f}s（不含读取文件）")
+
+
+if __name__ == "__main__":
+    main()
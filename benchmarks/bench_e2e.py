@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端吞吐基准
+在本机启动掘金页面模拟服务（juejin_scraper.fixture_server），用无头 Chrome 驱动 JuejinScraper 完整抓取，
+统计每种并发设置下的吞吐（篇/分钟）、单篇耗时分位数与各阶段耗时分位数：
+启动浏览器、页面加载、正文解析、作者/统计/元数据提取、评论加载、评论提取、写文件。
+页面加载 = 单篇总耗时减去其余各阶段（driver.get 与等待 #article-root）。
+--tabs 大于1时每个浏览器用多个标签页并发（juejin_scraper.tab_pool），并发 = 浏览器数 × 标签页数；
+Linux 下同时采样本进程全部子进程（chromedriver 与 Chrome）的内存峰值，换算为每篇进行中文章的内存。
+需要本机安装 Chrome；不访问 juejin.cn。
+
+使用方法：
+    python benchmarks/bench_e2e.py [--articles N] [--workers 1 2 4] [--tabs 1 4] [--comments N] [--page-size N]
+        [--replies N] [--latency MS] [--api-latency MS] [--error-rate R] [--serial-replies] [--fresh-browser]
+        [--browser-profile DIR] [--json PATH]
+    python benchmarks/bench_e2e.py --base-url http://127.0.0.1:8765 ...   # 使用已启动的模拟服务
+"""
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper.fixture_server import FaultInjector, FixtureServer, FixtureSite  # noqa: E402
+from juejin_scraper.scraper import JuejinScraper  # noqa: E402
+from juejin_scraper.tab_pool import TabScheduler  # noqa: E402
+
+
+# (方法名, 阶段名)；方法在实例上被包装计时
+STAGES = [
+    ('get_driver', "启动浏览器"),
+    ('parse_article', "正文解析"),
+    ('extract_author_info', "作者"),
+    ('extract_article_stats', "统计"),
+    ('extract_additional_metadata', "元数据"),
+    ('load_comments', "评论加载"),
+    ('extract_comments', "评论提取"),
+    ('write_article', "写文件"),
+]
+PAGE_LOAD = "页面加载"
+TOTAL = "单篇总计"
+
+
+def instrument(scraper: JuejinScraper) -> Dict[str, float]:
+    """包装各阶段方法，本篇文章的阶段耗时累加到返回的字典中"""
+    current: Dict[str, float] = defaultdict(float)
+
+    def wrap(name: str, stage: str):
+        method = getattr(scraper, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current[stage] += time.perf_counter() - start
+
+        setattr(scraper, name, timed)
+
+    for name, stage in STAGES:
+        wrap(name, stage)
+    return current
+
+
+def children_rss_mb() -> float:
+    """本进程全部子孙进程的常驻内存之和（MB，读取 /proc，非 Linux 返回 0）"""
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    try:
+        pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return 0.0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        parents[pid] = int(fields[1])
+        rss[pid] = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+    descendants, frontier = set(), {os.getpid()}
+    while frontier:
+        frontier = {pid for pid, ppid in parents.items() if ppid in frontier} - descendants
+        descendants |= frontier
+    return sum(rss[pid] for pid in descendants) / 1024 / 1024
+
+
+class MemorySampler(threading.Thread):
+    """后台采样子进程内存峰值"""
+
+    def __init__(self, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0.0
+        self.done = threading.Event()
+
+    def run(self) -> None:
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, children_rss_mb())
+
+
+def worker(urls: "queue.Queue[str]", options: Dict, timings: Dict[str, List[float]], results: Dict[str, int],
+           scraper: JuejinScraper = None) -> None:
+    scraper = scraper or JuejinScraper(**options)
+    current = instrument(scraper)
+    try:
+        while True:
+            try:
+                url = urls.get_nowait()
+            except queue.Empty:
+                return
+            current.clear()
+            start = time.perf_counter()
+            path = scraper.save_article(url)
+            total = time.perf_counter() - start
+            results['ok' if path else 'failed'] += 1
+            if not path:
+                continue
+            timings[TOTAL].append(total)
+            timings[PAGE_LOAD].append(max(0.0, total - sum(current.values())))
+            for _, stage in STAGES:
+                timings[stage].append(current.get(stage, 0.0))
+    finally:
+        scraper.finish()
+
+
+def run(urls: List[str], workers: int, options: Dict, tabs: int = 1) -> Dict:
+    """按指定并发（浏览器数 × 标签页数）抓取全部文章，返回吞吐、各阶段耗时与内存峰值"""
+    pending: "queue.Queue[str]" = queue.Queue()
+    for url in urls:
+        pending.put(url)
+    per_worker = [(defaultdict(list), defaultdict(int)) for _ in range(workers * tabs)]
+    sampler = MemorySampler()
+    sampler.start()
+
+    start = time.perf_counter()
+    if tabs > 1:
+        scheduler = TabScheduler(browsers=workers, tabs=tabs, **options)
+        slots = iter(per_worker)
+
+        def target(scraper):
+            t, r = next(slots)
+            worker(pending, options, t, r, scraper=scraper)
+
+        scheduler.run(target)
+    else:
+        threads = [threading.Thread(target=worker, args=(pending, options, t, r)) for t, r in per_worker]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+    sampler.done.set()
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    results: Dict[str, int] = defaultdict(int)
+    for t, r in per_worker:
+        for stage, values in t.items():
+            timings[stage].extend(values)
+        for key, count in r.items():
+            results[key] += count
+
+    stages = {}
+    for stage in [TOTAL, PAGE_LOAD] + [s for _, s in STAGES]:
+        values = sorted(timings.get(stage, []))
+        if values:
+            stages[stage] = {
+                'p50_ms': round(statistics.median(values) * 1000, 1),
+                'p95_ms': round(values[min(len(values) - 1, int(0.95 * len(values)))] * 1000, 1),
+            }
+    return {
+        'workers': workers,
+        'tabs': tabs,
+        'peak_rss_mb': round(sampler.peak, 1),
+        'rss_per_slot_mb': round(sampler.peak / (workers * tabs), 1),
+        'elapsed_s': round(elapsed, 2),
+        'ok': results['ok'],
+        'failed': results['failed'],
+        'articles_per_min': round(results['ok'] / elapsed * 60, 1) if elapsed else 0.0,
+        'stages': stages,
+    }
+
+
+def print_result(result: Dict) -> None:
+    print(f"\n⚙️ {result['workers']} 个浏览器 × {result['tabs']} 个标签页：成功 {result['ok']} 篇，"
+          f"失败 {result['failed']} 篇，耗时 {result['elapsed_s']}s，吞吐 {result['articles_per_min']} 篇/分钟")
+    if result['peak_rss_mb']:
+        print(f"🧠 浏览器内存峰值 {result['peak_rss_mb']} MB，每篇进行中文章 {result['rss_per_slot_mb']} MB")
+    print(f"{'阶段':<10}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for stage, values in result['stages'].items():
+        print(f"{stage:<10}{values['p50_ms']:>10}{values['p95_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端吞吐基准")
+    parser.add_argument('--base-url', default=None, help="使用已启动的模拟服务，而不是在本进程内启动")
+    parser.add_argument('--articles', type=int, default=20, help="每种并发设置抓取的文章数")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="要对比的并发浏览器数")
+    parser.add_argument('--tabs', type=int, nargs='+', default=[1], help="要对比的每个浏览器标签页数")
+    parser.add_argument('--comments', type=int, default=30, help="每篇文章的评论数")
+    parser.add_argument('--page-size', type=int, default=10, help="每次加载的评论数")
+    parser.add_argument('--replies', type=int, default=3, help="每条评论的回复数")
+    parser.add_argument('--paragraphs', type=int, default=20, help="正文段落数")
+    parser.add_argument('--latency', type=float, default=50, metavar='MS', help="文章页响应延迟")
+    parser.add_argument('--api-latency', type=float, default=30, metavar='MS', help="评论/回复接口响应延迟")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="返回 500 的请求比例")
+    parser.add_argument('--max-comments', type=int, default=10, help="抓取的最大评论数量")
+    parser.add_argument('--serial-replies', action='store_true', help="逐条展开回复（默认批量展开）")
+    parser.add_argument('--fresh-browser', action='store_true', help="每篇文章重新启动浏览器（默认复用）")
+    parser.add_argument('--browser-profile', metavar='DIR', default=None, help="使用持久化配置目录")
+    parser.add_argument('--json', metavar='PATH', default=None, help="把结果写入 JSON 文件，便于对比")
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+        urls = [f"{base_url}/post/{pid}" for pid in FixtureSite.post_ids(args.articles)]
+    else:
+        site = FixtureSite(articles=args.articles, comments=args.comments, page_size=args.page_size,
+                           replies=args.replies, paragraphs=args.paragraphs)
+        faults = FaultInjector(latency_ms=args.latency, api_latency_ms=args.api_latency, error_rate=args.error_rate)
+        server = FixtureServer(site, faults).start()
+        urls = server.article_urls()
+        print(f"🚀 模拟服务：{server.base_url}")
+
+    output_dir = tempfile.mkdtemp(prefix="juejin_e2e_bench_")
+    results = []
+    try:
+        for workers, tabs in [(w, t) for w in args.workers for t in args.tabs]:
+            options = {
+                'headless': True,
+                'max_comments': args.max_comments,
+                'batch_replies': not args.serial_replies,
+                'keep_browser': not args.fresh_browser,
+                'browser_profile': args.browser_profile,
+                'output_dir': os.path.join(output_dir, f"workers-{workers}-tabs-{tabs}"),
+            }
+            before = server.stats() if server is not None else {}
+            result = run(urls, workers, options, tabs)
+            if server is not None:
+                # 本轮发往模拟服务的各类请求数与注入的错误数
+                result['server'] = {k: v - before.get(k, 0) for k, v in server.stats().items()}
+            results.append(result)
+        for result in results:
+            print_result(result)
+    finally:
+        if server is not None:
+            server.stop()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'options': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 结果已写入：{args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOM -> Markdown 转换基准
+对比两种流程在样例文章上的输出一致性、耗时与内存峰值（只计转换步骤，页面解析不计入）：
+- legacy：清理代码块 -> str(article_container) -> markdownify 重新解析
+- direct：清理代码块 -> 直接转换已解析的节点
+
+使用方法：
+    python benchmarks/bench_markdown.py [--repeat N] [--scale N]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper.dom_markdown import article_to_markdown, legacy_article_to_markdown  # noqa: E402
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(scale: int) -> dict:
+    """读取样例页面，并把所有文章正文重复 scale 次拼成一篇大文章"""
+    pages = {}
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "article_*.html"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        pages[os.path.basename(path)] = html
+        root = BeautifulSoup(html, 'html.parser').find(id='article-root')
+        bodies.append(root.decode_contents())
+    if scale > 0:
+        pages[f"synthetic_x{scale}"] = (
+            '<html><body><div id="article-root">' + "".join(bodies) * scale + '</div></body></html>'
+        )
+    return pages
+
+
+def parse(html: str):
+    return BeautifulSoup(html, 'html.parser').find(id='article-root')
+
+
+def measure(convert, html: str, repeat: int):
+    """返回 (输出, 中位耗时秒, 内存峰值字节)；转换会修改节点，每次先在计时外重新解析"""
+    timings = []
+    output = None
+    for _ in range(repeat):
+        root = parse(html)
+        start = time.perf_counter()
+        output = convert(root)
+        timings.append(time.perf_counter() - start)
+
+    root = parse(html)
+    tracemalloc.start()
+    convert(root)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return output, statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DOM -> Markdown 转换基准")
+    parser.add_argument('--repeat', type=int, default=5, help="每个样例的重复次数")
+    parser.add_argument('--scale', type=int, default=50, help="合成大文章的正文重复倍数，0 表示不生成")
+    args = parser.parse_args()
+
+    mismatches = 0
+    print(f"{'样例':<24}{'一致':<6}{'legacy(ms)':>12}{'direct(ms)':>12}{'提速':>8}"
+          f"{'legacy峰值(KB)':>16}{'direct峰值(KB)':>16}")
+    for name, html in load_fixtures(args.scale).items():
+        legacy_out, legacy_time, legacy_peak = measure(legacy_article_to_markdown, html, args.repeat)
+        direct_out, direct_time, direct_peak = measure(article_to_markdown, html, args.repeat)
+        same = legacy_out == direct_out
+        mismatches += not same
+        print(f"{name:<24}{'✅' if same else '❌':<6}{legacy_time * 1000:>12.2f}{direct_time * 1000:>12.2f}"
+              f"{legacy_time / direct_time:>7.2f}x{legacy_peak / 1024:>16.0f}{direct_peak / 1024:>16.0f}")
+
+    if mismatches:
+        print(f"❌ {mismatches} 个样例输出不一致")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面解析基准
+对比整页 html.parser 解析与 SoupStrainer 局部解析的耗时与内存峰值。
+样例页面会额外填充推荐列表与内联脚本，模拟真实页面中与正文无关的部分。
+
+使用方法：
+    python benchmarks/bench_parse.py [--repeat N] [--padding N]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper.page_parser import DEFAULT_PARSER, parse_article_page  # noqa: E402
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def pad_page(html: str, padding: int) -> str:
+    """在 </body> 前插入 padding 条推荐文章和一段内联脚本"""
+    items = "".join(
+        f'<li class="entry"><a href="/post/{i}" class="title">推荐文章 {i}</a>'
+        f'<div class="meta"><span class="author">作者{i}</span><span class="likes">{i}</span></div></li>'
+        for i in range(padding)
+    )
+    script = "<script>window.__STATE__=" + "[" + ",".join(str(i) for i in range(padding * 10)) + "]</script>"
+    return html.replace("</body>", f'<aside class="recommend"><ul>{items}</ul></aside>{script}</body>')
+
+
+def measure(parse, html: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    soup = parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, soup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面解析基准")
+    parser.add_argument('--repeat', type=int, default=5, help="每个样例的重复次数")
+    parser.add_argument('--padding', type=int, default=2000, help="填充的推荐文章条数")
+    args = parser.parse_args()
+
+    print(f"局部解析器：{DEFAULT_PARSER}")
+    print(f"{'样例':<24}{'页面(KB)':>10}{'整页(ms)':>12}{'局部(ms)':>12}{'提速':>8}{'整页峰值(KB)':>14}{'局部峰值(KB)':>14}")
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "article_*.html"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            html = pad_page(f.read(), args.padding)
+
+        full_time, full_peak, full_soup = measure(lambda h: BeautifulSoup(h, 'html.parser'), html, args.repeat)
+        part_time, part_peak, part_soup = measure(parse_article_page, html, args.repeat)
+        assert part_soup.find(id='article-root') is not None
+        assert full_soup.find(id='article-root').get_text() == part_soup.find(id='article-root').get_text()
+
+        print(f"{os.path.basename(path):<24}{len(html.encode('utf-8')) / 1024:>10.0f}{full_time * 1000:>12.2f}"
+              f"{part_time * 1000:>12.2f}{full_time / part_time:>7.2f}x{full_peak / 1024:>14.0f}{part_peak / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
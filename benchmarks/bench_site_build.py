@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量站点构建基准
+生成合成的文章存档（ArticleStore 分片目录，部分文章引用本地图片），依次统计：
+全量构建、无变化重建（全量扫描）、修改一篇文章后重建（全量扫描 / --changed）、
+修改一张图片后重建、删除一篇文章后重建、页面模板变化后重建（全部页面并行渲染）。
+修改一篇文章后使用 --changed 重建的耗时应与存档规模无关。
+
+使用方法：
+    python benchmarks/bench_site_build.py [--sizes 1000 10000] [--workers N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper.output_layout import ArticleStore  # noqa: E402
+from juejin_scraper.render import ArticleRenderer  # noqa: E402
+from juejin_scraper.site_build import PAGE_TEMPLATE, SiteBuilder  # noqa: E402
+
+
+def write_archive(root: str, count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    renderer = ArticleRenderer()
+    store = ArticleStore(root)
+    os.makedirs(os.path.join(root, 'images'), exist_ok=True)
+    for n in range(10):
+        with open(os.path.join(root, 'images', f"figure{n}.png"), 'wb') as f:
+            f.write(bytes(rng.randrange(256) for _ in range(2048)))
+    paths = []
+    try:
+        for i in range(count):
+            image = f"\n\n![示意图](../images/figure{i % 10}.png)\n" if i % 5 == 0 else ""
+            paragraphs = "\n\n".join(f"第 {p} 段：" + "合成正文内容，" * rng.randrange(10, 40) for p in range(8))
+            article = {
+                'title': f"合成文章 {i}", 'url': f"https://juejin.cn/post/{7000000000000000000 + i}",
+                'author_name': f"作者{rng.randrange(500)}", 'author_link': '',
+                'content': f"## 小节\n\n{paragraphs}{image}\n\n```python\nprint({i})\n```\n",
+                'likes': rng.randrange(1000), 'comments': 0, 'collects': rng.randrange(100),
+                'publish_time': f"{rng.randrange(2019, 2026)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                'read_time': "5分钟", 'column': "无", 'comments_data': [],
+            }
+            paths.append(store.write(article['url'], article['title'], renderer.generate_markdown(article)))
+    finally:
+        store.close()
+    return paths
+
+
+def timed(builder: SiteBuilder, changed=None):
+    start = time.perf_counter()
+    stats = builder.build(changed)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="增量站点构建基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="存档文章数")
+    parser.add_argument('--workers', type=int, default=None, help="并行渲染的进程数")
+    args = parser.parse_args()
+
+    print(f"{'文章数':>8}  {'场景':<22}{'耗时(s)':>10}{'重建页面':>10}{'列表页':>8}{'图片':>6}")
+    for size in args.sizes:
+        work = tempfile.mkdtemp(prefix="juejin_site_bench_")
+        try:
+            source, out = os.path.join(work, 'archive'), os.path.join(work, 'site')
+            paths = write_archive(source, size)
+            builder = SiteBuilder(source, out, workers=args.workers)
+            target = paths[len(paths) // 2]
+
+            def report(name, elapsed, stats, size=size):
+                print(f"{size:>8}  {name:<22}{elapsed:>10.3f}{stats['pages']:>10}"
+                      f"{stats['listings']:>8}{stats['images']:>6}")
+
+            report("全量构建", *timed(builder))
+            report("无变化（全量扫描）", *timed(builder))
+            with open(target, 'a', encoding='utf-8') as f:
+                f.write("\n追加的一段。\n")
+            report("改一篇（全量扫描）", *timed(builder))
+            with open(target, 'a', encoding='utf-8') as f:
+                f.write("\n再追加一段。\n")
+            report("改一篇（--changed）", *timed(builder, [target]))
+            image = os.path.join(source, 'images', 'figure5.png')
+            with open(image, 'ab') as f:
+                f.write(b'\x00')
+            report("改一张图（--changed）", *timed(builder, [image]))
+            os.remove(paths[0])
+            report("删一篇（--changed）", *timed(builder, [paths[0]]))
+            builder.templates['page'] = PAGE_TEMPLATE.replace('<article>', '<article class="post">')
+            report("页面模板变化", *timed(builder))
+            builder.close()
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sitemap 流式解析基准
+生成不同规模的 gzip 压缩 sitemap（逐条写入，不在内存中拼接），分别用流式读取（juejin_scraper.sitemap）
+与一次性解析整个文档（ElementTree.parse）提取全部URL，统计耗时、吞吐与 Python 堆内存峰值（tracemalloc）。
+流式读取的内存峰值应与 sitemap 规模无关。
+
+使用方法：
+    python benchmarks/bench_sitemap.py [--sizes 10000 100000 1000000] [--skip-baseline]
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juejin_scraper.fixture_server import FixtureSite  # noqa: E402
+from juejin_scraper.sitemap import SitemapReader  # noqa: E402
+
+
+def write_sitemap(path: str, count: int) -> None:
+    site = FixtureSite(articles=count)
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=5) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
+        for i in range(1, count + 1):
+            f.write(f"<url><loc>https://juejin.cn/post/{site.post_id(i)}</loc>"
+                    f"<lastmod>{site.lastmod(i)}</lastmod></url>")
+        f.write('</urlset>')
+
+
+def streaming(path: str) -> int:
+    reader = SitemapReader([r'/post/\d+'])
+    return sum(1 for _ in reader.urls(path))
+
+
+def whole_document(path: str) -> int:
+    with gzip.open(path, 'rb') as f:
+        root = ET.parse(f).getroot()
+    return sum(1 for element in root.iter() if element.tag.endswith('}loc'))
+
+
+def measure(func, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sitemap 流式解析基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help="sitemap 的URL数")
+    parser.add_argument('--skip-baseline', action='store_true', help="不运行一次性解析（规模很大时内存占用高）")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="juejin_sitemap_bench_")
+    try:
+        print(f"{'URL数':>10}{'文件(MB)':>10}{'方式':>8}{'耗时(s)':>10}{'URL/s':>12}{'内存峰值(MB)':>14}")
+        for size in args.sizes:
+            path = os.path.join(root, f"sitemap-{size}.xml.gz")
+            write_sitemap(path, size)
+            file_mb = os.path.getsize(path) / 1024 / 1024
+            methods = [("流式", streaming)] + ([] if args.skip_baseline else [("整体", whole_document)])
+            for name, func in methods:
+                count, elapsed, peak = measure(func, path)
+                assert count == size, (name, count, size)
+                print(f"{size:>10}{file_mb:>10.1f}{name:>8}{elapsed:>10.2f}{count / elapsed:>12.0f}{peak:>14.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行冷启动基准
+多次启动子进程执行常见的轻量命令，统计中位耗时，并与完整加载浏览器后端的耗时对比。
+轻量命令不应导入 selenium / bs4 / requests / html_to_markdown。
+
+使用方法：
+    python benchmarks/bench_startup.py [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('selenium', 'bs4', 'requests', 'html_to_markdown')
+
+COMMANDS = [
+    ("抓取器 --help", ["juejin_with_comment.py", "--help"]),
+    ("抓取器 参数错误", ["juejin_with_comment.py"]),
+    ("简易版 用法提示", ["juejin_to_local_md.py"]),
+    ("全文索引 --help", ["-m", "juejin_scraper.search_index", "--help"]),
+    # scraper 模块本身已不在导入时加载 selenium，参考行显式导入浏览器后端
+    ("完整加载浏览器后端（参考）", ["-c", "import juejin_scraper.scraper, selenium.webdriver, "
+                                 "webdriver_manager.chrome"]),
+]
+
+
+def time_command(args, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def heavy_imports(args) -> list:
+    """用 -X importtime 检查命令加载了哪些重量级后端"""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    loaded = set()
+    for line in result.stderr.splitlines():
+        name = line.rsplit('|', 1)[-1].strip()
+        if name.split('.')[0] in HEAVY_MODULES:
+            loaded.add(name.split('.')[0])
+    return sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行冷启动基准")
+    parser.add_argument('--repeat', type=int, default=10, help="每条命令的启动次数")
+    args = parser.parse_args()
+
+    baseline = time_command(["-c", "pass"], args.repeat)
+    print(f"空解释器启动：{baseline * 1000:.1f}ms")
+    print(f"{'命令':<28}{'中位耗时(ms)':>14}{'扣除解释器(ms)':>16}  加载的后端")
+    for name, command in COMMANDS:
+        elapsed = time_command(command, args.repeat)
+        loaded = heavy_imports(command)
+        print(f"{name:<28}{elapsed * 1000:>14.1f}{(elapsed - baseline) * 1000:>16.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+掘金文章抓取器
+
+命令行：python juejin_with_comment.py <URL> ... 或 python -m juejin_scraper <URL> ...
+常驻服务：python -m juejin_scraper.daemon serve（预热浏览器，通过本地 HTTP / Unix socket 接收任务）
+导入本包不会加载 selenium 等后端，用到 JuejinScraper 时才导入浏览器相关模块。
+"""
+
+__all__ = ['ArticleRenderer', 'JuejinScraper', 'main']
+
+
+def __getattr__(name):
+    if name == 'JuejinScraper':
+        from .scraper import JuejinScraper
+        return JuejinScraper
+    if name == 'ArticleRenderer':
+        from .render import ArticleRenderer
+        return ArticleRenderer
+    if name == 'main':
+        from .cli import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""
+作者资料补充
+功能：
+1. 为文章作者与精选评论的评论者补充资料：等级、粉丝数、关注数、文章数、获赞与阅读数、简介
+   （接口与字段整理由站点适配器提供，见 sites.base.SiteAdapter.profile_api）
+2. 两级缓存：进程内有界 LRU（同一进程的全部工作线程 / 标签页共享）+ SQLite 持久化缓存（跨运行、跨进程共享）；
+   条目带有效期（TTL），持久化缓存超过容量时淘汰最久未使用的条目
+3. 批量：一篇文章涉及的全部作者一次查询缓存，未命中的并发请求（全进程共用有上限的请求线程池），结果一次写入
+4. 在途去重：同一作者正在被本进程其他线程请求时等待其结果；其他进程通过 SQLite 中带期限的认领记录协调，
+   认领期内等待对方写入缓存。每个作者在有效期内最多请求一次
+5. 用户不存在等确定的结果同样缓存（有效期较短）；网络错误不缓存，下次重试
+
+同一作者在成千上万篇文章中反复出现，按出现次数逐个请求资料会成倍增加请求数。
+
+使用方法：
+    python -m juejin_scraper --author-cache URL [URL ...]
+    python -m juejin_scraper.authors [--db PATH] lookup <作者主页链接> ...
+    python -m juejin_scraper.authors [--db PATH] stats
+    python -m juejin_scraper.authors [--db PATH] prune
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import DEFAULT_AUTHOR_CACHE_PATH
+from .sites import SiteAdapter, adapter_for
+
+DEFAULT_TTL = 7 * 86400
+# 用户不存在等确定结果的有效期
+DEFAULT_NEGATIVE_TTL = 86400
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_MEMORY_ENTRIES = 10_000
+DEFAULT_CONCURRENCY = 8
+
+
+class AuthorCache:
+    """作者资料缓存：进程内 LRU + SQLite 持久化，条目带有效期"""
+
+    def __init__(self, db_path: str = DEFAULT_AUTHOR_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        """
+        Args:
+            db_path: 持久化缓存数据库路径（多个进程可共用）
+            max_entries: 持久化缓存的最大条目数，超过时淘汰最久未使用的条目
+            memory_entries: 进程内 LRU 的最大条目数
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.lock = threading.Lock()
+        # 键 -> (资料或None, 过期时间)，按最近使用排序
+        self.memory: "OrderedDict[str, Tuple[Optional[Dict], float]]" = OrderedDict()
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS authors (
+                key TEXT PRIMARY KEY,
+                link TEXT NOT NULL,
+                profile TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS authors_used ON authors (used_at)")
+        # 其他进程正在请求的作者
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS claims (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+    def _remember(self, key: str, profile: Optional[Dict], expires_at: float) -> None:
+        """写入进程内 LRU（调用方持有锁）"""
+        self.memory[key] = (profile, expires_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str], now: Optional[float] = None) -> Dict[str, Optional[Dict]]:
+        """
+        批量查询未过期的资料
+
+        Returns:
+            {键: 资料}，用户不存在的值为None；未命中或已过期的键不在结果中
+        """
+        now = now or time.time()
+        found: Dict[str, Optional[Dict]] = {}
+        with self.lock:
+            remaining = []
+            for key in keys:
+                entry = self.memory.get(key)
+                if entry is not None and entry[1] > now:
+                    self.memory.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    remaining.append(key)
+            if not remaining:
+                return found
+            placeholders = ','.join('?' * len(remaining))
+            rows = self.conn.execute(
+                f"SELECT key, profile, expires_at FROM authors WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*remaining, now)
+            ).fetchall()
+            for key, profile, expires_at in rows:
+                found[key] = json.loads(profile) if profile else None
+                self._remember(key, found[key], expires_at)
+            if rows:
+                with self.conn:
+                    self.conn.executemany("UPDATE authors SET used_at = ? WHERE key = ?",
+                                          ((now, key) for key, _, _ in rows))
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Optional[Dict], float]], now: Optional[float] = None) -> None:
+        """
+        批量写入资料，超过容量时淘汰最久未使用的条目
+
+        Args:
+            entries: (键, 作者主页链接, 资料或None, 有效期秒数)
+        """
+        now = now or time.time()
+        rows = [(key, link, json.dumps(profile, ensure_ascii=False) if profile is not None else None,
+                 now, now + ttl, now) for key, link, profile, ttl in entries]
+        if not rows:
+            return
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO authors (key, link, profile, fetched_at, expires_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                self.conn.execute(
+                    "DELETE FROM authors WHERE key IN (SELECT key FROM authors ORDER BY used_at "
+                    "LIMIT max(0, (SELECT COUNT(*) FROM authors) - ?))", (self.max_entries,)
+                )
+            for key, _, profile, _, expires_at, _ in rows:
+                self._remember(key, json.loads(profile) if profile else None, expires_at)
+
+    def claim(self, keys: List[str], owner: str, lease: float) -> List[str]:
+        """
+        认领即将请求的作者，其他进程的认领未过期时跳过
+
+        Returns:
+            本进程认领成功的键
+        """
+        now = time.time()
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO claims (key, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                    "WHERE claims.expires_at < ? OR claims.owner = excluded.owner",
+                    ((key, owner, now + lease, now) for key in keys)
+                )
+                placeholders = ','.join('?' * len(keys))
+                return [row[0] for row in self.conn.execute(
+                    f"SELECT key FROM claims WHERE owner = ? AND key IN ({placeholders})", (owner, *keys)
+                )]
+
+    def release(self, keys: List[str], owner: str) -> None:
+        """请求结束后释放认领"""
+        with self.lock:
+            with self.conn:
+                self.conn.executemany("DELETE FROM claims WHERE key = ? AND owner = ?",
+                                      ((key, owner) for key in keys))
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """删除已过期的条目与认领，返回删除的条目数"""
+        now = now or time.time()
+        with self.lock:
+            with self.conn:
+                removed = self.conn.execute("DELETE FROM authors WHERE expires_at <= ?", (now,)).rowcount
+                self.conn.execute("DELETE FROM claims WHERE expires_at <= ?", (now,))
+            self.memory.clear()
+        return removed
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, int]:
+        now = now or time.time()
+        with self.lock:
+            total, fresh, missing = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(expires_at > ?), 0), COALESCE(SUM(profile IS NULL), 0) FROM authors",
+                (now,)
+            ).fetchone()
+        return {'entries': total, 'fresh': fresh, 'not_found': missing}
+
+
+class AuthorEnricher:
+    """批量补充作者资料：缓存、在途去重、并发请求"""
+
+    def __init__(self, cache: AuthorCache, ttl: float = DEFAULT_TTL, negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 concurrency: int = DEFAULT_CONCURRENCY, timeout: float = 10):
+        """
+        Args:
+            cache: 资料缓存
+            ttl: 资料有效期（秒）
+            negative_ttl: 用户不存在的结果有效期（秒）
+            concurrency: 全进程同时进行的资料请求数上限
+            timeout: 单个请求超时（秒）
+        """
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.lock = threading.Lock()
+        self.inflight: Dict[str, Future] = {}
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="author-fetch")
+        self.local = threading.local()
+        self.counts: Counter = Counter()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.cache.close()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counts[name] += n
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            import requests
+
+            session = self.local.session = requests.Session()
+        return session
+
+    def _fetch(self, adapter: SiteAdapter, link: str) -> Tuple[Optional[Dict], bool]:
+        """请求线程：返回 (资料, 是否为确定结果)；网络错误不是确定结果，不写入缓存"""
+        try:
+            return adapter.fetch_profile(link, timeout=self.timeout, session=self._session()), True
+        except Exception as e:
+            print(f"⚠️ 获取作者资料失败：{link}（{e}）")
+            return None, False
+
+    def _fetch_batch(self, items: Dict[str, Tuple[SiteAdapter, str]]) -> Dict[str, Optional[Dict]]:
+        """请求一批未命中的作者：先认领，其他进程已认领的等待其结果，超时未写入再自行请求"""
+        keys = list(items)
+        claimed = set(self.cache.claim(keys, self.owner, lease=self.timeout * 2))
+        results: Dict[str, Optional[Dict]] = {}
+        try:
+            others = [key for key in keys if key not in claimed]
+            if others:
+                self._count('claimed_elsewhere', len(others))
+                deadline = time.monotonic() + self.timeout * 2
+                while others and time.monotonic() < deadline:
+                    time.sleep(0.2)
+                    found = self.cache.get_many(others)
+                    results.update(found)
+                    others = [key for key in others if key not in found]
+                # 对方超时未写入（进程退出或请求失败），自行请求
+                claimed.update(others)
+
+            to_fetch = [key for key in keys if key not in results]
+            futures = {key: self.executor.submit(self._fetch, *items[key]) for key in to_fetch}
+            entries = []
+            for key, future in futures.items():
+                profile, definite = future.result()
+                results[key] = profile
+                self._count('fetched')
+                if definite:
+                    entries.append((key, items[key][1], profile, self.ttl if profile else self.negative_ttl))
+                else:
+                    self._count('errors')
+            self.cache.put_many(entries)
+        finally:
+            self.cache.release(sorted(claimed), self.owner)
+        return results
+
+    def lookup(self, links: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        批量获取作者资料
+
+        Args:
+            links: 作者主页链接（可重复）
+
+        Returns:
+            {作者主页链接: 资料}，无法获取或站点不支持时为None
+        """
+        link_keys: Dict[str, Optional[str]] = {}
+        items: Dict[str, Tuple[SiteAdapter, str]] = {}
+        for link in links:
+            if not link or link in link_keys:
+                continue
+            adapter = adapter_for(link)
+            key = adapter.author_key(link)
+            link_keys[link] = key
+            if key is not None:
+                items.setdefault(key, (adapter, link))
+        if not items:
+            return {link: None for link in link_keys}
+
+        profiles = self.cache.get_many(items)
+        self._count('hits', len(profiles))
+        missing = [key for key in items if key not in profiles]
+
+        own: List[str] = []
+        waiting: Dict[str, Future] = {}
+        with self.lock:
+            for key in missing:
+                future = self.inflight.get(key)
+                if future is None:
+                    self.inflight[key] = Future()
+                    own.append(key)
+                else:
+                    waiting[key] = future
+            self.counts['coalesced'] += len(waiting)
+
+        if own:
+            fetched: Dict[str, Optional[Dict]] = {}
+            try:
+                fetched = self._fetch_batch({key: items[key] for key in own})
+            finally:
+                with self.lock:
+                    for key in own:
+                        self.inflight.pop(key).set_result(fetched.get(key))
+            profiles.update(fetched)
+        for key, future in waiting.items():
+            try:
+                profiles[key] = future.result(timeout=self.timeout * 5)
+            except FutureTimeoutError:
+                profiles[key] = None
+
+        return {link: profiles.get(key) if key else None for link, key in link_keys.items()}
+
+    def enrich(self, author_link: str, comments: List[Dict]) -> Optional[Dict]:
+        """
+        为文章作者与精选评论的评论者补充资料（一次批量查询）
+
+        Args:
+            author_link: 文章作者主页链接
+            comments: 评论数据，带 author_link 的评论就地加上 author_profile
+
+        Returns:
+            文章作者的资料，无法获取时返回None
+        """
+        links = [author_link] + [comment.get('author_link') for comment in comments]
+        profiles = self.lookup(link for link in links if link)
+        for comment in comments:
+            profile = profiles.get(comment.get('author_link') or '')
+            if profile:
+                comment['author_profile'] = profile
+        return profiles.get(author_link or '')
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"👤 作者资料：缓存命中 {c['hits']} 次，在途合并 {c['coalesced']} 次，"
+                f"其他进程请求中 {c['claimed_elsewhere']} 次，请求 {c['fetched']} 次（失败 {c['errors']} 次）")
+
+
+_shared: Dict[str, AuthorEnricher] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_enricher(db_path: str = DEFAULT_AUTHOR_CACHE_PATH) -> AuthorEnricher:
+    """同一进程中使用同一缓存文件的抓取器共用一个 AuthorEnricher（共享内存缓存、在途请求与请求线程池）"""
+    path = os.path.abspath(os.path.expanduser(db_path))
+    with _shared_lock:
+        enricher = _shared.get(path)
+        if enricher is None:
+            enricher = _shared[path] = AuthorEnricher(AuthorCache(path))
+        return enricher
+
+
+def format_profile(profile: Dict) -> str:
+    """资料摘要（Markdown 作者信息行）"""
+    parts = [f"Lv{profile['level']}"] if profile.get('level') else []
+    parts += [f"{label} {profile[name]:,}" for name, label in
+              (('followers', '粉丝'), ('following', '关注'), ('articles', '文章'), ('likes_received', '获赞'))
+              if profile.get(name)]
+    if profile.get('title'):
+        parts.append(profile['title'])
+    return " · ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作者资料缓存")
+    parser.add_argument('--db', default=DEFAULT_AUTHOR_CACHE_PATH, help=f"缓存数据库路径（默认：{DEFAULT_AUTHOR_CACHE_PATH}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lookup_parser = subparsers.add_parser('lookup', help="获取作者资料（优先使用缓存）")
+    lookup_parser.add_argument('links', nargs='+', metavar='LINK', help="作者主页链接")
+
+    subparsers.add_parser('stats', help="缓存条目数")
+    subparsers.add_parser('prune', help="删除已过期的条目")
+
+    args = parser.parse_args()
+    if args.command == 'lookup':
+        enricher = AuthorEnricher(AuthorCache(args.db))
+        try:
+            for link, profile in enricher.lookup(args.links).items():
+                if profile is None:
+                    print(f"{link}\n  （无资料）")
+                else:
+                    print(f"{link}\n  {profile['name']}：{format_profile(profile)}")
+                    if profile.get('bio'):
+                        print(f"  {profile['bio']}")
+            print(enricher.summary())
+        finally:
+            enricher.close()
+        return
+
+    cache = AuthorCache(args.db)
+    try:
+        if args.command == 'stats':
+            stats = cache.stats()
+            print(f"📊 缓存 {stats['entries']} 位作者：未过期 {stats['fresh']}，用户不存在 {stats['not_found']}")
+        else:
+            print(f"🧹 删除 {cache.prune()} 个过期条目")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+内容寻址的压缩 Blob 存储
+功能：
+1. 以 SHA-256 作为键，相同内容（页面源码、图片）只存一份
+2. 松散对象按哈希分目录存放：objects/ab/cdef...
+3. 使用 zstd 压缩，并可用掘金页面样本训练字典（大部分页面模板相同，字典压缩率显著更高）；
+   未安装 zstandard 时退回 zlib
+4. 流式写入与读取，不需要把整个对象放进内存
+5. pack 将松散对象合并为 pack 文件 + 排序索引，读取时 mmap 后二分查找，支持快速随机访问
+
+对象格式：2 字节魔数 'JB' + 1 字节编码 + 4 字节字典ID + 压缩数据
+索引格式：按哈希排序的定长记录（32 字节哈希 + 8 字节偏移 + 8 字节长度）
+
+使用方法：
+    python -m juejin_scraper.blobstore <目录> stats
+    python -m juejin_scraper.blobstore <目录> train [--size BYTES] [--samples N]
+    python -m juejin_scraper.blobstore <目录> pack
+    python -m juejin_scraper.blobstore <目录> cat <哈希>
+"""
+
+import argparse
+import hashlib
+import io
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import uuid
+import zlib
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MAGIC = b'JB'
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+HEADER = struct.Struct('>2sBI')
+IDX_RECORD = struct.Struct('>32sQQ')
+CHUNK_SIZE = 1 << 20
+DEFAULT_DICT_SIZE = 112640
+
+
+class _DecompressReader(io.RawIOBase):
+    """把 read(n) 数据源包装为流式解压后的可读流"""
+
+    def __init__(self, source, decompressor):
+        self.source = source
+        self.decompressor = decompressor
+        self.buffer = b""
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self.buffer and not self.eof:
+            chunk = self.source.read(CHUNK_SIZE)
+            if chunk:
+                self.buffer = self.decompressor.decompress(chunk)
+            else:
+                self.eof = True
+                flush = getattr(self.decompressor, 'flush', None)
+                self.buffer = flush() if flush else b""
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if hasattr(self.source, 'close'):
+            self.source.close()
+        super().close()
+
+
+class _MemoryReader:
+    """对 mmap 切片提供 read(n)，避免一次性复制整个对象"""
+
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.pos = 0
+
+    def read(self, n: int = -1) -> bytes:
+        end = len(self.view) if n < 0 else min(len(self.view), self.pos + n)
+        data = bytes(self.view[self.pos:end])
+        self.pos = end
+        return data
+
+    def close(self) -> None:
+        self.view.release()
+
+
+class PackReader:
+    """只读 pack 文件：mmap 索引并二分查找，mmap 数据文件按偏移切片"""
+
+    def __init__(self, pack_path: str):
+        self.pack_path = pack_path
+        self.idx_path = pack_path[:-len('.pack')] + '.idx'
+        with open(self.idx_path, 'rb') as f:
+            self.idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(self.idx_path) else b""
+        with open(self.pack_path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(self.pack_path) else b""
+        self.count = len(self.idx) // IDX_RECORD.size
+
+    def lookup(self, digest: bytes) -> Optional[Tuple[int, int]]:
+        """返回对象在 pack 中的 (偏移, 长度)，不存在返回None"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, offset, length = IDX_RECORD.unpack_from(self.idx, mid * IDX_RECORD.size)
+            if key == digest:
+                return offset, length
+            if key < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def view(self, offset: int, length: int) -> memoryview:
+        return memoryview(self.data)[offset:offset + length]
+
+    def keys(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield IDX_RECORD.unpack_from(self.idx, i * IDX_RECORD.size)[0].hex()
+
+    def close(self) -> None:
+        for m in (self.idx, self.data):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+
+class BlobStore:
+    """内容寻址的压缩 Blob 存储"""
+
+    def __init__(self, root: str, level: int = 10):
+        """
+        初始化存储
+
+        Args:
+            root: 存储根目录
+            level: 压缩级别
+        """
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.level = level
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.packs_dir = os.path.join(self.root, 'packs')
+        self.dicts_dir = os.path.join(self.root, 'dicts')
+        self.tmp_dir = os.path.join(self.root, 'tmp')
+        for path in (self.objects_dir, self.packs_dir, self.dicts_dir, self.tmp_dir):
+            os.makedirs(path, exist_ok=True)
+        self._dicts: Dict[int, object] = {}
+        self._packs: Optional[List[PackReader]] = None
+
+    # ---------- 压缩字典 ----------
+
+    @property
+    def current_dict_id(self) -> int:
+        """当前写入使用的字典ID，0 表示不使用字典"""
+        try:
+            with open(os.path.join(self.dicts_dir, 'CURRENT'), 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _load_dict(self, dict_id: int):
+        if dict_id not in self._dicts:
+            with open(os.path.join(self.dicts_dir, f"{dict_id}.zdict"), 'rb') as f:
+                self._dicts[dict_id] = zstandard.ZstdCompressionDict(f.read())
+        return self._dicts[dict_id]
+
+    def train_dictionary(self, samples: Iterable[bytes], dict_size: int = DEFAULT_DICT_SIZE) -> int:
+        """
+        用样本训练 zstd 字典并设为当前字典（旧字典保留，已有对象仍可读取）
+
+        Args:
+            samples: 样本内容（如若干篇文章的页面源码）
+            dict_size: 字典大小（字节）
+
+        Returns:
+            新字典ID
+        """
+        if zstandard is None:
+            raise RuntimeError("训练字典需要安装 zstandard：pip install zstandard")
+        trained = zstandard.train_dictionary(dict_size, list(samples))
+        dict_id = trained.dict_id()
+        with open(os.path.join(self.dicts_dir, f"{dict_id}.zdict"), 'wb') as f:
+            f.write(trained.as_bytes())
+        tmp_path = os.path.join(self.dicts_dir, 'CURRENT.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(str(dict_id))
+        os.replace(tmp_path, os.path.join(self.dicts_dir, 'CURRENT'))
+        self._dicts[dict_id] = trained
+        return dict_id
+
+    def _compressobj(self) -> Tuple[int, int, object]:
+        """返回 (编码, 字典ID, 压缩器)"""
+        if zstandard is None:
+            return CODEC_ZLIB, 0, zlib.compressobj(min(self.level, 9))
+        dict_id = self.current_dict_id
+        params = {'level': self.level}
+        if dict_id:
+            params['dict_data'] = self._load_dict(dict_id)
+        return CODEC_ZSTD, dict_id, zstandard.ZstdCompressor(**params).compressobj()
+
+    def _decompressobj(self, codec: int, dict_id: int):
+        if codec == CODEC_ZLIB:
+            return zlib.decompressobj()
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("读取 zstd 对象需要安装 zstandard：pip install zstandard")
+            if dict_id:
+                return zstandard.ZstdDecompressor(dict_data=self._load_dict(dict_id)).decompressobj()
+            return zstandard.ZstdDecompressor().decompressobj()
+        raise ValueError(f"未知的压缩编码：{codec}")
+
+    # ---------- 写入 ----------
+
+    def _loose_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put_stream(self, stream: BinaryIO) -> str:
+        """
+        流式写入对象
+
+        Args:
+            stream: 可读的二进制流
+
+        Returns:
+            内容的 SHA-256 十六进制哈希
+        """
+        codec, dict_id, compressor = self._compressobj()
+        sha = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(HEADER.pack(MAGIC, codec, dict_id))
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha.update(chunk)
+                    tmp.write(compressor.compress(chunk))
+                tmp.write(compressor.flush())
+
+            digest = sha.hexdigest()
+            if self.exists(digest):
+                os.unlink(tmp_path)
+            else:
+                final_path = self._loose_path(digest)
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+            return digest
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put_bytes(self, data: bytes) -> str:
+        """写入对象，返回哈希"""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.exists(digest):
+            return digest
+        return self.put_stream(io.BytesIO(data))
+
+    # ---------- 读取 ----------
+
+    @property
+    def packs(self) -> List[PackReader]:
+        if self._packs is None:
+            self._packs = []
+            self._refresh_packs()
+        return self._packs
+
+    def _refresh_packs(self) -> List[PackReader]:
+        """打开其他进程新生成的 pack 文件，返回新打开的部分"""
+        if self._packs is None:
+            return self.packs
+        known = {os.path.basename(pack.pack_path) for pack in self._packs}
+        added = [
+            PackReader(os.path.join(self.packs_dir, name))
+            for name in sorted(os.listdir(self.packs_dir)) if name.endswith('.pack') and name not in known
+        ]
+        self._packs.extend(added)
+        return added
+
+    def _find_packed(self, digest: str, refresh: bool = True) -> Optional[Tuple[PackReader, int, int]]:
+        """
+        在 pack 中查找对象
+
+        Args:
+            digest: 对象哈希
+            refresh: 未命中时重新扫描 pack 目录（长时间运行的进程里，对象可能已被其他进程打包）
+        """
+        key = bytes.fromhex(digest)
+        for pack in self.packs:
+            location = pack.lookup(key)
+            if location:
+                return pack, location[0], location[1]
+        if refresh:
+            for pack in self._refresh_packs():
+                location = pack.lookup(key)
+                if location:
+                    return pack, location[0], location[1]
+        return None
+
+    def exists(self, digest: str) -> bool:
+        """对象是否存在"""
+        return os.path.exists(self._loose_path(digest)) or self._find_packed(digest) is not None
+
+    def open(self, digest: str) -> BinaryIO:
+        """
+        以流的方式读取对象
+
+        Args:
+            digest: 对象哈希
+
+        Returns:
+            解压后的可读二进制流
+        """
+        loose_path = self._loose_path(digest)
+        if os.path.exists(loose_path):
+            source = open(loose_path, 'rb')
+        else:
+            packed = self._find_packed(digest)
+            if packed is None:
+                raise KeyError(digest)
+            pack, offset, length = packed
+            source = _MemoryReader(pack.view(offset, length))
+
+        magic, codec, dict_id = HEADER.unpack(source.read(HEADER.size))
+        if magic != MAGIC:
+            source.close()
+            raise ValueError(f"对象格式错误：{digest}")
+        return io.BufferedReader(_DecompressReader(source, self._decompressobj(codec, dict_id)))
+
+    def get(self, digest: str) -> bytes:
+        """读取完整对象"""
+        with self.open(digest) as f:
+            return f.read()
+
+    def iter_loose(self) -> Iterator[str]:
+        """列出全部松散对象的哈希"""
+        for prefix in sorted(os.listdir(self.objects_dir)):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if os.path.isdir(prefix_dir):
+                for name in os.listdir(prefix_dir):
+                    yield prefix + name
+
+    # ---------- 打包 ----------
+
+    def pack(self) -> Optional[str]:
+        """
+        把松散对象合并为一个新的 pack 文件（压缩数据原样拷贝，不重新压缩）
+
+        Returns:
+            新 pack 文件路径，没有松散对象时返回None
+        """
+        self._refresh_packs()
+        digests = sorted(d for d in self.iter_loose() if self._find_packed(d, refresh=False) is None)
+        if not digests:
+            return None
+
+        # 名称带时间戳、进程号与随机后缀，并发打包互不覆盖，按名称排序即生成顺序
+        name = f"pack-{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        pack_path = os.path.join(self.packs_dir, name + '.pack')
+        idx_path = os.path.join(self.packs_dir, name + '.idx')
+
+        records = []
+        packed = []
+        offset = 0
+        with open(pack_path + '.tmp', 'wb') as pack_file:
+            for digest in digests:
+                try:
+                    with open(self._loose_path(digest), 'rb') as f:
+                        data = f.read()
+                except FileNotFoundError:
+                    # 已被并发的打包进程收走
+                    continue
+                packed.append(digest)
+                pack_file.write(data)
+                records.append(IDX_RECORD.pack(bytes.fromhex(digest), offset, len(data)))
+                offset += len(data)
+            pack_file.flush()
+            os.fsync(pack_file.fileno())
+        with open(idx_path + '.tmp', 'wb') as idx_file:
+            idx_file.write(b"".join(records))
+            idx_file.flush()
+            os.fsync(idx_file.fileno())
+
+        # 先落盘数据文件，再落盘索引，最后删除松散对象
+        os.replace(pack_path + '.tmp', pack_path)
+        os.replace(idx_path + '.tmp', idx_path)
+        for digest in packed:
+            try:
+                os.unlink(self._loose_path(digest))
+            except FileNotFoundError:
+                pass
+        self.close()
+        return pack_path
+
+    def stats(self) -> Dict[str, int]:
+        """统计对象数量与磁盘占用"""
+        loose = list(self.iter_loose())
+        loose_bytes = sum(os.path.getsize(self._loose_path(d)) for d in loose)
+        packed = sum(p.count for p in self.packs)
+        packed_bytes = sum(os.path.getsize(p.pack_path) for p in self.packs)
+        return {'loose': len(loose), 'loose_bytes': loose_bytes, 'packed': packed,
+                'packed_bytes': packed_bytes, 'packs': len(self.packs), 'dict_id': self.current_dict_id}
+
+    def close(self) -> None:
+        """释放 pack 文件的 mmap"""
+        if self._packs:
+            for pack in self._packs:
+                pack.close()
+        self._packs = None
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="内容寻址的压缩 Blob 存储")
+    parser.add_argument('root', help="存储根目录")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('stats', help="统计对象数量与磁盘占用")
+    train_parser = subparsers.add_parser('train', help="用已存储的页面训练 zstd 字典")
+    train_parser.add_argument('--size', type=int, default=DEFAULT_DICT_SIZE, help="字典大小（字节）")
+    train_parser.add_argument('--samples', type=int, default=500, help="最多使用的样本数")
+    subparsers.add_parser('pack', help="把松散对象合并为 pack 文件")
+    cat_parser = subparsers.add_parser('cat', help="输出对象内容")
+    cat_parser.add_argument('digest', help="对象哈希")
+
+    args = parser.parse_args()
+    store = BlobStore(args.root)
+
+    try:
+        if args.command == 'stats':
+            stats = store.stats()
+            print(f"松散对象：{stats['loose']} 个，{stats['loose_bytes'] / 1024:.1f}KB")
+            print(f"已打包对象：{stats['packed']} 个（{stats['packs']} 个 pack），{stats['packed_bytes'] / 1024:.1f}KB")
+            print(f"当前字典：{stats['dict_id'] or '无'}")
+        elif args.command == 'train':
+            # 只用页面源码训练，图片等二进制资源对字典没有帮助
+            candidates = list(store.iter_loose())
+            for pack in store.packs:
+                candidates.extend(pack.keys())
+            random.shuffle(candidates)
+            samples = []
+            for digest in candidates:
+                data = store.get(digest)
+                if data.lstrip()[:1] == b'<':
+                    samples.append(data)
+                if len(samples) >= args.samples:
+                    break
+            if not samples:
+                print("没有可用于训练的页面样本")
+                sys.exit(1)
+            dict_id = store.train_dictionary(samples, args.size)
+            print(f"✅ 已用 {len(samples)} 个样本训练字典：{dict_id}")
+        elif args.command == 'pack':
+            pack_path = store.pack()
+            print(f"✅ 已生成：{pack_path}" if pack_path else "没有需要打包的松散对象")
+        else:
+            with store.open(args.digest) as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sys.stdout.buffer.write(chunk)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
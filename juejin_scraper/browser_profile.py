@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+持久化浏览器配置目录
+功能：
+1. 每个工作进程/线程独占一个 Chrome user-data-dir（worker-0、worker-1 ...），用文件锁避免两个浏览器共用同一目录
+2. 跨运行保留 HTTP 缓存、DNS/TLS 会话、Cookie 与站点同意状态，重复访问命中热缓存
+3. 限制磁盘缓存大小：Chrome 的 --disk-cache-size 只约束 HTTP 缓存，
+   启动前按总预算清理 Code Cache / GPU 缓存等目录中最久未用的文件，并移除崩溃残留的 Singleton 锁文件
+
+使用方法：
+    python -m juejin_scraper.browser_profile stats <目录>
+    python -m juejin_scraper.browser_profile cleanup <目录> [--cache-size MB]
+"""
+
+import argparse
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows：不加锁，由调用方保证目录不被共用
+    fcntl = None
+
+from .config import DEFAULT_CACHE_SIZE_MB
+
+
+# 相对 user-data-dir 的缓存目录，计入缓存预算
+CACHE_DIRS = (
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+)
+
+# 缓存目录中的索引文件，删除后 Chrome 需要重建整个缓存，清理时保留
+INDEX_FILES = {"index", "the-real-index", "index-dir"}
+
+# Chrome 异常退出后残留的单实例锁，会导致下次启动报 "user data directory is already in use"
+SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+
+def _cache_files(profile_dir: str) -> List[Tuple[float, int, str]]:
+    """返回缓存目录中的文件 (最近访问时间, 大小, 路径)"""
+    files = []
+    for cache_dir in CACHE_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(profile_dir, cache_dir)):
+            dirnames[:] = [d for d in dirnames if d not in INDEX_FILES]
+            for name in filenames:
+                if name in INDEX_FILES:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+    return files
+
+
+def cache_usage(profile_dir: str) -> int:
+    """缓存目录总大小（字节）"""
+    return sum(size for _, size, _ in _cache_files(profile_dir))
+
+
+def cleanup_profile(profile_dir: str, max_cache_bytes: int) -> Dict[str, int]:
+    """
+    清理配置目录：移除残留的单实例锁，并按最近访问时间删除缓存文件直到不超过预算
+    只能在该目录没有浏览器运行时调用
+
+    Args:
+        profile_dir: Chrome user-data-dir
+        max_cache_bytes: 缓存总预算（字节）
+
+    Returns:
+        {'before': 清理前字节数, 'after': 清理后字节数, 'removed': 删除文件数}
+    """
+    for name in SINGLETON_FILES:
+        path = os.path.join(profile_dir, name)
+        if os.path.lexists(path):
+            os.unlink(path)
+
+    files = _cache_files(profile_dir)
+    before = total = sum(size for _, size, _ in files)
+    removed = 0
+    if total > max_cache_bytes:
+        for _, size, path in sorted(files):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            if total <= max_cache_bytes:
+                break
+    return {'before': before, 'after': total, 'removed': removed}
+
+
+class BrowserProfile:
+    """一个被当前进程独占的浏览器配置目录"""
+
+    def __init__(self, path: str, cache_size_mb: int = DEFAULT_CACHE_SIZE_MB):
+        """
+        Args:
+            path: user-data-dir 路径
+            cache_size_mb: 磁盘缓存预算（MB）
+        """
+        self.path = path
+        self.cache_size_mb = cache_size_mb
+        self._lock_file = None
+
+    @property
+    def max_cache_bytes(self) -> int:
+        return self.cache_size_mb * 1024 * 1024
+
+    def try_lock(self) -> bool:
+        """尝试独占该目录，已被其他浏览器占用时返回 False"""
+        os.makedirs(self.path, exist_ok=True)
+        lock_file = open(self.path + ".lock", 'a+')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file = lock_file
+        return True
+
+    def release(self) -> None:
+        """释放目录锁"""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def cleanup(self) -> Dict[str, int]:
+        """启动浏览器前清理缓存"""
+        return cleanup_profile(self.path, self.max_cache_bytes)
+
+    def chrome_arguments(self) -> List[str]:
+        """使用该目录所需的 Chrome 启动参数"""
+        return [
+            f"--user-data-dir={self.path}",
+            f"--disk-cache-size={self.max_cache_bytes}",
+        ]
+
+
+def acquire_profile(root: str, cache_size_mb: int = DEFAULT_CACHE_SIZE_MB,
+                    max_workers: int = 64) -> Optional[BrowserProfile]:
+    """
+    在 root 下分配第一个未被占用的 worker-N 目录
+
+    Args:
+        root: 配置目录根路径
+        cache_size_mb: 磁盘缓存预算（MB）
+        max_workers: 最多尝试的目录数量
+
+    Returns:
+        已加锁的 BrowserProfile，全部被占用时返回None
+    """
+    root = os.path.expanduser(root)
+    for i in range(max_workers):
+        profile = BrowserProfile(os.path.join(root, f"worker-{i}"), cache_size_mb)
+        if profile.try_lock():
+            return profile
+    return None
+
+
+def iter_profiles(root: str) -> List[str]:
+    """root 下的全部 worker 目录"""
+    root = os.path.expanduser(root)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, name) for name in os.listdir(root)
+        if name.startswith("worker-") and os.path.isdir(os.path.join(root, name))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器配置目录管理")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    stats_parser = subparsers.add_parser('stats', help="查看各 worker 目录的缓存占用")
+    stats_parser.add_argument('root', help="配置目录根路径")
+
+    cleanup_parser = subparsers.add_parser('cleanup', help="清理未被占用的 worker 目录")
+    cleanup_parser.add_argument('root', help="配置目录根路径")
+    cleanup_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB, metavar='MB',
+                                help="每个目录的缓存预算")
+    cleanup_parser.add_argument('--reset', action='store_true', help="删除整个目录（清空 Cookie 等全部状态）")
+
+    args = parser.parse_args()
+
+    for path in iter_profiles(args.root):
+        name = os.path.basename(path)
+        if args.command == 'stats':
+            print(f"{name}：缓存 {cache_usage(path) / 1024 / 1024:.1f} MB")
+            continue
+
+        profile = BrowserProfile(path, args.cache_size)
+        if not profile.try_lock():
+            print(f"⏭️ {name} 正在使用，跳过")
+            continue
+        try:
+            if args.reset:
+                shutil.rmtree(path)
+                print(f"🗑️ 已删除 {name}")
+            else:
+                result = profile.cleanup()
+                print(f"🧹 {name}：{result['before'] / 1024 / 1024:.1f} MB -> "
+                      f"{result['after'] / 1024 / 1024:.1f} MB，删除 {result['removed']} 个文件")
+        finally:
+            profile.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口
+只在顶层导入标准库；浏览器（selenium）、HTTP（requests）与转换（bs4 / html_to_markdown）后端
+在实际需要的代码路径中才导入，--help、参数错误与快照回放都不会加载浏览器后端。
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from .config import (DEFAULT_AUTHOR_CACHE_PATH, DEFAULT_CACHE_SIZE_MB, DEFAULT_COMMENT_STATE_PATH,
+                     DEFAULT_DEADLINE, DEFAULT_DEDUP_PATH, DEFAULT_INDEX_PATH, DEFAULT_MAX_PAGES,
+                     DEFAULT_MAX_RSS_MB, DEFAULT_RENDER_CACHE_PATH, DEFAULT_SCHEDULE_PATH)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(
+        description="掘金文章抓取器",
+        epilog="示例：python juejin_with_comment.py https://juejin.cn/post/7511582195447824438"
+    )
+    parser.add_argument('urls', nargs='*', metavar='URL', help="文章URL")
+    parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH, default=None, metavar='DB',
+                        help=f"保存后更新全文索引（默认路径：{DEFAULT_INDEX_PATH}）")
+    parser.add_argument('--dedup', nargs='?', const=DEFAULT_DEDUP_PATH, default=None, metavar='DB',
+                        help=f"跳过与已保存文章近似重复的文章（默认路径：{DEFAULT_DEDUP_PATH}）")
+    parser.add_argument('--recrawl-db', nargs='?', const=DEFAULT_SCHEDULE_PATH, default=None, metavar='DB',
+                        help=f"记录统计数据供重抓调度排期（默认路径：{DEFAULT_SCHEDULE_PATH}）")
+    parser.add_argument('--comment-state', nargs='?', const=DEFAULT_COMMENT_STATE_PATH, default=None, metavar='DB',
+                        help=f"增量同步评论：只抓取上次之后的新评论并刷新点赞数（默认路径：{DEFAULT_COMMENT_STATE_PATH}）")
+    parser.add_argument('--author-cache', nargs='?', const=DEFAULT_AUTHOR_CACHE_PATH, default=None, metavar='DB',
+                        help=f"为作者与精选评论的评论者补充等级、粉丝数与简介，资料缓存在该数据库（默认路径：{DEFAULT_AUTHOR_CACHE_PATH}）")
+    parser.add_argument('--render', choices=['site', 'auto'], default='site',
+                        help="site：按站点声明的方式渲染；auto：先直接请求页面，正文不完整才启动浏览器"
+                             "（评论由脚本加载的站点需要评论时仍使用浏览器，配合 --max-comments 0 只抓正文）")
+    parser.add_argument('--max-comments', type=int, default=10, metavar='N',
+                        help="最多保存的评论数量（默认 10，0 表示不抓取评论）")
+    parser.add_argument('--render-cache', metavar='DB', default=None,
+                        help=f"auto 模式按URL模式缓存探测结果的数据库（默认：{DEFAULT_RENDER_CACHE_PATH}）")
+    parser.add_argument('--serial-replies', action='store_true',
+                        help="逐条展开评论回复（默认一次性批量展开）")
+    parser.add_argument('--profile', action='store_true',
+                        help="统计 WebDriver 命令耗时并采集 cProfile/tracemalloc 数据，结果保存在文章旁")
+    parser.add_argument('--profile-top', type=int, default=20, metavar='N',
+                        help="性能分析摘要中列出的热点数量")
+    parser.add_argument('--snapshot-dir', metavar='DIR', default=None,
+                        help="保存每篇文章的原始快照（页面源码、评论与统计数据）")
+    parser.add_argument('--replay', metavar='DIR', default=None,
+                        help="从快照目录重新提取并渲染全部文章，不启动浏览器")
+    parser.add_argument('--blob-dir', metavar='DIR', default=None,
+                        help="快照的页面源码与文章图片写入该内容寻址存储（去重 + zstd 压缩）")
+    parser.add_argument('--browser-profile', metavar='DIR', default=None,
+                        help="使用该目录下的持久化浏览器配置，跨运行复用 HTTP 缓存与 Cookie")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB, metavar='MB',
+                        help=f"持久化配置的磁盘缓存预算（默认 {DEFAULT_CACHE_SIZE_MB} MB）")
+    parser.add_argument('--output-dir', metavar='DIR', default=None,
+                        help="按文章ID分片保存到该目录并维护索引（默认保存到主目录）")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="跳过输出目录索引中已保存的文章")
+    parser.add_argument('--export-dir', metavar='DIR', default=None,
+                        help="把文章统计、评论与回复按批导出为列式文件（Parquet，未安装 pyarrow 时为 NumPy）")
+    parser.add_argument('--workers', type=int, default=None, metavar='N',
+                        help="回放使用的进程数，默认为CPU核心数")
+    parser.add_argument('--browsers', type=int, default=1, metavar='N',
+                        help="并发抓取使用的浏览器数")
+    parser.add_argument('--tabs', type=int, default=1, metavar='N',
+                        help="每个浏览器同时处理文章的标签页数，大于1时多篇文章共享一个浏览器进程")
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES, metavar='N',
+                        help=f"浏览器在文章之间复用，处理 N 篇后重启（默认 {DEFAULT_MAX_PAGES}，0 关闭；"
+                             "与 --max-rss 都为 0 时每篇文章单独启动浏览器）")
+    parser.add_argument('--max-rss', type=float, default=DEFAULT_MAX_RSS_MB, metavar='MB',
+                        help=f"浏览器进程树内存超过该值时重启（默认 {DEFAULT_MAX_RSS_MB}，0 关闭）")
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE, metavar='SECONDS',
+                        help=f"单篇文章超过该时长强制重启浏览器，文章在末尾重试一次（默认 {DEFAULT_DEADLINE}，0 关闭）")
+    args = parser.parse_args(argv)
+    if not args.urls and not args.replay:
+        parser.error("请提供文章URL，或使用 --replay 指定快照目录")
+    if args.skip_existing and not args.output_dir:
+        parser.error("--skip-existing 需要与 --output-dir 一起使用")
+    if args.blob_dir and not (args.snapshot_dir or args.replay):
+        parser.error("--blob-dir 需要与 --snapshot-dir 或 --replay 一起使用")
+    if args.browsers < 1 or args.tabs < 1:
+        parser.error("--browsers 与 --tabs 至少为 1")
+    if args.profile and args.browsers * args.tabs > 1:
+        parser.error("--profile 只能在单浏览器单标签页模式下使用")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    args = parse_args(argv)
+
+    if args.replay:
+        from .replay import replay_snapshots
+
+        print(f"🔁 从快照回放：{args.replay}")
+        start = time.time()
+        success_count, total = replay_snapshots(args.replay, workers=args.workers, blob_dir=args.blob_dir,
+                                                  max_comments=args.max_comments, output_dir=args.output_dir)
+        print(f"\n🎉 回放完成！成功：{success_count}/{total} 篇文章，耗时 {time.time() - start:.2f}s")
+        return
+
+    options = dict(headless=True, max_comments=args.max_comments, max_replies=5, index_path=args.index,
+                   dedup_path=args.dedup, batch_replies=not args.serial_replies,
+                   snapshot_dir=args.snapshot_dir, blob_dir=args.blob_dir,
+                   browser_profile=args.browser_profile, cache_size_mb=args.cache_size,
+                   output_dir=args.output_dir, skip_existing=args.skip_existing,
+                   export_dir=args.export_dir, recrawl_db=args.recrawl_db,
+                   comment_state=args.comment_state, render_mode=args.render,
+                   render_cache=args.render_cache, author_cache=args.author_cache)
+    # 同一篇文章的不同URL写法只抓取一次
+    from .frontier import Frontier
+
+    frontier = Frontier(None)
+    urls = [url for url, _ in frontier.admit(args.urls)]
+    frontier.close()
+    if len(urls) < len(args.urls):
+        print(frontier.summary())
+    args.urls = urls
+
+    if args.browsers * args.tabs > 1:
+        _crawl_tabs(args, options)
+        return
+
+    from .scraper import JuejinScraper
+    from .supervisor import BrowserSupervisor
+
+    # 按页数或内存回收时浏览器在文章之间复用，两者都关闭时每篇文章单独启动浏览器
+    keep_browser = bool(args.max_pages or args.max_rss)
+    scraper = JuejinScraper(profile=args.profile, profile_top=args.profile_top, keep_browser=keep_browser,
+                            **options)
+    supervisor = BrowserSupervisor(scraper, max_pages=args.max_pages or None, max_rss_mb=args.max_rss or None,
+                                   deadline=args.deadline or None)
+
+    urls = args.urls
+    success_count = 0
+    # 超时被中断的文章在末尾重试一次
+    pending = [(url, True) for url in urls]
+
+    print(f"📚 开始处理 {len(urls)} 篇文章...")
+    print("=" * 50)
+
+    # 浏览器在文章之间复用，中途退出（如 Ctrl+C）也要关闭
+    try:
+        for i, (url, retry) in enumerate(pending, 1):
+            print(f"\n🔄 [{i}/{len(pending)}] 处理文章...")
+            result, hung = supervisor.run(url)
+
+            if result:
+                success_count += 1
+                print(f"✅ 第 {i} 篇文章处理完成")
+            elif hung and retry:
+                pending.append((url, False))
+                print(f"⏰ 第 {i} 篇文章超时，稍后重试")
+            else:
+                print(f"❌ 第 {i} 篇文章处理失败")
+
+            print("-" * 30)
+    finally:
+        scraper.finish()
+    print(f"\n🎉 处理完成！成功：{success_count}/{len(urls)} 篇文章")
+    if supervisor.counts or supervisor.peak_rss_mb:
+        print(supervisor.summary())
+    if scraper.probe_cache is not None:
+        print(scraper.probe_cache.summary())
+    if scraper.authors is not None:
+        print(scraper.authors.summary())
+    if scraper.duplicates:
+        print(f"⏭️ 跳过近似重复文章 {len(scraper.duplicates)} 篇：")
+        for url, original in scraper.duplicates:
+            print(f"  {url} ≈ {original}")
+
+
+def _crawl_tabs(args: argparse.Namespace, options: dict) -> None:
+    """多浏览器 / 多标签页并发抓取"""
+    from .tab_pool import TabScheduler
+
+    urls = args.urls
+    print(f"📚 开始处理 {len(urls)} 篇文章（{args.browsers} 个浏览器 × {args.tabs} 个标签页）...")
+    print("=" * 50)
+
+    scheduler = TabScheduler(browsers=args.browsers, tabs=args.tabs, max_pages=args.max_pages or None,
+                             max_rss_mb=args.max_rss or None, **options)
+    start = time.time()
+    results = scheduler.crawl(urls, deadline=args.deadline or None)
+    success_count = sum(1 for _, path in results if path)
+    stats = scheduler.stats()
+
+    print(f"\n🎉 处理完成！成功：{success_count}/{len(urls)} 篇文章，耗时 {time.time() - start:.2f}s")
+    print(f"🗂️ 浏览器启动 {stats.get('launches', 0)} 次，打开标签页 {stats.get('tabs_opened', 0)} 次，"
+          f"按页数回收 {stats.get('recycled_pages', 0)} 次，按内存回收 {stats.get('recycled_rss', 0)} 次，"
+          f"浏览器内存峰值 {scheduler.peak_rss_mb():.0f} MB")
+    caches = [s.probe_cache for s in scheduler.scrapers if s.probe_cache is not None]
+    if caches:
+        for cache in caches[1:]:
+            caches[0].counts.update(cache.counts)
+        print(caches[0].summary())
+    if scheduler.scrapers[0].authors is not None:
+        # 同一进程的标签页共用一个作者资料缓存
+        print(scheduler.scrapers[0].authors.summary())
+    duplicates = scheduler.duplicates()
+    if duplicates:
+        print(f"⏭️ 跳过近似重复文章 {len(duplicates)} 篇：")
+        for url, original in duplicates:
+            print(f"  {url} ≈ {original}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""
+文章、评论与回复的列式导出
+功能：
+1. 抓取时把文章统计、评论、子回复按批追加为列式分片文件（articles/、comments/、replies/ 下的 part-*），
+   每批写一个新分片，不需要重写已有文件
+2. 安装 pyarrow 时写 Parquet（zstd 压缩）；否则退回 NumPy .npz：数值列为 int64/float64，
+   字符串列按分片字典编码为 int32 码值 + UTF-8 字典，不依赖 pickle
+3. 读取时字符串列统一为 (码值, 取值表)，点赞分布、活跃评论者等聚合直接在整数数组上向量化计算，
+   数百万行无需逐行处理
+4. 同一文章多次抓取会产生多份记录，聚合时按 scraped_at 只保留每篇文章最新的一次
+5. 支持从已有快照回填、合并小分片
+
+使用方法：
+    python -m juejin_scraper.columnar_export <目录> summary [--top N]
+    python -m juejin_scraper.columnar_export <目录> from-snapshots <快照目录> [--blob-dir DIR]
+    python -m juejin_scraper.columnar_export <目录> compact
+"""
+
+import argparse
+import glob
+import os
+import time
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+# 表结构：列名 -> 类型（str / int / float）
+SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    'articles': [
+        ('article_id', 'str'), ('url', 'str'), ('title', 'str'), ('author', 'str'),
+        ('likes', 'int'), ('comments', 'int'), ('collects', 'int'),
+        ('publish_time', 'str'), ('read_time', 'str'), ('column', 'str'),
+        ('scraped_at', 'float'),
+    ],
+    'comments': [
+        ('article_id', 'str'), ('comment_idx', 'int'), ('author', 'str'), ('likes', 'int'),
+        ('replies', 'int'), ('time', 'str'), ('content', 'str'), ('scraped_at', 'float'),
+    ],
+    'replies': [
+        ('article_id', 'str'), ('comment_idx', 'int'), ('reply_idx', 'int'), ('author', 'str'),
+        ('likes', 'int'), ('time', 'str'), ('content', 'str'), ('scraped_at', 'float'),
+    ],
+}
+
+FORMATS = ('parquet', 'npz')
+
+
+def default_format() -> str:
+    """有 pyarrow 时用 Parquet，否则用 NumPy"""
+    if pa is not None:
+        return 'parquet'
+    if np is not None:
+        return 'npz'
+    raise RuntimeError("列式导出需要安装 pyarrow 或 numpy：pip install pyarrow")
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ColumnarExporter:
+    """按批把文章数据追加为列式分片"""
+
+    def __init__(self, root: str, batch_size: int = 500, fmt: Optional[str] = None):
+        """
+        Args:
+            root: 导出目录
+            batch_size: 缓冲多少篇文章后写出一个分片
+            fmt: parquet / npz，默认按已安装的库选择
+        """
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.batch_size = batch_size
+        self.fmt = fmt or default_format()
+        if self.fmt == 'parquet' and pa is None:
+            raise RuntimeError("Parquet 导出需要安装 pyarrow：pip install pyarrow")
+        if self.fmt == 'npz' and np is None:
+            raise RuntimeError("npz 导出需要安装 numpy：pip install numpy")
+        self._reset()
+
+    def _reset(self) -> None:
+        self.buffers = {table: {name: [] for name, _ in schema} for table, schema in SCHEMAS.items()}
+        self.pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, article_data: Dict, scraped_at: Optional[float] = None) -> None:
+        """
+        追加一篇文章（ArticleRenderer.generate_markdown 使用的 article_data）
+
+        Args:
+            article_data: 文章数据，含 comments_data
+            scraped_at: 抓取时间戳，默认为当前时间
+        """
+        from .output_layout import article_id
+
+        doc_id = article_id(article_data['url'])
+        scraped_at = scraped_at or time.time()
+
+        articles = self.buffers['articles']
+        articles['article_id'].append(doc_id)
+        articles['url'].append(article_data['url'])
+        articles['title'].append(article_data.get('title', ''))
+        articles['author'].append(article_data.get('author_name', ''))
+        for name in ('likes', 'comments', 'collects'):
+            articles[name].append(_to_int(article_data.get(name)))
+        for name in ('publish_time', 'read_time', 'column'):
+            articles[name].append(str(article_data.get(name, '')))
+        articles['scraped_at'].append(scraped_at)
+
+        comments = self.buffers['comments']
+        replies = self.buffers['replies']
+        for i, comment in enumerate(article_data.get('comments_data') or []):
+            comments['article_id'].append(doc_id)
+            comments['comment_idx'].append(i)
+            comments['author'].append(comment.get('author', ''))
+            comments['likes'].append(_to_int(comment.get('likes')))
+            comments['replies'].append(_to_int(comment.get('replies')))
+            comments['time'].append(comment.get('time', ''))
+            comments['content'].append(comment.get('content', ''))
+            comments['scraped_at'].append(scraped_at)
+            for j, reply in enumerate(comment.get('sub_replies') or []):
+                replies['article_id'].append(doc_id)
+                replies['comment_idx'].append(i)
+                replies['reply_idx'].append(j)
+                replies['author'].append(reply.get('author', ''))
+                replies['likes'].append(_to_int(reply.get('likes')))
+                replies['time'].append(reply.get('time', ''))
+                replies['content'].append(reply.get('content', ''))
+                replies['scraped_at'].append(scraped_at)
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> List[str]:
+        """把缓冲写成新分片，返回写出的文件"""
+        if not self.pending:
+            return []
+        written = []
+        part = f"part-{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        for table, columns in self.buffers.items():
+            if not columns['article_id']:
+                continue
+            table_dir = os.path.join(self.root, table)
+            os.makedirs(table_dir, exist_ok=True)
+            path = os.path.join(table_dir, f"{part}.{self.fmt}")
+            write_part(path, table, columns, self.fmt)
+            written.append(path)
+        self._reset()
+        return written
+
+    def close(self) -> None:
+        """写出剩余缓冲"""
+        self.flush()
+
+
+def _encode_strings(values: List[str]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """字典编码：返回 (int32 码值, 字典 UTF-8 字节, 字典偏移)"""
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32, count=len(values))
+    encoded = [v.encode('utf-8') for v in lookup]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return codes, data, offsets
+
+
+def _decode_strings(data: "np.ndarray", offsets: "np.ndarray") -> "np.ndarray":
+    raw = data.tobytes()
+    values = np.empty(len(offsets) - 1, dtype=object)
+    values[:] = [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+    return values
+
+
+def write_part(path: str, table: str, columns: Dict[str, list], fmt: str) -> None:
+    """写出一个分片（先写临时文件再替换，读取方不会看到写了一半的文件）"""
+    tmp_path = path + ".tmp"
+    if fmt == 'parquet':
+        types = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+        schema = pa.schema([(name, types[kind]) for name, kind in SCHEMAS[table]])
+        pq.write_table(pa.Table.from_pydict(columns, schema=schema), tmp_path, compression='zstd')
+    else:
+        arrays = {}
+        for name, kind in SCHEMAS[table]:
+            if kind == 'str':
+                arrays[f"{name}__codes"], arrays[f"{name}__data"], arrays[f"{name}__offsets"] = \
+                    _encode_strings(columns[name])
+            else:
+                arrays[name] = np.asarray(columns[name], dtype=np.int64 if kind == 'int' else np.float64)
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+class StringColumn(NamedTuple):
+    """字典编码的字符串列：values[codes] 即原始值"""
+    codes: "np.ndarray"
+    values: "np.ndarray"
+
+    def decode(self) -> "np.ndarray":
+        return self.values[self.codes]
+
+
+def _merge_string_chunks(chunks: List[StringColumn]) -> StringColumn:
+    """合并各分片的字典：只对（很小的）取值表做哈希去重，再向量化重映射码值"""
+    if len(chunks) == 1:
+        return chunks[0]
+    lookup: Dict[str, int] = {}
+    codes = []
+    for chunk in chunks:
+        remap = np.fromiter((lookup.setdefault(v, len(lookup)) for v in chunk.values),
+                            dtype=np.int64, count=len(chunk.values))
+        codes.append(remap[chunk.codes])
+    values = np.empty(len(lookup), dtype=object)
+    values[:] = list(lookup)
+    return StringColumn(np.concatenate(codes), values)
+
+
+def unify(columns: List[StringColumn]) -> List[StringColumn]:
+    """把多个字符串列映射到同一份取值表，便于跨表按码值分组"""
+    merged = _merge_string_chunks(columns)
+    result, start = [], 0
+    for column in columns:
+        end = start + len(column.codes)
+        result.append(StringColumn(merged.codes[start:end], merged.values))
+        start = end
+    return result
+
+
+def _read_parquet(paths: List[str], table: str, names: List[str]) -> Dict:
+    """一次读取全部 Parquet 分片，字符串列由 Arrow 字典编码"""
+    if pa is None:
+        raise RuntimeError("读取 Parquet 分片需要安装 pyarrow：pip install pyarrow")
+    kinds = dict(SCHEMAS[table])
+    data = pa.concat_tables([pq.read_table(path, columns=names) for path in paths])
+    columns = {}
+    for name in names:
+        column = data.column(name).combine_chunks()
+        if kinds[name] == 'str':
+            encoded = pc.dictionary_encode(column)
+            columns[name] = StringColumn(encoded.indices.to_numpy(zero_copy_only=False),
+                                         encoded.dictionary.to_numpy(zero_copy_only=False))
+        else:
+            columns[name] = column.to_numpy()
+    return columns
+
+
+def _read_npz(path: str, table: str, names: List[str]) -> Dict:
+    """读取一个 npz 分片"""
+    kinds = dict(SCHEMAS[table])
+    columns = {}
+    with np.load(path) as data:
+        for name in names:
+            if kinds[name] == 'str':
+                columns[name] = StringColumn(data[f"{name}__codes"],
+                                             _decode_strings(data[f"{name}__data"], data[f"{name}__offsets"]))
+            else:
+                columns[name] = data[name]
+    return columns
+
+
+def part_files(root: str, table: str) -> List[str]:
+    """表的全部分片（Parquet 与 npz 可以混用）"""
+    table_dir = os.path.join(os.path.expanduser(root), table)
+    return sorted(glob.glob(os.path.join(table_dir, "part-*.parquet")) +
+                  glob.glob(os.path.join(table_dir, "part-*.npz")))
+
+
+def load_table(root: str, table: str, columns: Optional[Iterable[str]] = None) -> Dict:
+    """
+    读取整张表
+
+    Args:
+        root: 导出目录
+        table: articles / comments / replies
+        columns: 需要的列，默认全部
+
+    Returns:
+        列名 -> NumPy 数组（字符串列为 StringColumn）
+    """
+    if np is None:
+        raise RuntimeError("读取列式导出需要安装 numpy：pip install numpy")
+    names = list(columns or [name for name, _ in SCHEMAS[table]])
+    kinds = dict(SCHEMAS[table])
+    paths = part_files(root, table)
+    parquet_paths = [path for path in paths if path.endswith('.parquet')]
+    parts = [_read_npz(path, table, names) for path in paths if path.endswith('.npz')]
+    if parquet_paths:
+        parts.append(_read_parquet(parquet_paths, table, names))
+
+    result = {}
+    for name in names:
+        if kinds[name] == 'str':
+            chunks = [p[name] for p in parts] or [StringColumn(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object))]
+            result[name] = _merge_string_chunks(chunks)
+        else:
+            dtype = np.int64 if kinds[name] == 'int' else np.float64
+            result[name] = np.concatenate([p[name] for p in parts]) if parts else np.zeros(0, dtype=dtype)
+    return result
+
+
+def latest_scrape(article_ids: StringColumn, scraped_at: "np.ndarray") -> "np.ndarray":
+    """按取值表码值给出每篇文章最新一次抓取的时间，没有记录的为 -inf"""
+    latest = np.full(len(article_ids.values), -np.inf)
+    if len(scraped_at):
+        np.maximum.at(latest, article_ids.codes, scraped_at)
+    return latest
+
+
+def latest_mask(article_ids: StringColumn, scraped_at: "np.ndarray", latest: "np.ndarray") -> "np.ndarray":
+    """只保留属于该文章最新一次抓取的行（latest 由 latest_scrape 在文章表上得到）"""
+    return scraped_at == latest[article_ids.codes]
+
+
+def distribution(values: "np.ndarray") -> Dict:
+    """分位数与按 2 的幂分桶的直方图（0、1、2-3、4-7 ...）"""
+    if not len(values):
+        return {'count': 0}
+    percentiles = np.percentile(values, [50, 90, 99])
+    positive = values > 0
+    bucket_ids = np.zeros(len(values), dtype=np.int64)
+    bucket_ids[positive] = np.floor(np.log2(values[positive])).astype(np.int64) + 1
+    buckets = np.bincount(bucket_ids)
+    histogram = {}
+    for i, count in enumerate(buckets):
+        if count:
+            low, high = (0, 0) if i == 0 else (2 ** (i - 1), 2 ** i - 1)
+            histogram[f"{low}" if low == high else f"{low}-{high}"] = int(count)
+    return {
+        'count': int(len(values)), 'mean': float(values.mean()), 'p50': float(percentiles[0]),
+        'p90': float(percentiles[1]), 'p99': float(percentiles[2]), 'max': int(values.max()),
+        'histogram': histogram,
+    }
+
+
+def summarize(root: str, top: int = 10) -> Dict:
+    """
+    向量化聚合：文章与评论点赞分布、最活跃评论者、最受欢迎文章
+
+    Args:
+        root: 导出目录
+        top: 排行数量
+
+    Returns:
+        聚合结果
+    """
+    articles = load_table(root, 'articles', ['article_id', 'title', 'likes', 'scraped_at'])
+    comments = load_table(root, 'comments', ['article_id', 'author', 'likes', 'scraped_at'])
+    replies = load_table(root, 'replies', ['article_id', 'author', 'likes', 'scraped_at'])
+
+    # 最新一次抓取以文章表为准：该次抓取没有评论时，更早抓取的评论与回复不再计入
+    a_ids, c_ids, r_ids = unify([articles['article_id'], comments['article_id'], replies['article_id']])
+    latest = latest_scrape(a_ids, articles['scraped_at'])
+    a_mask = latest_mask(a_ids, articles['scraped_at'], latest)
+    c_mask = latest_mask(c_ids, comments['scraped_at'], latest)
+    r_mask = latest_mask(r_ids, replies['scraped_at'], latest)
+
+    # 评论与回复的作者合并到同一取值表后按码值分组
+    comment_authors, reply_authors = unify([comments['author'], replies['author']])
+    author_codes = np.concatenate([comment_authors.codes[c_mask], reply_authors.codes[r_mask]])
+    author_likes = np.concatenate([comments['likes'][c_mask], replies['likes'][r_mask]])
+    n_authors = len(comment_authors.values)
+    post_counts = np.bincount(author_codes, minlength=n_authors)
+    like_sums = np.bincount(author_codes, weights=author_likes, minlength=n_authors)
+    top_authors = np.argsort(-post_counts, kind='stable')[:top]
+
+    article_likes = articles['likes'][a_mask]
+    titles = articles['title'].codes[a_mask]
+    top_articles = np.argsort(-article_likes, kind='stable')[:top]
+
+    return {
+        'articles': distribution(article_likes),
+        'comments': distribution(comments['likes'][c_mask]),
+        'replies': distribution(replies['likes'][r_mask]),
+        'top_commenters': [
+            {'author': comment_authors.values[i], 'posts': int(post_counts[i]), 'likes': int(like_sums[i])}
+            for i in top_authors if post_counts[i]
+        ],
+        'top_articles': [
+            {'title': articles['title'].values[titles[i]], 'likes': int(article_likes[i])}
+            for i in top_articles
+        ],
+    }
+
+
+def compact(root: str, fmt: Optional[str] = None) -> Dict[str, int]:
+    """把每张表的全部分片合并为一个，返回各表合并前的分片数"""
+    fmt = fmt or default_format()
+    merged = {}
+    for table, schema in SCHEMAS.items():
+        parts = part_files(root, table)
+        merged[table] = len(parts)
+        if len(parts) < 2:
+            continue
+        data = load_table(root, table)
+        columns = {
+            name: (data[name].decode().tolist() if kind == 'str' else data[name].tolist())
+            for name, kind in schema
+        }
+        path = os.path.join(os.path.expanduser(root), table,
+                            f"part-{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.{fmt}")
+        write_part(path, table, columns, fmt)
+        for part in parts:
+            os.remove(part)
+    return merged
+
+
+def export_snapshots(root: str, snapshot_dir: str, blob_dir: Optional[str] = None, batch_size: int = 500,
+                     fmt: Optional[str] = None) -> int:
+    """从快照回填导出（只解析标题，不重新生成Markdown），返回导出的文章数"""
+    from .page_parser import parse_article_page
+    from .snapshot import iter_snapshot_paths, load_snapshot
+
+    blob_store = None
+    if blob_dir:
+        from .blobstore import BlobStore
+        blob_store = BlobStore(blob_dir)
+
+    count = 0
+    with ColumnarExporter(root, batch_size=batch_size, fmt=fmt) as exporter:
+        for path in iter_snapshot_paths(snapshot_dir):
+            try:
+                snapshot = load_snapshot(path, blob_store)
+            except Exception as e:
+                print(f"❌ 读取快照 {path} 时出错：{e}")
+                continue
+            soup = parse_article_page(snapshot['page_source'])
+            title_tag = soup.find('h1', class_='article-title') or soup.find('title')
+            exporter.add({
+                'title': title_tag.get_text().strip() if title_tag else "",
+                'url': snapshot['url'],
+                'author_name': snapshot['author_name'],
+                'comments_data': snapshot['comments_data'],
+                **snapshot['stats'],
+                **snapshot['metadata'],
+            }, scraped_at=snapshot.get('captured_at'))
+            count += 1
+    return count
+
+
+def _print_distribution(name: str, stats: Dict) -> None:
+    if not stats['count']:
+        print(f"{name}：无数据")
+        return
+    print(f"{name}：{stats['count']} 条，平均点赞 {stats['mean']:.1f}，"
+          f"P50 {stats['p50']:.0f} / P90 {stats['p90']:.0f} / P99 {stats['p99']:.0f} / 最高 {stats['max']}")
+    peak = max(stats['histogram'].values())
+    for bucket, count in stats['histogram'].items():
+        print(f"  {bucket:>12} | {'█' * max(1, round(count / peak * 40))} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章、评论与回复的列式导出")
+    parser.add_argument('root', help="导出目录")
+    parser.add_argument('--format', choices=FORMATS, default=None, help="写出格式，默认有 pyarrow 时为 parquet")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    summary_parser = subparsers.add_parser('summary', help="点赞分布与评论者排行")
+    summary_parser.add_argument('--top', type=int, default=10, help="排行数量")
+
+    snapshots_parser = subparsers.add_parser('from-snapshots', help="从快照回填")
+    snapshots_parser.add_argument('snapshot_dir', help="快照目录")
+    snapshots_parser.add_argument('--blob-dir', default=None, help="快照页面源码所在的 Blob 存储目录")
+
+    subparsers.add_parser('compact', help="合并小分片")
+
+    args = parser.parse_args()
+
+    if args.command == 'from-snapshots':
+        start = time.time()
+        count = export_snapshots(args.root, args.snapshot_dir, blob_dir=args.blob_dir, fmt=args.format)
+        print(f"✅ 导出 {count} 篇文章，耗时 {time.time() - start:.2f}s")
+    elif args.command == 'compact':
+        for table, parts in compact(args.root, fmt=args.format).items():
+            print(f"🗜️ {table}：{parts} 个分片{' -> 1' if parts > 1 else ''}")
+    else:
+        start = time.time()
+        summary = summarize(args.root, top=args.top)
+        _print_distribution("📄 文章点赞", summary['articles'])
+        _print_distribution("💬 评论点赞", summary['comments'])
+        _print_distribution("↩️ 回复点赞", summary['replies'])
+        print("\n🏆 最活跃评论者：")
+        for row in summary['top_commenters']:
+            print(f"  {row['author']}：{row['posts']} 条，获赞 {row['likes']}")
+        print("\n🔥 点赞最多的文章：")
+        for row in summary['top_articles']:
+            print(f"  👍 {row['likes']}  {row['title']}")
+        print(f"\n⏱️ 聚合耗时 {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+评论增量同步状态
+功能：
+1. 按文章记录已抓取的评论集合（评论ID、作者、内容、点赞数、回复数、子回复）与最近一次同步时间
+2. 评论按"最新"排序加载时，遇到已记录的评论即可停止翻页，只提取此后新增的评论
+3. 已记录且仍在首屏的评论只刷新点赞数（一次页面内脚本读取），记录点赞变化量
+4. 新评论与已记录的评论合并为完整评论集，写入Markdown与快照
+
+重抓评论多的文章时，翻页与逐条提取的开销与新增评论数成正比，而不是与评论总数成正比。
+
+页面没有评论ID时，以 作者 + 内容 的哈希作为评论键。
+
+使用方法：
+    python -m juejin_scraper.comment_state [--db PATH] show <URL>
+    python -m juejin_scraper.comment_state [--db PATH] forget <URL>
+    python -m juejin_scraper.comment_state [--db PATH] stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from .config import DEFAULT_COMMENT_STATE_PATH
+
+
+def comment_key(comment_id: str, author: str, content: str) -> str:
+    """评论键：优先使用页面上的评论ID，否则取 作者 + 内容 的哈希"""
+    if comment_id:
+        return comment_id
+    digest = hashlib.sha1(f"{author}\n{content}".encode('utf-8')).hexdigest()
+    return f"h{digest[:16]}"
+
+
+class CommentStateStore:
+    """按文章保存的评论集合"""
+
+    def __init__(self, db_path: str = DEFAULT_COMMENT_STATE_PATH):
+        """
+        Args:
+            db_path: 评论状态数据库路径
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                last_sync REAL NOT NULL,
+                syncs INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # seq 越大越新，按 seq 倒序即页面上"最新"排序的顺序
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS comments (
+                url TEXT NOT NULL,
+                comment_key TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                likes INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (url, comment_key)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def known(self, url: str) -> Dict[str, int]:
+        """已记录的评论：{评论键: 点赞数}，文章从未同步时返回空字典"""
+        return dict(self.conn.execute("SELECT comment_key, likes FROM comments WHERE url = ?", (url,)))
+
+    def last_sync(self, url: str) -> Optional[float]:
+        row = self.conn.execute("SELECT last_sync FROM articles WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def merge(self, url: str, new_comments: List[Dict], likes: Optional[Dict[str, int]] = None,
+              now: Optional[float] = None) -> Dict[str, int]:
+        """
+        合并一次同步的结果
+
+        Args:
+            url: 文章URL
+            new_comments: 新提取的评论（按页面顺序，最新在前），每条需含 'key'
+            likes: 已记录评论的最新点赞数 {评论键: 点赞数}
+            now: 同步时间
+
+        Returns:
+            {'added': 新增评论数, 'refreshed': 点赞数有变化的评论数, 'like_delta': 点赞变化量之和}
+        """
+        now = now or time.time()
+        likes = likes or {}
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            # 点赞刷新
+            refreshed = like_delta = 0
+            for key, count in likes.items():
+                row = cur.execute("SELECT likes, data FROM comments WHERE url = ? AND comment_key = ?",
+                                  (url, key)).fetchone()
+                if row is None or row[0] == count:
+                    continue
+                data = json.loads(row[1])
+                data['likes'] = count
+                cur.execute("UPDATE comments SET likes = ?, data = ?, updated_at = ? WHERE url = ? AND comment_key = ?",
+                            (count, json.dumps(data, ensure_ascii=False), now, url, key))
+                refreshed += 1
+                like_delta += count - row[0]
+
+            # 新评论：页面顺序最新在前，seq 依次递减
+            top = cur.execute("SELECT COALESCE(MAX(seq), 0) FROM comments WHERE url = ?", (url,)).fetchone()[0]
+            added = 0
+            for offset, comment in enumerate(new_comments):
+                cur.execute(
+                    "INSERT OR REPLACE INTO comments (url, comment_key, seq, likes, data, first_seen, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, COALESCE((SELECT first_seen FROM comments WHERE url = ? AND comment_key = ?), ?), ?)",
+                    (url, comment['key'], top + len(new_comments) - offset, int(comment.get('likes') or 0),
+                     json.dumps(comment, ensure_ascii=False), url, comment['key'], now, now)
+                )
+                added += 1
+
+            cur.execute(
+                "INSERT INTO articles (url, last_sync, syncs) VALUES (?, ?, 1) "
+                "ON CONFLICT (url) DO UPDATE SET last_sync = excluded.last_sync, syncs = syncs + 1",
+                (url, now)
+            )
+            cur.execute("COMMIT")
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        return {'added': added, 'refreshed': refreshed, 'like_delta': like_delta}
+
+    def comments(self, url: str, limit: Optional[int] = None) -> List[Dict]:
+        """合并后的评论集（最新在前）"""
+        query = "SELECT data FROM comments WHERE url = ? ORDER BY seq DESC"
+        params: tuple = (url,)
+        if limit:
+            query += " LIMIT ?"
+            params = (url, limit)
+        return [json.loads(data) for (data,) in self.conn.execute(query, params)]
+
+    def forget(self, url: str) -> int:
+        """删除文章的评论状态，下次抓取时重新完整加载。返回删除的评论数"""
+        cur = self.conn.execute("DELETE FROM comments WHERE url = ?", (url,))
+        self.conn.execute("DELETE FROM articles WHERE url = ?", (url,))
+        self.conn.commit()
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        articles, syncs = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(syncs), 0) FROM articles").fetchone()
+        comments = self.conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+        return {'articles': articles, 'syncs': syncs, 'comments': comments}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="评论增量同步状态")
+    parser.add_argument('--db', default=DEFAULT_COMMENT_STATE_PATH,
+                        help=f"评论状态数据库路径（默认：{DEFAULT_COMMENT_STATE_PATH}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    show_parser = subparsers.add_parser('show', help="查看文章已记录的评论")
+    show_parser.add_argument('url', help="文章URL")
+    show_parser.add_argument('--limit', type=int, default=20, help="最多显示条数")
+
+    forget_parser = subparsers.add_parser('forget', help="删除文章的评论状态")
+    forget_parser.add_argument('url', help="文章URL")
+
+    subparsers.add_parser('stats', help="统计")
+
+    args = parser.parse_args()
+    store = CommentStateStore(args.db)
+    try:
+        if args.command == 'show':
+            last_sync = store.last_sync(args.url)
+            if last_sync is None:
+                print("❌ 该文章没有评论状态")
+                return
+            print(f"🕒 最近同步：{time.strftime('%Y-%m-%d %H:%M', time.localtime(last_sync))}，"
+                  f"共 {len(store.known(args.url))} 条评论")
+            for comment in store.comments(args.url, args.limit):
+                print(f"[{comment['key']}] {comment['author']} 👍 {comment['likes']}：{comment['content'][:60]}")
+        elif args.command == 'forget':
+            print(f"🧹 已删除 {store.forget(args.url)} 条评论状态")
+        else:
+            stats = store.stats()
+            print(f"📊 {stats['articles']} 篇文章，{stats['comments']} 条评论，累计同步 {stats['syncs']} 次")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
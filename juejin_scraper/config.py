@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+默认路径配置
+只依赖标准库，命令行解析时导入不会拖慢启动。
+"""
+
+import os
+
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.juejin_search.db")
+DEFAULT_DEDUP_PATH = os.path.expanduser("~/.juejin_dedup.db")
+DEFAULT_SCHEDULE_PATH = os.path.expanduser("~/.juejin_recrawl.db")
+DEFAULT_COMMENT_STATE_PATH = os.path.expanduser("~/.juejin_comments.db")
+DEFAULT_RENDER_CACHE_PATH = os.path.expanduser("~/.juejin_render_probe.db")
+DEFAULT_FRONTIER_PATH = os.path.expanduser("~/.juejin_frontier.db")
+DEFAULT_AUTHOR_CACHE_PATH = os.path.expanduser("~/.juejin_authors.db")
+
+# 持久化浏览器配置目录的默认磁盘缓存预算（MB）
+DEFAULT_CACHE_SIZE_MB = 256
+
+# 浏览器监管：同一浏览器处理的最大文章数、进程树内存上限（MB）、单篇文章期限（秒）
+DEFAULT_MAX_PAGES = 200
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_DEADLINE = 180
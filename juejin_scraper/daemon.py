@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+抓取常驻服务
+功能：
+1. 启动时预热 N 个浏览器，之后每篇文章复用，单篇延迟只剩页面加载与提取；
+   浏览器由 BrowserSupervisor 监管：按页数 / 内存回收，单篇超过期限强制重启并重试一次
+2. 通过本地 HTTP 端口或 Unix socket 接收任务，返回保存路径（可选返回 Markdown 全文）
+3. 提供队列深度、处理中任务数与排队/处理/总耗时分位数统计
+
+接口：
+    POST /scrape      {"url": "...", "markdown": true, "wait": true}
+                      wait=false 时立即返回任务 id，之后用 GET /jobs/<id> 查询
+    GET  /jobs/<id>   查询任务状态与结果
+    GET  /stats       队列深度与延迟统计
+    GET  /health      存活检查
+
+使用方法：
+    python -m juejin_scraper.daemon [--socket PATH | --port N] serve [--browsers N] [--deadline SECONDS]
+    python -m juejin_scraper.daemon [--socket PATH | --port N] submit <URL> [--markdown]
+    python -m juejin_scraper.daemon [--socket PATH | --port N] stats
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from .config import (DEFAULT_CACHE_SIZE_MB, DEFAULT_DEADLINE, DEFAULT_DEDUP_PATH, DEFAULT_INDEX_PATH,
+                     DEFAULT_MAX_PAGES, DEFAULT_MAX_RSS_MB)
+
+
+DEFAULT_SOCKET_PATH = os.path.expanduser("~/.juejin_scraper.sock")
+
+# 统计最近多少个任务的延迟分位数
+LATENCY_WINDOW = 1000
+# 保留多少个已完成任务供 /jobs/<id> 查询
+MAX_FINISHED_JOBS = 1000
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """最近邻法求分位数，q 取 0~1"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Job:
+    """一次抓取任务"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, url: str, want_markdown: bool = False):
+        self.id = next(self._ids)
+        self.url = url
+        self.want_markdown = want_markdown
+        self.status = 'queued'
+        self.result: Dict = {}
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.retried = False
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict:
+        data = {'id': self.id, 'url': self.url, 'status': self.status}
+        if self.started is not None:
+            data['queued_ms'] = round((self.started - self.submitted) * 1000, 1)
+        if self.finished is not None:
+            data['elapsed_ms'] = round((self.finished - self.started) * 1000, 1)
+            data['total_ms'] = round((self.finished - self.submitted) * 1000, 1)
+        data.update(self.result)
+        return data
+
+
+class ScraperDaemon:
+    """持有预热浏览器的抓取服务"""
+
+    def __init__(self, browsers: int = 1, max_pages: Optional[int] = DEFAULT_MAX_PAGES,
+                 max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB, deadline: Optional[float] = DEFAULT_DEADLINE,
+                 **scraper_options):
+        """
+        Args:
+            browsers: 预热的浏览器（工作线程）数量
+            max_pages: 同一浏览器处理的最大文章数，为None时不按页数回收
+            max_rss_mb: 浏览器进程树常驻内存上限（MB），为None时不按内存回收
+            deadline: 单篇文章期限（秒），为None时不启用看门狗
+            **scraper_options: 传给 JuejinScraper 的参数（index_path、dedup_path 等）
+        """
+        self.browsers = browsers
+        self.supervisor_options = {'max_pages': max_pages, 'max_rss_mb': max_rss_mb, 'deadline': deadline}
+        self.scraper_options = scraper_options
+        self.queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self.lock = threading.Lock()
+        # 未完成的任务全部保留；已完成的按完成顺序只保留最近 MAX_FINISHED_JOBS 个，
+        # 卡住的旧任务不会挡住已完成任务的清理
+        self.jobs: Dict[int, Job] = {}
+        self.finished: "OrderedDict[int, Job]" = OrderedDict()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.queued_latency: deque = deque(maxlen=LATENCY_WINDOW)
+        self.process_latency: deque = deque(maxlen=LATENCY_WINDOW)
+        self.total_latency: deque = deque(maxlen=LATENCY_WINDOW)
+        self.ready = 0
+        self.started = time.time()
+        self.threads: List[threading.Thread] = []
+        self.supervisors: List = []
+
+    def start(self) -> None:
+        """启动工作线程，每个线程启动并持有一个浏览器"""
+        for i in range(self.browsers):
+            thread = threading.Thread(target=self._worker, name=f"scraper-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self) -> None:
+        """等待已排队任务处理完毕，然后关闭全部浏览器"""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def submit(self, url: str, want_markdown: bool = False) -> Job:
+        """提交任务"""
+        job = Job(url, want_markdown)
+        with self.lock:
+            self.jobs[job.id] = job
+        self.queue.put(job)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id) or self.finished.get(job_id)
+
+    def _worker(self) -> None:
+        from .scraper import JuejinScraper
+        from .supervisor import BrowserSupervisor
+
+        scraper = JuejinScraper(keep_browser=True, **self.scraper_options)
+        supervisor = BrowserSupervisor(scraper, **self.supervisor_options)
+        with self.lock:
+            self.supervisors.append(supervisor)
+        try:
+            scraper.get_driver()
+            with self.lock:
+                self.ready += 1
+            print(f"🔥 {threading.current_thread().name} 浏览器已预热")
+        except Exception as e:
+            print(f"❌ {threading.current_thread().name} 浏览器启动失败：{e}")
+
+        try:
+            while True:
+                job = self.queue.get()
+                if job is None:
+                    break
+                self._run(supervisor, job)
+        finally:
+            scraper.finish()
+
+    def _run(self, supervisor, job: Job) -> None:
+        scraper = supervisor.scraper
+        job.started = time.time()
+        job.status = 'running'
+        with self.lock:
+            self.in_flight += 1
+
+        duplicates_before = len(scraper.duplicates)
+        hung = False
+        try:
+            save_path, hung = supervisor.run(job.url)
+            if save_path:
+                job.result['path'] = save_path
+                if job.want_markdown:
+                    with open(save_path, 'r', encoding='utf-8') as f:
+                        job.result['markdown'] = f.read()
+                job.status = 'done'
+            elif len(scraper.duplicates) > duplicates_before:
+                job.result['duplicate_of'] = scraper.duplicates[-1][1]
+                job.status = 'duplicate'
+            else:
+                job.status = 'failed'
+                if hung:
+                    job.result['error'] = "超时，浏览器已被看门狗重启"
+        except Exception as e:
+            job.result['error'] = str(e)
+            job.status = 'failed'
+
+        if hung and not job.retried:
+            # 被看门狗中断的任务重新排队一次，浏览器已由监管器丢弃，下次启动新浏览器
+            job.retried = True
+            job.status = 'queued'
+            job.result.pop('error', None)
+            with self.lock:
+                self.in_flight -= 1
+            self.queue.put(job)
+            return
+        job.finished = time.time()
+
+        with self.lock:
+            self.in_flight -= 1
+            if job.status == 'failed':
+                self.failed += 1
+            else:
+                self.completed += 1
+            self.queued_latency.append(job.started - job.submitted)
+            self.process_latency.append(job.finished - job.started)
+            self.total_latency.append(job.finished - job.submitted)
+            self.finished[job.id] = self.jobs.pop(job.id, job)
+            while len(self.finished) > MAX_FINISHED_JOBS:
+                self.finished.popitem(last=False)
+        job.done.set()
+
+    def stats(self) -> Dict:
+        """队列深度与延迟统计（毫秒）"""
+        def summarize(values) -> Dict:
+            values = list(values)
+            return {
+                'p50': _ms(percentile(values, 0.5)),
+                'p95': _ms(percentile(values, 0.95)),
+                'max': _ms(max(values) if values else None),
+            }
+
+        with self.lock:
+            return {
+                'uptime_s': round(time.time() - self.started, 1),
+                'browsers': self.browsers,
+                'browsers_ready': self.ready,
+                'queue_depth': self.queue.qsize(),
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'browser': {
+                    'recycled_pages': sum(s.counts['recycled_pages'] for s in self.supervisors),
+                    'recycled_rss': sum(s.counts['recycled_rss'] for s in self.supervisors),
+                    'hung': sum(s.counts['hung'] for s in self.supervisors),
+                    'peak_rss_mb': round(max((s.peak_rss_mb for s in self.supervisors), default=0.0), 1),
+                },
+                'latency_ms': {
+                    'queued': summarize(self.queued_latency),
+                    'processing': summarize(self.process_latency),
+                    'total': summarize(self.total_latency),
+                },
+            }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 接口，TCP 与 Unix socket 共用"""
+
+    server_version = "JuejinScraperDaemon/1.0"
+
+    @property
+    def daemon(self) -> ScraperDaemon:
+        return self.server.scraper_daemon
+
+    def address_string(self) -> str:
+        # Unix socket 的 client_address 不是 (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, data: Dict) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'ok': True})
+        elif self.path == '/stats':
+            self._send_json(200, self.daemon.stats())
+        elif self.path.startswith('/jobs/'):
+            try:
+                job = self.daemon.get_job(int(self.path[len('/jobs/'):]))
+            except ValueError:
+                job = None
+            if job is None:
+                self._send_json(404, {'error': '任务不存在'})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {'error': f'未知路径：{self.path}'})
+
+    def do_POST(self):
+        if self.path != '/scrape':
+            self._send_json(404, {'error': f'未知路径：{self.path}'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            url = payload['url']
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {'error': '请求体应为 {"url": "..."}'})
+            return
+
+        job = self.daemon.submit(url, bool(payload.get('markdown')))
+        if not payload.get('wait', True):
+            self._send_json(202, job.to_dict())
+            return
+        job.done.wait()
+        self._send_json(200 if job.status in ('done', 'duplicate') else 502, job.to_dict())
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """监听 Unix socket 的多线程 HTTP 服务"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+
+def serve(daemon: ScraperDaemon, socket_path: Optional[str] = None, host: str = '127.0.0.1',
+          port: Optional[int] = None) -> None:
+    """
+    启动服务，直到收到 SIGINT / SIGTERM
+
+    Args:
+        daemon: 抓取服务
+        socket_path: Unix socket 路径（与 port 二选一）
+        host: TCP 监听地址
+        port: TCP 端口
+    """
+    if port is not None:
+        server = ThreadingHTTPServer((host, port), DaemonRequestHandler)
+        where = f"http://{host}:{server.server_address[1]}"
+    else:
+        server = UnixHTTPServer(socket_path, DaemonRequestHandler)
+        where = socket_path
+    server.scraper_daemon = daemon
+
+    def shutdown(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, shutdown)
+    daemon.start()
+    print(f"🚀 抓取服务已启动：{where}（浏览器 {daemon.browsers} 个）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if port is None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("🛑 正在关闭浏览器...")
+        daemon.stop()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """通过 Unix socket 发送请求的 HTTPConnection"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(method: str, path: str, payload: Optional[Dict] = None, socket_path: Optional[str] = None,
+            host: str = '127.0.0.1', port: Optional[int] = None, timeout: Optional[float] = None) -> Dict:
+    """向抓取服务发送请求并返回 JSON 响应"""
+    if port is not None:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    else:
+        conn = UnixHTTPConnection(socket_path or DEFAULT_SOCKET_PATH, timeout=timeout)
+    try:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        conn.request(method, path, body=body, headers=headers)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="掘金文章抓取常驻服务")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help=f"Unix socket 路径（默认：{DEFAULT_SOCKET_PATH}）")
+    parser.add_argument('--host', default='127.0.0.1', help="TCP 监听/连接地址")
+    parser.add_argument('--port', type=int, default=None, help="使用 TCP 端口而不是 Unix socket")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="启动服务")
+    serve_parser.add_argument('--browsers', type=int, default=1, help="预热的浏览器数量")
+    serve_parser.add_argument('--max-comments', type=int, default=10, help="最大评论数量")
+    serve_parser.add_argument('--max-replies', type=int, default=5, help="每条评论下最大回复数量")
+    serve_parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH, default=None, metavar='DB',
+                              help="保存后更新全文索引")
+    serve_parser.add_argument('--dedup', nargs='?', const=DEFAULT_DEDUP_PATH, default=None, metavar='DB',
+                              help="跳过与已保存文章近似重复的文章")
+    serve_parser.add_argument('--snapshot-dir', metavar='DIR', default=None, help="保存每篇文章的原始快照")
+    serve_parser.add_argument('--blob-dir', metavar='DIR', default=None, help="快照写入内容寻址存储")
+    serve_parser.add_argument('--output-dir', metavar='DIR', default=None,
+                              help="按文章ID分片保存到该目录并维护索引（默认保存到主目录）")
+    serve_parser.add_argument('--export-dir', metavar='DIR', default=None,
+                              help="按批导出文章统计、评论与回复为列式文件")
+    serve_parser.add_argument('--browser-profile', metavar='DIR', default=None,
+                              help="每个浏览器使用该目录下独占的持久化配置（worker-N）")
+    serve_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB, metavar='MB',
+                              help="每个持久化配置的磁盘缓存预算")
+    serve_parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES, metavar='N',
+                              help=f"同一浏览器处理 N 篇后重启（默认 {DEFAULT_MAX_PAGES}，0 关闭）")
+    serve_parser.add_argument('--max-rss', type=float, default=DEFAULT_MAX_RSS_MB, metavar='MB',
+                              help=f"浏览器进程树内存超过该值时重启（默认 {DEFAULT_MAX_RSS_MB}，0 关闭）")
+    serve_parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE, metavar='SECONDS',
+                              help=f"单篇文章超过该时长强制重启浏览器，任务重试一次（默认 {DEFAULT_DEADLINE}，0 关闭）")
+
+    submit_parser = subparsers.add_parser('submit', help="提交文章并等待结果")
+    submit_parser.add_argument('urls', nargs='+', metavar='URL', help="文章URL")
+    submit_parser.add_argument('--markdown', action='store_true', help="输出 Markdown 全文而不是保存路径")
+    submit_parser.add_argument('--no-wait', action='store_true', help="只提交，不等待结果")
+
+    subparsers.add_parser('stats', help="查看队列与延迟统计")
+
+    args = parser.parse_args()
+    connection = {'socket_path': args.socket, 'host': args.host, 'port': args.port}
+
+    if args.command == 'serve':
+        daemon = ScraperDaemon(browsers=args.browsers, max_pages=args.max_pages or None,
+                               max_rss_mb=args.max_rss or None, deadline=args.deadline or None,
+                               headless=True, max_comments=args.max_comments,
+                               max_replies=args.max_replies, index_path=args.index, dedup_path=args.dedup,
+                               snapshot_dir=args.snapshot_dir, blob_dir=args.blob_dir,
+                               browser_profile=args.browser_profile, cache_size_mb=args.cache_size,
+                               output_dir=args.output_dir, export_dir=args.export_dir)
+        serve(daemon, socket_path=args.socket, host=args.host, port=args.port)
+        return
+
+    try:
+        if args.command == 'stats':
+            print(json.dumps(request('GET', '/stats', **connection), ensure_ascii=False, indent=2))
+            return
+
+        failed = 0
+        for url in args.urls:
+            result = request('POST', '/scrape', {'url': url, 'markdown': args.markdown, 'wait': not args.no_wait},
+                             **connection)
+            if args.markdown and 'markdown' in result:
+                print(result['markdown'])
+            elif result.get('status') == 'done':
+                print(f"✅ {result['path']}（{result['total_ms']}ms）")
+            elif result.get('status') == 'duplicate':
+                print(f"⏭️ 近似重复：{url} ≈ {result['duplicate_of']}")
+            elif result.get('status') == 'queued':
+                print(f"📥 已提交任务 {result['id']}：{url}")
+            else:
+                failed += 1
+                print(f"❌ 处理失败：{url} {result.get('error', '')}")
+        sys.exit(1 if failed else 0)
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"❌ 无法连接抓取服务：{e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
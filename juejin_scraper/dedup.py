@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+掘金文章近似重复检测
+功能：
+1. 对 markdown_content 计算 64 位 SimHash 指纹
+2. 指纹按分段（band）存入 SQLite LSH 索引，查询只需比较同桶候选，无需全表扫描
+3. 抓取时在加载评论之前检测近似重复，命中则跳过
+4. 输出近似重复文章的聚类报告
+
+原理：汉明距离 ≤ 3 的两个 64 位指纹，按 4 段各 16 位切分后至少有一段完全相同（抽屉原理），
+因此只需在同一段的桶内查找候选。
+
+使用方法：
+    python -m juejin_scraper.dedup rebuild <目录> [--recursive]
+    python -m juejin_scraper.dedup report [--threshold N]
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .config import DEFAULT_DEDUP_PATH
+from .search_index import iter_markdown_files, parse_saved_markdown
+
+
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+DEFAULT_THRESHOLD = BANDS - 1
+SHINGLE_SIZE = 4
+
+_MARKDOWN_NOISE = re.compile(r'!\[[^\]]*\]\([^)]*\)|\]\([^)]*\)|[#>*`_\-|\[\]()\s]+')
+
+
+def normalize_text(markdown_content: str) -> str:
+    """去掉Markdown标记、链接地址和空白，只保留正文字符"""
+    return _MARKDOWN_NOISE.sub("", markdown_content).lower()
+
+
+def simhash(markdown_content: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """
+    计算文本的 64 位 SimHash
+
+    Args:
+        markdown_content: Markdown 正文
+        shingle_size: 字符分片长度（中文无空格分词，按字符切片）
+
+    Returns:
+        64 位无符号整数指纹
+    """
+    text = normalize_text(markdown_content)
+    if len(text) < shingle_size:
+        shingles = Counter([text]) if text else Counter()
+    else:
+        shingles = Counter(text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1))
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """计算两个指纹的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER 为有符号 64 位，存储前转换"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    return [(band, fingerprint >> (band * BAND_BITS) & BAND_MASK) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """基于 SimHash + LSH 分段的近似重复索引"""
+
+    def __init__(self, db_path: str = DEFAULT_DEDUP_PATH, threshold: int = DEFAULT_THRESHOLD):
+        """
+        初始化索引
+
+        Args:
+            db_path: 索引数据库路径
+            threshold: 判定为近似重复的最大汉明距离（不超过 BANDS-1 时可保证召回）
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.threshold = threshold
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                doc_key TEXT PRIMARY KEY,
+                title TEXT,
+                path TEXT,
+                simhash INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_key TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_bands_bucket ON bands (band, bucket)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_bands_doc ON bands (doc_key)")
+        self.conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def find_similar(self, fingerprint: int, exclude_key: Optional[str] = None) -> List[Dict]:
+        """
+        查找近似重复文章
+
+        Args:
+            fingerprint: 待检测文章的指纹
+            exclude_key: 排除的文档键（通常为文章自身URL）
+
+        Returns:
+            按汉明距离升序排列的候选列表
+        """
+        candidates = {}
+        for band, bucket in _bands(fingerprint):
+            rows = self.conn.execute("""
+                SELECT f.doc_key, f.title, f.path, f.simhash
+                FROM bands b JOIN fingerprints f ON f.doc_key = b.doc_key
+                WHERE b.band = ? AND b.bucket = ?
+            """, (band, bucket))
+            for doc_key, title, path, stored in rows:
+                if doc_key != exclude_key:
+                    candidates[doc_key] = (title, path, _to_unsigned(stored))
+
+        matches = []
+        for doc_key, (title, path, stored) in candidates.items():
+            distance = hamming_distance(fingerprint, stored)
+            if distance <= self.threshold:
+                matches.append({'doc_key': doc_key, 'title': title, 'path': path, 'distance': distance})
+        return sorted(matches, key=lambda x: x['distance'])
+
+    def add(self, doc_key: str, fingerprint: int, title: str = "", path: str = "") -> None:
+        """写入（或替换）文章指纹"""
+        self.conn.execute("DELETE FROM bands WHERE doc_key = ?", (doc_key,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (doc_key, title, path, simhash) VALUES (?, ?, ?, ?)",
+            (doc_key, title, path, _to_signed(fingerprint))
+        )
+        self.conn.executemany(
+            "INSERT INTO bands (band, bucket, doc_key) VALUES (?, ?, ?)",
+            [(band, bucket, doc_key) for band, bucket in _bands(fingerprint)]
+        )
+        self.conn.commit()
+
+    def clusters(self) -> List[List[Dict]]:
+        """
+        对全部指纹做近似重复聚类（并查集）
+
+        Returns:
+            每个聚类为一组文章信息，只返回包含 2 篇及以上的聚类
+        """
+        parent = {}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        docs = {}
+        for doc_key, title, path, stored in self.conn.execute(
+                "SELECT doc_key, title, path, simhash FROM fingerprints"):
+            docs[doc_key] = {'doc_key': doc_key, 'title': title, 'path': path,
+                             'simhash': _to_unsigned(stored)}
+            parent[doc_key] = doc_key
+
+        # 只比较共享至少一个桶的文档对
+        buckets = defaultdict(list)
+        for band, bucket, doc_key in self.conn.execute("SELECT band, bucket, doc_key FROM bands"):
+            if doc_key in docs:
+                buckets[(band, bucket)].append(doc_key)
+
+        for members in buckets.values():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if find(a) != find(b) and \
+                            hamming_distance(docs[a]['simhash'], docs[b]['simhash']) <= self.threshold:
+                        parent[find(a)] = find(b)
+
+        groups = defaultdict(list)
+        for doc_key in docs:
+            groups[find(doc_key)].append(docs[doc_key])
+        return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+    def rebuild(self, root: str, recursive: bool = False) -> int:
+        """扫描已保存的文章目录重建指纹。返回写入的文章数"""
+        count = 0
+        for path in iter_markdown_files(os.path.expanduser(root), recursive):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    fields = parse_saved_markdown(f.read())
+            except (OSError, UnicodeDecodeError):
+                continue
+            if fields is None:
+                continue
+            self.add(fields['url'] or os.path.abspath(path), simhash(fields['body']),
+                     fields['title'], os.path.abspath(path))
+            count += 1
+        return count
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="掘金文章近似重复检测")
+    parser.add_argument('--db', default=DEFAULT_DEDUP_PATH, help="指纹数据库路径")
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD, help="最大汉明距离")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="扫描目录重建指纹")
+    rebuild_parser.add_argument('root', nargs='?', default="~", help="文章目录，默认为用户主目录")
+    rebuild_parser.add_argument('--recursive', action='store_true', help="递归扫描子目录")
+
+    subparsers.add_parser('report', help="输出近似重复聚类报告")
+
+    args = parser.parse_args()
+    index = NearDuplicateIndex(args.db, threshold=args.threshold)
+
+    try:
+        if args.command == 'rebuild':
+            count = index.rebuild(args.root, recursive=args.recursive)
+            print(f"✅ 已写入 {count} 篇文章指纹")
+        else:
+            clusters = index.clusters()
+            if not clusters:
+                print("没有发现近似重复文章")
+                return
+            print(f"发现 {len(clusters)} 组近似重复文章：")
+            for i, cluster in enumerate(clusters, 1):
+                print(f"\n[{i}] 共 {len(cluster)} 篇")
+                for doc in cluster:
+                    print(f"  - {doc['title']}  {doc['doc_key']}")
+                    if doc['path']:
+                        print(f"    {doc['path']}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+掘金文章 DOM -> Markdown 直接转换
+功能：
+1. 在已解析的 BeautifulSoup 树上就地完成代码块清理（删除 code-block-extension-header、
+   将 <code> 内容移入 <pre>），只遍历一次
+2. 直接把 #article-root 节点交给 html_to_markdown 转换，不再 str() 序列化后重新解析
+
+输出与原先的 html_to_markdown.markdownify(str(article_container)) 一致。
+省掉的是一次序列化与重新解析，收益主要在内存峰值；计入页面解析的整体耗时基本持平，
+只计转换步骤的对比见 benchmarks/bench_markdown.py。
+"""
+
+import html_to_markdown
+from bs4 import Tag
+
+
+CODE_BLOCK_HEADER_CLASS = "code-block-extension-header"
+
+
+def normalize_code_blocks(article_container: Tag) -> None:
+    """
+    清理代码块装饰元素
+
+    Args:
+        article_container: 文章根节点（会被就地修改）
+    """
+    for tag in article_container.find_all(['div', 'pre']):
+        if tag.decomposed:
+            continue
+        if tag.name == 'div':
+            # Remove decorative code block elements
+            if CODE_BLOCK_HEADER_CLASS in (tag.get('class') or ()):
+                tag.decompose()
+        elif tag.code:
+            # Move code from <code> to <pre> to avoid extra newlines
+            tag.string = tag.code.get_text().strip()
+
+
+def article_to_markdown(article_container: Tag) -> str:
+    """
+    将已解析的文章节点转换为Markdown
+
+    Args:
+        article_container: soup.find(id='article-root') 得到的节点（会被就地修改）
+
+    Returns:
+        Markdown 文本
+    """
+    normalize_code_blocks(article_container)
+    return html_to_markdown.markdownify(article_container)
+
+
+def legacy_article_to_markdown(article_container: Tag) -> str:
+    """原先的 清理 -> 序列化 -> 重新解析 流程，仅用于对比测试"""
+    for header in article_container.find_all("div", class_=CODE_BLOCK_HEADER_CLASS):
+        header.decompose()
+    for pre in article_container.find_all('pre'):
+        if pre.code:
+            pre.string = pre.code.get_text().strip()
+    return html_to_markdown.markdownify(str(article_container))
@@ -0,0 +1,547 @@
+# -*- coding: utf-8 -*-
+"""
+本地掘金页面模拟服务
+功能：
+1. 按文章ID确定性地生成与掘金相同 DOM 结构的文章页：#article-root 正文（标题、列表、带
+   code-block-extension 装饰的代码块、表格、图片）、.panel-btn.with-badge 统计按钮、作者链接与发表时间
+2. 评论由页面脚本异步加载：.comment-card.comment-item 分页返回，.fetch-more-comment 加载下一页，
+   .reply-btn 点击后加载子评论（.reply-item）
+3. 可配置评论数、每页评论数、每条评论的回复数、正文长度；评论按最新在前排列，
+   评论ID随评论数递增，调大评论数即模拟文章新增了评论
+4. 可注入延迟（页面与接口分别设置，带随机抖动）与错误（按比例返回 500）
+5. /stats 返回各类请求数与注入的错误数，供基准统计
+6. sitemap 索引、gzip 压缩的子 sitemap 与 RSS 订阅源，文章 lastmod 按编号每篇递增一小时（自 2024-01-01 起）
+7. 作者与评论者带主页链接，用户ID由用户名决定（同一用户在各文章中相同），资料接口与掘金 user_api 格式相同
+
+不依赖第三方库，压测与端到端基准无需访问 juejin.cn，页面也不会随时间变化。
+
+接口：
+    GET /                          文章列表
+    GET /post/<id>                 文章页
+    GET /api/comments/<id>?cursor=N  一页评论（JSON：html / cursor / has_more）
+    GET /api/replies/<id>/<评论ID>  评论的全部回复（JSON：html）
+    GET /user_api/v1/user/get?user_id=N  用户资料（JSON：err_no / data）
+    GET /img/<名称>.png            文章图片
+    GET /sitemap.xml               sitemap 索引
+    GET /sitemaps/posts-<N>.xml.gz 第 N 个子 sitemap（gzip）
+    GET /feed.xml                  最新文章的 RSS 订阅源
+    GET /stats                     请求统计
+
+使用方法：
+    python -m juejin_scraper.fixture_server [--port 8765] [--articles 100] [--comments 30] [--page-size 10]
+        [--replies 3] [--paragraphs 20] [--latency MS] [--api-latency MS] [--jitter 0.2] [--error-rate 0.05]
+        [--sitemap-size 50000]
+"""
+
+import argparse
+import gzip
+import html
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+# 1x1 透明 PNG
+PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000a49444154789c6300010000050001"
+    "0d0a2db40000000049454e44ae426082"
+)
+
+TOPICS = ["事件循环", "虚拟列表", "React 渲染优化", "Rust 所有权", "Go 调度器", "SQLite 索引",
+          "HTTP/2 多路复用", "WebAssembly", "Vue 响应式原理", "TCP 拥塞控制"]
+WORDS = ["性能", "缓存", "线程", "内存", "索引", "队列", "渲染", "调度", "协议", "编译",
+         "函数", "组件", "请求", "延迟", "吞吐", "并发", "数据", "结构", "算法", "优化"]
+USERS = ["前端小王", "路人甲", "码农老李", "掘友8848", "后端张三", "架构师阿强", "摸鱼选手", "Rustacean"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8">
+<title>{title} - 掘金</title>
+<meta name="description" content="{title}">
+</head>
+<body>
+<div id="juejin">
+<header class="main-header"><nav class="main-nav"><ul class="nav-list"><li class="nav-item"><a href="/">首页</a></li></ul></nav></header>
+<main class="main-container">
+<div class="main-area article-area">
+<article class="article">
+<h1 class="article-title">{title}</h1>
+<div class="author-info-block">
+<div class="author-name"><a href="/user/{user_id}/posts" class="username"><span class="name">{author}</span></a></div>
+<div class="meta-box"><time class="time" datetime="{published}T10:00:00.000Z">{published}</time><span class="views-count">阅读 {views}</span><span class="read-time">阅读{read_minutes}分钟</span></div>
+</div>
+<div id="article-root" class="article-viewer markdown-body">
+<div class="markdown-body">
+{body}
+</div>
+</div>
+<div class="column-container"><span class="column-name">{column}</span></div>
+</article>
+<div class="article-suspended-panel">
+<div class="panel-btn with-badge" badge="{likes}"><svg class="icon-zan"></svg></div>
+<div class="panel-btn with-badge" badge="{comments}"><svg class="icon-comment"></svg></div>
+<div class="panel-btn with-badge" badge="{collects}"><svg class="icon-collect"></svg></div>
+</div>
+<div class="comment-list-box">
+<div class="comment-list"></div>
+<button class="fetch-more-comment" style="display:none">查看更多评论</button>
+</div>
+</div>
+<aside class="sidebar"><div class="sidebar-block recommend-block"><div class="recommend-title">相关文章</div><ul>{related}</ul></div></aside>
+</main>
+</div>
+<script>
+(function () {{
+    const postId = "{post_id}";
+    const list = document.querySelector('.comment-list');
+    const more = document.querySelector('.fetch-more-comment');
+    let cursor = 0;
+    function loadComments() {{
+        more.disabled = true;
+        fetch('/api/comments/' + postId + '?cursor=' + cursor)
+            .then(r => r.ok ? r.json() : Promise.reject(r.status))
+            .then(data => {{
+                list.insertAdjacentHTML('beforeend', data.html);
+                cursor = data.cursor;
+                more.style.display = data.has_more ? '' : 'none';
+            }})
+            .catch(() => {{ more.style.display = ''; }})
+            .finally(() => {{ more.disabled = false; }});
+    }}
+    more.addEventListener('click', loadComments);
+    list.addEventListener('click', event => {{
+        const button = event.target.closest('.reply-btn');
+        if (!button || button.dataset.loaded) return;
+        button.dataset.loaded = '1';
+        fetch('/api/replies/' + postId + '/' + button.dataset.commentId)
+            .then(r => r.ok ? r.json() : Promise.reject(r.status))
+            .then(data => button.closest('.comment-card').querySelector('.sub-comment-list')
+                .insertAdjacentHTML('beforeend', data.html))
+            .catch(() => {{ delete button.dataset.loaded; }});
+    }});
+    document.addEventListener('DOMContentLoaded', loadComments);
+}})();
+</script>
+</body>
+</html>
+"""
+
+CODE_TEMPLATE = (
+    '<pre><div class="code-block-extension-header"><div class="code-block-extension-headerLeft">'
+    '<span class="code-block-extension-lang">{lang}</span></div><div class="code-block-extension-headerRight">'
+    '<div class="code-block-extension-copyCodeBtn">复制代码</div></div></div>'
+    '<code class="hljs language-{lang}" lang="{lang}">{lines}</code></pre>'
+)
+
+
+class FixtureSite:
+    """确定性生成文章页、评论与回复（同一文章ID每次生成的内容相同）"""
+
+    # 第 1 篇文章的 lastmod（2024-01-01 00:00 UTC）
+    LASTMOD_EPOCH = 1704067200
+
+    def __init__(self, articles: int = 100, comments: int = 30, page_size: int = 10, replies: int = 3,
+                 paragraphs: int = 20, seed: int = 0, sitemap_size: int = 50000):
+        """
+        Args:
+            articles: 文章列表中的文章数（文章页接受任意数字ID）
+            comments: 每篇文章的评论数
+            page_size: 每次加载的评论数
+            replies: 每条评论的回复数
+            paragraphs: 正文段落数，控制正文长度
+            seed: 随机种子
+            sitemap_size: 每个子 sitemap 的URL数
+        """
+        self.articles = articles
+        self.sitemap_size = max(1, sitemap_size)
+        self.comments = comments
+        self.page_size = max(1, page_size)
+        self.replies = replies
+        self.paragraphs = paragraphs
+        self.seed = seed
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(f"{self.seed}:" + ":".join(map(str, key)))
+
+    @staticmethod
+    def user_id(name: str) -> int:
+        """用户ID（由用户名决定）"""
+        return 1_000_000_000 + USERS.index(name)
+
+    def user_profile(self, user_id: int) -> Dict:
+        """用户资料，与掘金 user_api 的响应格式相同；未知用户 err_no 非 0"""
+        index = user_id - 1_000_000_000
+        if not 0 <= index < len(USERS):
+            return {'err_no': 404, 'err_msg': '用户不存在', 'data': None}
+        rng = self._rng("user", user_id)
+        return {'err_no': 0, 'err_msg': 'success', 'data': {
+            'user_id': str(user_id), 'user_name': USERS[index], 'level': rng.randint(1, 8),
+            'follower_count': rng.randint(0, 50000), 'followee_count': rng.randint(0, 500),
+            'post_article_count': rng.randint(0, 300), 'got_digg_count': rng.randint(0, 100000),
+            'got_view_count': rng.randint(0, 5000000), 'description': self._sentence(rng, 8),
+            'job_title': rng.choice(['前端工程师', '后端工程师', '架构师', '']), 'company': '',
+        }}
+
+    @staticmethod
+    def post_id(number: int) -> str:
+        """第 number 篇文章（从 1 开始）的ID"""
+        return str(7_000_000_000_000_000_000 + number)
+
+    @classmethod
+    def post_ids(cls, count: int) -> List[str]:
+        return [cls.post_id(i) for i in range(1, count + 1)]
+
+    def lastmod(self, number: int) -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(self.LASTMOD_EPOCH + number * 3600))
+
+    @property
+    def sitemap_count(self) -> int:
+        return (self.articles + self.sitemap_size - 1) // self.sitemap_size
+
+    def sitemap_index(self, base_url: str) -> str:
+        """sitemap 索引，子 sitemap 的 lastmod 为其中最新文章的 lastmod"""
+        entries = "".join(
+            f"<sitemap><loc>{base_url}/sitemaps/posts-{n}.xml.gz</loc>"
+            f"<lastmod>{self.lastmod(min(self.articles, (n + 1) * self.sitemap_size))}</lastmod></sitemap>"
+            for n in range(self.sitemap_count)
+        )
+        return (f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>')
+
+    def sitemap(self, base_url: str, n: int) -> Optional[bytes]:
+        """第 n 个子 sitemap（gzip 压缩），不存在时返回None"""
+        if not 0 <= n < self.sitemap_count:
+            return None
+        first = n * self.sitemap_size + 1
+        last = min(self.articles, (n + 1) * self.sitemap_size)
+        entries = "".join(f"<url><loc>{base_url}/post/{self.post_id(i)}</loc><lastmod>{self.lastmod(i)}</lastmod>"
+                          f"<changefreq>weekly</changefreq></url>" for i in range(first, last + 1))
+        document = (f'<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>')
+        return gzip.compress(document.encode('utf-8'), compresslevel=5)
+
+    def feed(self, base_url: str, count: int = 20) -> str:
+        """最新 count 篇文章的 RSS 订阅源"""
+        items = "".join(
+            f"<item><title>文章 {self.post_id(i)}</title><link>{base_url}/post/{self.post_id(i)}</link>"
+            f"<pubDate>{time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(self.LASTMOD_EPOCH + i * 3600))}"
+            f"</pubDate></item>"
+            for i in range(self.articles, max(0, self.articles - count), -1)
+        )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>模拟掘金</title>'
+                f'<link>{base_url}/</link>{items}</channel></rss>')
+
+    def _sentence(self, rng: random.Random, words: int = 12) -> str:
+        return "".join(rng.choice(WORDS) for _ in range(words)) + "。"
+
+    def _body(self, post_id: str, rng: random.Random) -> str:
+        parts = []
+        for i in range(self.paragraphs):
+            if i % 5 == 0:
+                parts.append(f'<h2 data-id="heading-{i // 5}">{rng.choice(TOPICS)}：{rng.choice(WORDS)}</h2>')
+            kind = rng.random()
+            if kind < 0.15:
+                lines = "\n".join(
+                    f'<span class="code-block-extension-codeLine" data-line-num="{n + 1}">'
+                    f'{html.escape(f"const {rng.choice(WORDS)}{n} = await load({n}) && {n} > 0;")}</span>'
+                    for n in range(rng.randint(3, 12))
+                )
+                parts.append(CODE_TEMPLATE.format(lang=rng.choice(["javascript", "python", "go"]), lines=lines))
+            elif kind < 0.25:
+                items = "".join(f"<li><code>{rng.choice(WORDS)}</code> {self._sentence(rng, 6)}</li>"
+                                for _ in range(rng.randint(2, 6)))
+                parts.append(f"<ul>{items}</ul>")
+            elif kind < 0.3:
+                rows = "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(1, 999)}ms</td></tr>"
+                               for _ in range(rng.randint(2, 5)))
+                parts.append(f"<table><thead><tr><th>阶段</th><th>耗时</th></tr></thead><tbody>{rows}</tbody></table>")
+            elif kind < 0.35:
+                parts.append(f'<p><img src="/img/{post_id}-{i}.png" alt="{rng.choice(WORDS)}"></p>')
+            else:
+                parts.append(f"<p>{self._sentence(rng, rng.randint(20, 60))}<strong>{rng.choice(WORDS)}</strong>"
+                             f"{self._sentence(rng)}</p>")
+        return "\n".join(parts)
+
+    def article_page(self, post_id: str) -> str:
+        """生成文章页HTML"""
+        rng = self._rng("post", post_id)
+        title = f"{rng.choice(TOPICS)}实战：{rng.choice(WORDS)}与{rng.choice(WORDS)}（#{post_id[-6:]}）"
+        related = "".join(f'<li><a href="/post/{pid}">相关文章 {pid[-4:]}</a></li>'
+                          for pid in self.post_ids(min(self.articles, 5)))
+        published = time.strftime("%Y-%m-%d", time.gmtime(1_600_000_000 + rng.randint(0, 5 * 365) * 86400))
+        author = rng.choice(USERS)
+        return PAGE_TEMPLATE.format(
+            title=html.escape(title), post_id=post_id, user_id=self.user_id(author),
+            author=author, published=published, views=rng.randint(100, 100000),
+            read_minutes=max(1, self.paragraphs // 4), body=self._body(post_id, rng),
+            column=f"专栏：{rng.choice(TOPICS)}", likes=rng.randint(0, 2000), comments=self.comments,
+            collects=rng.randint(0, 3000), related=related,
+        )
+
+    def comment_page(self, post_id: str, cursor: int) -> Dict:
+        """一页评论（最新在前）：{'html', 'cursor'(下一页游标), 'has_more'}"""
+        end = min(self.comments, cursor + self.page_size)
+        cards = []
+        for position in range(cursor, end):
+            index = self.comments - 1 - position
+            rng = self._rng("comment", post_id, index)
+            author = rng.choice(USERS)
+            reply_button = (f'<span class="reply-btn" data-comment-id="{index}" data-replies="{self.replies}">'
+                            f'{self.replies}</span>') if self.replies else ""
+            cards.append(
+                f'<div class="comment-card comment-item" data-comment-id="{index}">'
+                f'<a href="/user/{self.user_id(author)}" class="username"><span class="name">{author}</span></a>'
+                f'<div class="comment-content"><div class="content">{self._sentence(rng, rng.randint(5, 30))}</div></div>'
+                f'<span class="time">{rng.randint(1, 30)}天前</span>'
+                f'<span class="like-btn" data-likes="{rng.randint(0, 99)}">{rng.randint(0, 99)}</span>'
+                f'{reply_button}<div class="sub-comment-list"></div></div>'
+            )
+        return {'html': "".join(cards), 'cursor': end, 'has_more': end < self.comments}
+
+    def reply_list(self, post_id: str, comment_id: int) -> Dict:
+        """评论的全部回复：{'html'}"""
+        items = []
+        for index in range(self.replies):
+            rng = self._rng("reply", post_id, comment_id, index)
+            items.append(
+                f'<div class="reply-item"><span class="reply-author">{rng.choice(USERS)}</span>'
+                f'<div class="reply-content">{self._sentence(rng, rng.randint(3, 15))}</div>'
+                f'<span class="reply-time">{rng.randint(1, 23)}小时前</span>'
+                f'<span class="digg-btn">{rng.randint(0, 20)}</span></div>'
+            )
+        return {'html': "".join(items)}
+
+    def index_page(self) -> str:
+        links = "".join(f'<li><a href="/post/{pid}">文章 {pid}</a></li>'
+                        for pid in self.post_ids(self.articles))
+        return f'<!DOCTYPE html><html lang="zh"><head><meta charset="utf-8"><title>文章列表</title></head><body><ul>{links}</ul></body></html>'
+
+
+class FaultInjector:
+    """按配置注入延迟与错误"""
+
+    def __init__(self, latency_ms: float = 0, api_latency_ms: float = 0, jitter: float = 0.2,
+                 error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            latency_ms: 文章页响应延迟
+            api_latency_ms: 评论/回复接口响应延迟
+            jitter: 延迟的随机抖动比例（0.2 表示 ±20%）
+            error_rate: 返回 500 的请求比例（文章页与接口）
+            seed: 随机种子
+        """
+        self.latency_ms = latency_ms
+        self.api_latency_ms = api_latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def apply(self, api: bool) -> bool:
+        """按配置等待，返回本次请求是否应失败"""
+        base = self.api_latency_ms if api else self.latency_ms
+        with self.lock:
+            delay = base * (1 + self.rng.uniform(-self.jitter, self.jitter)) if base else 0
+            fail = self.rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """模拟服务的 HTTP 接口"""
+
+    server_version = "JuejinFixture/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            print(f"🌐 {self.client_address[0]} {format % args}")
+
+    def _send(self, status: int, body: bytes, content_type: str, cache: bool = False) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cache:
+            self.send_header('Cache-Control', 'public, max-age=86400')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: Dict) -> None:
+        self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def _send_html(self, text: str) -> None:
+        self._send(200, text.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path
+        site: FixtureSite = self.server.site
+
+        if path == '/stats':
+            self._send_json(200, self.server.stats())
+            return
+        if path.startswith('/img/'):
+            self.server.count('image')
+            self._send(200, PIXEL_PNG, 'image/png', cache=True)
+            return
+        if path in ('/', '/index.html'):
+            self.server.count('index')
+            self._send_html(site.index_page())
+            return
+        if path == '/sitemap.xml':
+            self.server.count('sitemap')
+            self._send(200, site.sitemap_index(self.server.base_url).encode('utf-8'), 'application/xml')
+            return
+        if path == '/feed.xml':
+            self.server.count('feed')
+            self._send(200, site.feed(self.server.base_url).encode('utf-8'), 'application/rss+xml; charset=utf-8')
+            return
+
+        route = self.server.match(path)
+        if route is None:
+            self._send_json(404, {'error': f'未知路径：{path}'})
+            return
+        kind, groups = route
+        self.server.count(kind)
+        if self.server.faults.apply(api=kind not in ('post', 'sitemap')):
+            self.server.count('error')
+            self._send_json(500, {'error': '注入的错误'})
+            return
+
+        if kind == 'post':
+            self._send_html(site.article_page(groups[0]))
+        elif kind == 'sitemap':
+            body = site.sitemap(self.server.base_url, int(groups[0]))
+            if body is None:
+                self._send_json(404, {'error': f'没有该 sitemap：{path}'})
+            else:
+                self._send(200, body, 'application/gzip')
+        elif kind == 'user':
+            try:
+                user_id = int(parse_qs(parts.query).get('user_id', ['0'])[0])
+            except ValueError:
+                user_id = 0
+            self._send_json(200, site.user_profile(user_id))
+        elif kind == 'comments':
+            try:
+                cursor = max(0, int(parse_qs(parts.query).get('cursor', ['0'])[0]))
+            except ValueError:
+                cursor = 0
+            self._send_json(200, site.comment_page(groups[0], cursor))
+        else:
+            self._send_json(200, site.reply_list(groups[0], int(groups[1])))
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """本地模拟服务"""
+
+    daemon_threads = True
+    ROUTES = [
+        ('post', re.compile(r'^/post/(\d+)/?$')),
+        ('comments', re.compile(r'^/api/comments/(\d+)$')),
+        ('replies', re.compile(r'^/api/replies/(\d+)/(\d+)$')),
+        ('sitemap', re.compile(r'^/sitemaps/posts-(\d+)\.xml\.gz$')),
+        ('user', re.compile(r'^/user_api/v1/user/get$')),
+    ]
+
+    def __init__(self, site: FixtureSite, faults: Optional[FaultInjector] = None,
+                 host: str = '127.0.0.1', port: int = 0, verbose: bool = False):
+        """
+        Args:
+            site: 页面生成器
+            faults: 延迟与错误注入，为None时不注入
+            host: 监听地址
+            port: 监听端口，0 表示随机可用端口
+            verbose: 是否打印每个请求
+        """
+        super().__init__((host, port), FixtureRequestHandler)
+        self.site = site
+        self.faults = faults or FaultInjector()
+        self.verbose = verbose
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def article_urls(self, count: Optional[int] = None) -> List[str]:
+        return [f"{self.base_url}/post/{pid}" for pid in self.site.post_ids(count or self.site.articles)]
+
+    def match(self, path: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        for kind, pattern in self.ROUTES:
+            m = pattern.match(path)
+            if m:
+                return kind, m.groups()
+        return None
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self._counts[kind] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def start(self) -> 'FixtureServer':
+        """在后台线程中运行"""
+        self._thread = threading.Thread(target=self.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地掘金页面模拟服务")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=8765, help="监听端口")
+    parser.add_argument('--articles', type=int, default=100, help="文章列表中的文章数")
+    parser.add_argument('--comments', type=int, default=30, help="每篇文章的评论数")
+    parser.add_argument('--page-size', type=int, default=10, help="每次加载的评论数")
+    parser.add_argument('--replies', type=int, default=3, help="每条评论的回复数")
+    parser.add_argument('--paragraphs', type=int, default=20, help="正文段落数")
+    parser.add_argument('--latency', type=float, default=0, metavar='MS', help="文章页响应延迟")
+    parser.add_argument('--api-latency', type=float, default=0, metavar='MS', help="评论/回复接口响应延迟")
+    parser.add_argument('--jitter', type=float, default=0.2, help="延迟抖动比例")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="返回 500 的请求比例")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--sitemap-size', type=int, default=50000, help="每个子 sitemap 的URL数")
+    parser.add_argument('--verbose', action='store_true', help="打印每个请求")
+    args = parser.parse_args()
+
+    site = FixtureSite(articles=args.articles, comments=args.comments, page_size=args.page_size,
+                       replies=args.replies, paragraphs=args.paragraphs, seed=args.seed,
+                       sitemap_size=args.sitemap_size)
+    faults = FaultInjector(latency_ms=args.latency, api_latency_ms=args.api_latency, jitter=args.jitter,
+                           error_rate=args.error_rate, seed=args.seed)
+    server = FixtureServer(site, faults, host=args.host, port=args.port, verbose=args.verbose)
+    print(f"🚀 模拟服务已启动：{server.base_url}（{args.articles} 篇文章，每篇 {args.comments} 条评论）")
+    print(f"   示例文章：{server.article_urls(1)[0]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("👋 模拟服务已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+URL 前沿（frontier）
+功能：
+1. 规范化：按站点适配器把同一篇文章的各种URL（查询参数、跟踪参数、锚点、旧域名）归一为文章ID与规范URL，
+   未识别的站点按通用规则归一（见 sites.base.normalize_url）
+2. 已见集合：SQLite 表保存全部已见文章ID（权威结果），前面是保存在内存映射文件中的布隆过滤器；
+   过滤器判定"不存在"的URL（新URL的绝大多数）不查询数据库，判定"可能存在"时再查表确认，
+   内存占用固定（默认容量 1000 万、误判率 0.1% 时约 17 MB，由操作系统按页换入换出）
+3. 优先级：按来源（手动 > 订阅源 > sitemap / 作者列表 > 标签）与发表/更新时间的新近程度（半衰期 30 天）打分，
+   任务队列按优先级从高到低领取
+
+发现的URL（sitemap / 订阅源导入、手动入队、命令行参数）都先经过前沿再交给工作节点；
+已见集合跨批次持久化，重抓请使用重抓调度（recrawl_scheduler）或 --requeue。
+
+布隆过滤器超出容量后误判率上升，只会增加查表次数，不影响结果。
+
+使用方法：
+    python -m juejin_scraper.frontier [--db PATH] check <URL> ...
+    python -m juejin_scraper.frontier [--db PATH] stats
+"""
+
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .config import DEFAULT_FRONTIER_PATH
+from .sites import adapter_for
+
+DEFAULT_CAPACITY = 10_000_000
+DEFAULT_ERROR_RATE = 0.001
+
+# 来源基础分
+SOURCE_WEIGHTS = {'manual': 3.0, 'feed': 2.0, 'sitemap': 1.0, 'author': 1.0, 'tag': 0.5}
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+# 输入项：URL，或 (URL, 发表/更新时间戳)
+Item = Union[str, Tuple[str, Optional[float]]]
+
+
+def canonicalize(url: str) -> Tuple[str, str]:
+    """
+    规范化URL
+
+    Returns:
+        (文章键, 规范URL)；识别出文章ID时键为 站点名:ID，否则为规范URL
+    """
+    adapter = adapter_for(url)
+    canonical = adapter.canonical_url(url)
+    return adapter.article_id(url) or canonical, canonical
+
+
+def priority(source: str = 'manual', lastmod: Optional[float] = None, now: Optional[float] = None) -> float:
+    """
+    优先级：来源基础分 + 新近度加分（刚更新为 1，每过半衰期减半；没有时间时为 0）
+    """
+    score = SOURCE_WEIGHTS.get(source, 1.0)
+    if lastmod:
+        age_days = max(0.0, ((now or time.time()) - lastmod) / 86400)
+        score += 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    return round(score, 6)
+
+
+class BloomFilter:
+    """布隆过滤器，位数组保存在内存映射文件中（path 为None时在内存中）"""
+
+    MAGIC = b'JJBLOOM1'
+    HEADER = struct.Struct('<8sQI')
+
+    def __init__(self, path: Optional[str] = None, capacity: int = DEFAULT_CAPACITY,
+                 error_rate: float = DEFAULT_ERROR_RATE):
+        """
+        Args:
+            path: 位数组文件，已存在时沿用文件中的参数
+            capacity: 预计元素数
+            error_rate: 达到容量时的误判率
+        """
+        bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        hashes = max(1, int(round(bits / capacity * math.log(2))))
+        self.path = path
+        self.created = False
+        self._file = None
+        if path is None:
+            self.bits, self.hashes = bits, hashes
+            self.data = bytearray((bits + 7) // 8)
+            self.offset = 0
+            return
+
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, bits, hashes))
+                f.truncate(self.HEADER.size + (bits + 7) // 8)
+            self.created = True
+        self._file = open(path, 'r+b')
+        self.data = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"不是布隆过滤器文件：{path}")
+        self.offset = self.HEADER.size
+
+    def _positions(self, key: str) -> List[int]:
+        # 双重哈希：h1 + i * h2
+        h1, h2 = struct.unpack('<QQ', hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest())
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        data, offset = self.data, self.offset
+        return all(data[offset + (p >> 3)] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> None:
+        data, offset = self.data, self.offset
+        for p in self._positions(key):
+            data[offset + (p >> 3)] |= 1 << (p & 7)
+
+    def fill_ratio(self, sample: int = 65536) -> float:
+        """已置位比例（抽样估计）"""
+        size = len(self.data) - self.offset
+        step = max(1, size // sample)
+        ones = sum(bin(self.data[self.offset + i]).count('1') for i in range(0, size, step))
+        return ones / (len(range(0, size, step)) * 8)
+
+    def flush(self) -> None:
+        """把位数组写回文件"""
+        if self._file is not None:
+            self.data.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.data.flush()
+            self.data.close()
+            self._file.close()
+            self._file = None
+
+
+class Frontier:
+    """规范化 + 已见集合 + 优先级"""
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_FRONTIER_PATH, capacity: int = DEFAULT_CAPACITY,
+                 error_rate: float = DEFAULT_ERROR_RATE):
+        """
+        Args:
+            db_path: 已见集合数据库路径（布隆过滤器保存在同名 .bloom 文件），为None时只在内存中（本次运行内去重）
+            capacity: 布隆过滤器容量（只在新建时生效）
+            error_rate: 布隆过滤器误判率（只在新建时生效）
+        """
+        self.db_path = os.path.expanduser(db_path) if db_path else None
+        self.conn = sqlite3.connect(self.db_path or ':memory:', timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                source TEXT,
+                first_seen REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+        if self.db_path:
+            self.bloom = BloomFilter(self.db_path + '.bloom', capacity, error_rate)
+            if self.bloom.created:
+                self._rebuild_bloom()
+        else:
+            self.bloom = BloomFilter(None, capacity=100_000, error_rate=error_rate)
+        self.counts: Counter = Counter()
+
+    def _rebuild_bloom(self) -> None:
+        """过滤器文件缺失（新建）而数据库中已有记录时，从数据库重建"""
+        for (key,) in self.conn.execute("SELECT key FROM seen"):
+            self.bloom.add(key)
+        self.bloom.flush()
+
+    def close(self) -> None:
+        """关闭数据库与过滤器文件"""
+        self.bloom.close()
+        self.conn.close()
+
+    def _seen(self, key: str) -> bool:
+        if key not in self.bloom:
+            self.counts['bloom_skips'] += 1
+            return False
+        found = self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+        if not found:
+            self.counts['false_positives'] += 1
+        return found
+
+    def admit(self, items: Iterable[Item], source: str = 'manual', now: Optional[float] = None,
+              record: bool = True) -> List[Tuple[str, float]]:
+        """
+        筛选出未见过的URL
+
+        Args:
+            items: URL，或 (URL, 发表/更新时间戳)
+            source: 来源，决定优先级基础分
+            now: 计算新近度的当前时间
+            record: 是否记入已见集合（为False时只规范化与去重，例如重新入队）
+
+        Returns:
+            [(规范URL, 优先级)]，按优先级从高到低，同优先级保持输入顺序
+        """
+        now = now or time.time()
+        admitted: List[Tuple[str, float]] = []
+        rows = []
+        batch_keys = set()
+        for item in items:
+            url, lastmod = (item, None) if isinstance(item, str) else item
+            self.counts['offered'] += 1
+            if not url or not url.startswith(('http://', 'https://')):
+                self.counts['invalid'] += 1
+                continue
+            key, canonical = canonicalize(url)
+            if key in batch_keys or (record and self._seen(key)):
+                self.counts['duplicates'] += 1
+                continue
+            batch_keys.add(key)
+            admitted.append((canonical, priority(source, lastmod, now)))
+            rows.append((key, canonical, source, now))
+        if record and rows:
+            # 先写过滤器再提交数据库：中途崩溃时过滤器里多出的键只会变成一次误判，
+            # 反过来数据库里有而过滤器里没有的键会被当成新URL重复抓取
+            for key, *_ in rows:
+                self.bloom.add(key)
+            self.bloom.flush()
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO seen (key, url, source, first_seen) VALUES (?, ?, ?, ?)",
+                                      rows)
+        self.counts['admitted'] += len(admitted)
+        admitted.sort(key=lambda x: -x[1])
+        return admitted
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        key, _ = canonicalize(url)
+        row = self.conn.execute("SELECT key, url, source, first_seen FROM seen WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('key', 'url', 'source', 'first_seen'), row, strict=True))
+
+    def size(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"🧭 URL前沿：收到 {c['offered']} 个，新URL {c['admitted']} 个，重复 {c['duplicates']} 个，"
+                f"无效 {c['invalid']} 个；布隆过滤器免查表 {c['bloom_skips']} 次，误判 {c['false_positives']} 次")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL 前沿")
+    parser.add_argument('--db', default=DEFAULT_FRONTIER_PATH, help=f"已见集合数据库路径（默认：{DEFAULT_FRONTIER_PATH}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help="显示URL的规范形式以及是否已见过")
+    check_parser.add_argument('urls', nargs='+', metavar='URL')
+
+    subparsers.add_parser('stats', help="已见集合规模与布隆过滤器状态")
+
+    args = parser.parse_args()
+    frontier = Frontier(args.db)
+    try:
+        if args.command == 'check':
+            for url in args.urls:
+                key, canonical = canonicalize(url)
+                seen = frontier.lookup(url)
+                state = (f"已见过（{seen['source']}，{time.strftime('%Y-%m-%d %H:%M', time.localtime(seen['first_seen']))}）"
+                         if seen else "未见过")
+                print(f"{url}\n  → {canonical}（{key}）{state}")
+        else:
+            bloom = frontier.bloom
+            print(f"📊 已见 {frontier.size()} 篇文章；布隆过滤器 {bloom.bits / 8 / 1024 / 1024:.1f} MB，"
+                  f"{bloom.hashes} 个哈希，置位比例 {bloom.fill_ratio():.1%}")
+    finally:
+        frontier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+分片输出目录与文章索引
+功能：
+1. 文章保存到可配置的输出根目录，按文章ID哈希分片（<根目录>/<ab>/<id>_<标题>.md），单个目录不会无限膨胀
+2. 文件名以文章ID开头，同名文章不再互相覆盖；重新抓取时标题变化会移除旧文件
+   文章ID与URL前沿一致：站点适配器识别出ID时为 站点名:ID（如 juejin:123），否则为规范URL的哈希，
+   同一篇文章带不带跟踪参数都落到同一个路径
+3. 根目录下的 index.db 记录 文章ID / URL / 标题 -> 路径，存在性检查与增量运行无需扫描目录
+4. 支持把旧的平铺文件（默认保存在用户主目录下）迁移进分片目录
+
+使用方法：
+    python -m juejin_scraper.output_layout <根目录> lookup <URL或文章ID>
+    python -m juejin_scraper.output_layout <根目录> migrate <旧目录> [--recursive] [--copy]
+    python -m juejin_scraper.output_layout <根目录> verify [--prune]
+    python -m juejin_scraper.output_layout <根目录> stats
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import time
+from typing import Dict, Iterator, Optional
+
+
+INDEX_FILENAME = "index.db"
+# 文件名中保留的标题长度，避免超出文件系统的文件名长度限制
+MAX_TITLE_CHARS = 60
+# 索引中文章ID的规则版本：1 为 /post/<id> 或原始URL哈希，2 为与URL前沿一致的 站点名:ID
+ID_SCHEME = 2
+
+
+def article_id(url: str) -> str:
+    """
+    由文章URL得到文章ID
+
+    站点适配器识别出ID时为 站点名:ID（与 frontier.canonicalize 的文章键相同），
+    否则为规范URL的 SHA-1 前 16 位
+    """
+    from .frontier import canonicalize
+
+    key, canonical = canonicalize(url)
+    if key != canonical:
+        return key
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def file_stem(doc_id: str) -> str:
+    """文章ID用作文件名时的形式（冒号在部分文件系统中不能出现在文件名里）"""
+    return doc_id.replace(':', '-')
+
+
+def safe_title(title: str) -> str:
+    """标题转为文件名片段（与原先保存到主目录时的规则一致）"""
+    name = re.sub(r'[\/*?"<>|]', "", title).replace(' ', '_')
+    return name[:MAX_TITLE_CHARS]
+
+
+class ArticleStore:
+    """按文章ID分片的输出目录及其索引"""
+
+    def __init__(self, root: str, levels: int = 1):
+        """
+        Args:
+            root: 输出根目录
+            levels: 分片层数，每层 256 个目录（1 层适合数万篇，2 层适合数百万篇）；
+                    只在新建目录时生效，之后沿用索引中记录的层数
+        """
+        self.root = os.path.abspath(os.path.expanduser(root))
+        os.makedirs(self.root, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.root, INDEX_FILENAME), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('levels', ?)", (str(levels),))
+        self.levels = int(self.conn.execute("SELECT value FROM meta WHERE key = 'levels'").fetchone()[0])
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                article_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                path TEXT NOT NULL,
+                saved_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS articles_url ON articles (url)")
+        self.conn.commit()
+        self._upgrade_ids()
+
+    def _upgrade_ids(self) -> None:
+        """旧规则的文章ID按URL重新计算；同一篇文章的多条记录只保留最近保存的一条（文件保留，可用 verify 检查）"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'id_scheme'").fetchone()
+        if row is not None and int(row[0]) >= ID_SCHEME:
+            return
+        rows = self.conn.execute(
+            "SELECT article_id, url, title, path, saved_at FROM articles ORDER BY saved_at"
+        ).fetchall()
+        latest = {article_id(url): (url, title, path, saved_at) for _, url, title, path, saved_at in rows}
+        with self.conn:
+            self.conn.execute("DELETE FROM articles")
+            self.conn.executemany(
+                "INSERT INTO articles (article_id, url, title, path, saved_at) VALUES (?, ?, ?, ?, ?)",
+                ((doc_id, *values) for doc_id, values in latest.items())
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('id_scheme', ?)", (str(ID_SCHEME),))
+
+    def close(self) -> None:
+        """关闭索引"""
+        self.conn.close()
+
+    def shard_dir(self, doc_id: str) -> str:
+        """文章ID所在的分片目录（相对根目录）"""
+        digest = hashlib.sha1(doc_id.encode('utf-8')).hexdigest()
+        return os.path.join(*(digest[i * 2:i * 2 + 2] for i in range(self.levels)))
+
+    def relative_path(self, url: str, title: str) -> str:
+        """文章在根目录下的相对路径"""
+        doc_id = article_id(url)
+        return os.path.join(self.shard_dir(doc_id), f"{file_stem(doc_id)}_{safe_title(title)}.md")
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """
+        按文章ID（站点名:ID，或省略站点名的ID）或URL查询
+
+        Returns:
+            {'article_id', 'url', 'title', 'path'(绝对路径), 'saved_at'}，不存在时返回None
+        """
+        doc_id = article_id(key) if '/' in key else key
+        row = self.conn.execute(
+            "SELECT article_id, url, title, path, saved_at FROM articles WHERE article_id = ?", (doc_id,)
+        ).fetchone()
+        if row is None and '/' not in key and ':' not in key:
+            row = self.conn.execute(
+                "SELECT article_id, url, title, path, saved_at FROM articles WHERE article_id LIKE ? "
+                "ORDER BY saved_at DESC", (f"%:{key}",)
+            ).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                "SELECT article_id, url, title, path, saved_at FROM articles WHERE url = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'article_id': row[0], 'url': row[1], 'title': row[2],
+                'path': os.path.join(self.root, row[3]), 'saved_at': row[4]}
+
+    def exists(self, url: str) -> bool:
+        """文章是否已保存（只查索引，不访问文件系统）"""
+        return self.conn.execute(
+            "SELECT 1 FROM articles WHERE article_id = ?", (article_id(url),)
+        ).fetchone() is not None
+
+    def write(self, url: str, title: str, markdown: str) -> str:
+        """
+        写入文章并更新索引；先写临时文件再替换，标题变化时删除旧文件
+
+        Returns:
+            保存的绝对路径
+        """
+        relative = self.relative_path(url, title)
+        save_path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+
+        tmp_path = f"{save_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        os.replace(tmp_path, save_path)
+
+        previous = self.lookup(article_id(url))
+        self.record(url, title, relative)
+        if previous and previous['path'] != save_path and os.path.exists(previous['path']):
+            os.remove(previous['path'])
+        return save_path
+
+    def record(self, url: str, title: str, relative_path: str) -> None:
+        """写入索引记录"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO articles (article_id, url, title, path, saved_at) VALUES (?, ?, ?, ?, ?)",
+            (article_id(url), url, title, relative_path, time.time())
+        )
+        self.conn.commit()
+
+    def iter_articles(self) -> Iterator[Dict]:
+        for doc_id, url, title, path in self.conn.execute("SELECT article_id, url, title, path FROM articles"):
+            yield {'article_id': doc_id, 'url': url, 'title': title, 'path': os.path.join(self.root, path)}
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def migrate(self, source_dir: str, recursive: bool = False, copy: bool = False) -> Dict[str, int]:
+        """
+        把旧的平铺文章文件迁移进分片目录（按文件中的原文链接确定文章ID）
+
+        Args:
+            source_dir: 旧目录
+            recursive: 是否递归子目录
+            copy: 复制而不是移动
+
+        Returns:
+            {'migrated': 迁移数, 'skipped': 非文章文件数}
+        """
+        from .search_index import iter_markdown_files, parse_saved_markdown
+
+        migrated = skipped = 0
+        for path in iter_markdown_files(os.path.expanduser(source_dir), recursive):
+            if os.path.abspath(path).startswith(self.root + os.sep):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    fields = parse_saved_markdown(f.read())
+            except (OSError, UnicodeDecodeError):
+                fields = None
+            if not fields or not fields['url']:
+                skipped += 1
+                continue
+
+            relative = self.relative_path(fields['url'], fields['title'])
+            target = os.path.join(self.root, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            (shutil.copy2 if copy else shutil.move)(path, target)
+            self.record(fields['url'], fields['title'], relative)
+            migrated += 1
+        return {'migrated': migrated, 'skipped': skipped}
+
+    def verify(self, prune: bool = False) -> int:
+        """检查索引中的文件是否存在，prune 时删除失效记录。返回失效记录数"""
+        missing = [a['article_id'] for a in self.iter_articles() if not os.path.exists(a['path'])]
+        if prune and missing:
+            self.conn.executemany("DELETE FROM articles WHERE article_id = ?", ((m,) for m in missing))
+            self.conn.commit()
+        return len(missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分片输出目录管理")
+    parser.add_argument('root', help="输出根目录")
+    parser.add_argument('--levels', type=int, default=1, help="分片层数（只在新建目录时生效）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lookup_parser = subparsers.add_parser('lookup', help="按文章ID或URL查询保存路径")
+    lookup_parser.add_argument('key', help="文章ID或URL")
+
+    migrate_parser = subparsers.add_parser('migrate', help="迁移旧的平铺文章文件")
+    migrate_parser.add_argument('source', help="旧目录，例如 ~")
+    migrate_parser.add_argument('--recursive', action='store_true', help="递归子目录")
+    migrate_parser.add_argument('--copy', action='store_true', help="复制而不是移动")
+
+    verify_parser = subparsers.add_parser('verify', help="检查索引与文件是否一致")
+    verify_parser.add_argument('--prune', action='store_true', help="删除指向不存在文件的记录")
+
+    subparsers.add_parser('stats', help="统计文章数")
+
+    args = parser.parse_args()
+    store = ArticleStore(args.root, levels=args.levels)
+    try:
+        if args.command == 'lookup':
+            article = store.lookup(args.key)
+            if article is None:
+                print("❌ 未找到")
+            else:
+                print(f"{article['title']}\n{article['url']}\n{article['path']}")
+        elif args.command == 'migrate':
+            result = store.migrate(args.source, recursive=args.recursive, copy=args.copy)
+            print(f"✅ 迁移 {result['migrated']} 篇文章，跳过 {result['skipped']} 个非文章文件")
+        elif args.command == 'verify':
+            missing = store.verify(prune=args.prune)
+            print(f"{'🧹 已删除' if args.prune else '⚠️ 发现'} {missing} 条失效记录" if missing else "✅ 索引与文件一致")
+        else:
+            print(f"📚 {store.root}：{store.count()} 篇文章")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
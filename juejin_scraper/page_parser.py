@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+掘金页面局部解析
+功能：
+1. 用 SoupStrainer 只为标题、#article-root 和元数据区块建立节点，
+   导航栏、侧边栏、推荐列表、内联脚本等直接丢弃，不创建任何对象
+2. 优先使用 C 实现的 lxml 解析器，未安装时退回 html.parser
+
+解析耗时与内存随文章正文大小增长，而不是随整页大小增长。
+"""
+
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+
+# 需要保留的子树：id 或 class 命中即保留整棵子树
+KEEP_IDS = {'article-root'}
+KEEP_CLASSES = {
+    'article-title',          # 文章标题
+    'author-info-block',      # 作者、发表时间、阅读时长
+    'article-suspended-panel',  # 点赞/评论/收藏统计
+}
+KEEP_TAGS = {'title'}
+
+
+def _class_names(value) -> set:
+    """属性值可能是原始字符串，也可能已被拆分为列表"""
+    if not value:
+        return set()
+    if isinstance(value, str):
+        return set(value.split())
+    return set(value)
+
+
+class ArticleStrainer(SoupStrainer):
+    """只允许文章相关子树建立节点的 SoupStrainer"""
+
+    def __init__(self):
+        super().__init__()
+
+    @staticmethod
+    def wanted(name: str, attrs: Optional[Dict]) -> bool:
+        """根据标签名和属性判断是否保留该子树"""
+        if name in KEEP_TAGS:
+            return True
+        if not attrs:
+            return False
+        if attrs.get('id') in KEEP_IDS:
+            return True
+        return not KEEP_CLASSES.isdisjoint(_class_names(attrs.get('class')))
+
+    # bs4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self.wanted(name, attrs)
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    # bs4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs=None):
+        if markup_attrs is None:
+            markup_attrs = {}
+        if isinstance(markup_name, Tag):
+            markup_name, markup_attrs = markup_name.name, markup_name.attrs
+        return markup_name if self.wanted(markup_name, dict(markup_attrs)) else None
+
+
+def parse_article_page(page_source: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    只解析页面中与文章有关的子树
+
+    Args:
+        page_source: 完整页面HTML（driver.page_source）
+        parser: BeautifulSoup 解析器，默认优先 lxml
+
+    Returns:
+        仅包含标题、#article-root 与元数据区块的 BeautifulSoup 对象
+    """
+    return BeautifulSoup(page_source, parser or DEFAULT_PARSER, parse_only=ArticleStrainer())
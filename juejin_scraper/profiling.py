@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+抓取性能分析
+功能：
+1. WebDriverCommandProfiler：包装 driver.execute，按调用位置统计每个 WebDriver 命令的次数与耗时
+   （WebElement 的命令同样经由 driver.execute 发出，因此也会被统计）
+2. ArticleProfiler：单篇文章的 cProfile + tracemalloc 采集，
+   在输出文件旁生成 .prof / .webdriver.json / .profile.txt 三个文件
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+_SKIP_PATH_PARTS = (os.sep + 'selenium' + os.sep, os.path.abspath(__file__))
+
+
+def _call_site() -> str:
+    """返回发出 WebDriver 命令的业务代码位置（跳过 selenium 与本模块自身的栈帧）"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _SKIP_PATH_PARTS):
+            return f"{frame.f_code.co_name} ({os.path.basename(filename)}:{frame.f_lineno})"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+class WebDriverCommandProfiler:
+    """统计 WebDriver 命令往返次数与耗时"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (调用位置, 命令) -> [次数, 总耗时, 最大耗时]
+        self.stats: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+        # 已替换 execute 的 (driver, 原 execute)，detach 时还原
+        self._attached: List[Tuple[object, object]] = []
+
+    def attach(self, driver) -> None:
+        """替换 driver.execute，记录之后的所有命令（复用的浏览器每篇文章重新 attach，结束时 detach）"""
+        original_execute = driver.execute
+        self._attached.append((driver, original_execute))
+
+        def profiled_execute(driver_command, params=None):
+            site = _call_site()
+            start = time.perf_counter()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    record = self.stats[(site, driver_command)]
+                    record[0] += 1
+                    record[1] += elapsed
+                    record[2] = max(record[2], elapsed)
+
+        driver.execute = profiled_execute
+
+    def detach(self) -> None:
+        """还原被替换的 driver.execute，之后的命令不再计入"""
+        while self._attached:
+            driver, original_execute = self._attached.pop()
+            driver.execute = original_execute
+
+    def total(self) -> Tuple[int, float]:
+        """返回 (命令总数, 总耗时)"""
+        return (sum(int(r[0]) for r in self.stats.values()),
+                sum(r[1] for r in self.stats.values()))
+
+    def top_commands(self, n: int) -> List[Dict]:
+        """按总耗时排序的 (调用位置, 命令) 明细"""
+        rows = [
+            {'call_site': site, 'command': command, 'count': int(count), 'total': total, 'max': longest}
+            for (site, command), (count, total, longest) in self.stats.items()
+        ]
+        return sorted(rows, key=lambda x: x['total'], reverse=True)[:n]
+
+    def top_call_sites(self, n: int) -> List[Dict]:
+        """按调用位置汇总的耗时排行"""
+        sites = defaultdict(lambda: {'count': 0, 'total': 0.0})
+        for (site, _), (count, total, _) in self.stats.items():
+            sites[site]['count'] += int(count)
+            sites[site]['total'] += total
+        rows = [{'call_site': site, **values} for site, values in sites.items()]
+        return sorted(rows, key=lambda x: x['total'], reverse=True)[:n]
+
+
+class ArticleProfiler:
+    """单篇文章的 cProfile + tracemalloc + WebDriver 命令采集"""
+
+    def __init__(self, top_n: int = 20):
+        """
+        Args:
+            top_n: 摘要中列出的热点数量
+        """
+        self.top_n = top_n
+        self.commands = WebDriverCommandProfiler()
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.peak_memory = 0
+        self.elapsed = 0.0
+        self._start = 0.0
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "ArticleProfiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self._start
+        self.snapshot = tracemalloc.take_snapshot()
+        _, self.peak_memory = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def summary(self, detailed: bool = True) -> str:
+        """
+        生成文字摘要：WebDriver 命令、调用位置、Python 热点函数、内存分配热点
+
+        Args:
+            detailed: 是否包含 Python 热点函数与内存分配热点
+        """
+        lines = []
+        count, total = self.commands.total()
+        lines.append(f"总耗时：{self.elapsed:.2f}s，WebDriver 命令 {count} 次，往返耗时 {total:.2f}s"
+                     f"（{total / self.elapsed * 100 if self.elapsed else 0:.1f}%），内存峰值 {self.peak_memory / 1024 / 1024:.1f}MB")
+
+        lines.append(f"\n== 耗时最多的调用位置 Top {self.top_n} ==")
+        for row in self.commands.top_call_sites(self.top_n):
+            lines.append(f"{row['total']:8.3f}s {row['count']:6d}次  {row['call_site']}")
+
+        lines.append(f"\n== 耗时最多的 WebDriver 命令 Top {self.top_n} ==")
+        for row in self.commands.top_commands(self.top_n):
+            lines.append(f"{row['total']:8.3f}s {row['count']:6d}次 max {row['max']:.3f}s  "
+                         f"{row['command']} @ {row['call_site']}")
+
+        if not detailed:
+            return "\n".join(lines)
+
+        lines.append(f"\n== Python 热点函数 Top {self.top_n}（按累计耗时）==")
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(self.top_n)
+        lines.append(stream.getvalue().strip())
+
+        if self.snapshot is not None:
+            lines.append(f"\n== 内存分配热点 Top {self.top_n} ==")
+            for stat in self.snapshot.statistics('lineno')[:self.top_n]:
+                lines.append(str(stat))
+
+        return "\n".join(lines)
+
+    def dump(self, base_path: str) -> str:
+        """
+        在 base_path 旁写出分析文件
+
+        Args:
+            base_path: 输出文件路径（去掉扩展名后作为前缀）
+
+        Returns:
+            摘要文件路径
+        """
+        prefix = os.path.splitext(base_path)[0]
+        self.profile.dump_stats(f"{prefix}.prof")
+        with open(f"{prefix}.webdriver.json", 'w', encoding='utf-8') as f:
+            json.dump(self.commands.top_commands(len(self.commands.stats)), f, ensure_ascii=False, indent=2)
+        summary_path = f"{prefix}.profile.txt"
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(self.summary())
+        return summary_path
+
+
+def default_profile_path(url: str, directory: Optional[str] = None) -> str:
+    """文章保存失败时分析文件的默认位置"""
+    slug = url.rstrip('/').rsplit('/', 1)[-1] or "article"
+    return os.path.join(directory or os.getcwd(), f"profile-{slug}-{int(time.time())}")
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+按变化可能性排序的周期性重抓调度
+功能：
+1. 跟踪已抓取文章每次抓取时的点赞/评论/收藏数，估计每篇文章的变化速率
+   （加权变化量 / 小时，指数滑动平均；评论变化权重更高，因为评论需要重新抓取）
+2. 没有历史的文章按文章年龄给出先验速率（新文章互动多、老文章逐渐沉寂），历史越多越信任观测值；
+   多次抓取都没有变化的文章，速率按"有变化的抓取比例"进一步下调
+3. 由速率推算"预计累计变化达到阈值"的到期时间 next_due，限制在最短/最长间隔之间；
+   next_due 存在 SQLite 的 B 树索引上，即一个持久化的优先队列：每篇文章更新 O(log n)，取出前 k 个 O(k log n)
+4. 每小时的抓取预算分配给最早到期（最可能已变化）的文章；由本模块直接抓取时领取后暂时推迟，
+   交给任务队列（due）时记为已交接：按当前速率估计重新排期，工作节点未记录抓取结果也不会反复到期
+5. 文章失效（抓取失败）时按指数退避推迟
+
+使用方法：
+    python -m juejin_scraper.recrawl_scheduler track <URL> ... [--file urls.txt] [--from-output DIR]
+    python -m juejin_scraper.recrawl_scheduler due [--budget N] [--enqueue QUEUE]
+    python -m juejin_scraper.recrawl_scheduler run [--budget N]
+    python -m juejin_scraper.recrawl_scheduler stats
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from .config import DEFAULT_INDEX_PATH, DEFAULT_SCHEDULE_PATH
+
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# 变化量权重：评论变化意味着需要重新抓取评论区，权重最高
+DELTA_WEIGHTS = {'likes': 1.0, 'comments': 3.0, 'collects': 1.0}
+# 累计加权变化量达到该值时视为值得重抓
+CHANGE_THRESHOLD = 5.0
+# 观测速率的滑动平均系数
+RATE_ALPHA = 0.5
+# 先验速率：发表 age 小时后每小时约 PRIOR_SCALE / (age + PRIOR_OFFSET) 个加权变化
+PRIOR_SCALE = 50.0
+PRIOR_OFFSET = 24.0
+MIN_INTERVAL = HOUR
+MAX_INTERVAL = 30 * DAY
+# 领取后推迟的时间，超过该时间仍未回报抓取结果则重新到期
+CLAIM_TIMEOUT = 2 * HOUR
+
+
+def parse_publish_time(text: Optional[str]) -> Optional[float]:
+    """解析页面上的发表时间（2024-05-06 10:23 / 2024年05月06日 等），失败返回None"""
+    if not text:
+        return None
+    match = re.search(r'(\d{4})[-年/.](\d{1,2})[-月/.](\d{1,2})日?(?:\s*(\d{1,2}):(\d{2}))?', text)
+    if not match:
+        return None
+    year, month, day, hour, minute = match.groups()
+    try:
+        return datetime.datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0)).timestamp()
+    except ValueError:
+        return None
+
+
+def prior_rate(age_hours: float) -> float:
+    """按文章年龄估计的先验变化速率（加权变化 / 小时）"""
+    return PRIOR_SCALE / (max(age_hours, 0.0) + PRIOR_OFFSET)
+
+
+def weighted_delta(old: Dict[str, int], new: Dict[str, int]) -> float:
+    """两次抓取之间的加权变化量"""
+    return sum(weight * abs(int(new.get(name) or 0) - int(old.get(name) or 0))
+               for name, weight in DELTA_WEIGHTS.items())
+
+
+def estimate_rate(observed_rate: Optional[float], crawls: int, change_ratio: float, age_hours: float) -> float:
+    """
+    综合观测速率、先验速率与历史变化频率
+
+    Args:
+        observed_rate: 观测速率的滑动平均，没有历史时为None
+        crawls: 已观测到的抓取间隔数
+        change_ratio: 有变化的抓取比例（滑动平均）
+        age_hours: 文章年龄（小时）
+
+    Returns:
+        估计速率（加权变化 / 小时）
+    """
+    prior = prior_rate(age_hours)
+    if observed_rate is None:
+        return prior
+    trust = crawls / (crawls + 2.0)
+    rate = trust * observed_rate + (1 - trust) * prior
+    # 长期没有变化的文章：按变化比例下调（保留下限，避免永远不再抓取）
+    return rate * max(change_ratio, 0.1)
+
+
+def next_due_after(crawled_at: float, rate: float) -> float:
+    """预计累计变化达到阈值的时间"""
+    interval = CHANGE_THRESHOLD / max(rate, 1e-9) * HOUR
+    return crawled_at + min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+
+class RecrawlScheduler:
+    """持久化的重抓优先队列"""
+
+    def __init__(self, db_path: str = DEFAULT_SCHEDULE_PATH):
+        """
+        Args:
+            db_path: 调度数据库路径
+        """
+        self.db_path = os.path.expanduser(db_path)
+        # 抓取器在构造线程之外的工作线程中使用（每个抓取器一个实例，不跨线程共享）
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tracked (
+                url TEXT PRIMARY KEY,
+                published_at REAL,
+                first_seen REAL NOT NULL,
+                last_crawled REAL,
+                next_due REAL NOT NULL,
+                likes INTEGER,
+                comments INTEGER,
+                collects INTEGER,
+                observed_rate REAL,
+                change_ratio REAL NOT NULL DEFAULT 1.0,
+                crawls INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tracked_due ON tracked (next_due)")
+        self.conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def track(self, urls: List[str], now: Optional[float] = None) -> int:
+        """开始跟踪文章（立即到期，首次抓取后按速率排期）。返回新增数量"""
+        now = now or time.time()
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO tracked (url, first_seen, next_due) VALUES (?, ?, ?)",
+            ((url, now, now) for url in urls)
+        )
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def untrack(self, url: str) -> None:
+        """停止跟踪"""
+        self.conn.execute("DELETE FROM tracked WHERE url = ?", (url,))
+        self.conn.commit()
+
+    def record_crawl(self, url: str, stats: Dict[str, int], publish_time: Optional[str] = None,
+                     crawled_at: Optional[float] = None) -> float:
+        """
+        记录一次抓取的统计数据并重新排期（文章未被跟踪时自动加入）
+
+        Args:
+            url: 文章URL
+            stats: extract_article_stats 的结果（likes/comments/collects）
+            publish_time: 页面上的发表时间文本
+            crawled_at: 抓取时间，默认为当前时间
+
+        Returns:
+            下次到期时间
+        """
+        now = crawled_at or time.time()
+        row = self.conn.execute(
+            "SELECT published_at, first_seen, last_crawled, likes, comments, collects, observed_rate, "
+            "change_ratio, crawls FROM tracked WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            row = (None, now, None, None, None, None, None, 1.0, 0)
+        published_at, first_seen, last_crawled, likes, comments, collects, observed_rate, change_ratio, crawls = row
+        published_at = published_at or parse_publish_time(publish_time) or first_seen
+
+        if last_crawled is not None and likes is not None and now > last_crawled:
+            delta = weighted_delta({'likes': likes, 'comments': comments, 'collects': collects}, stats)
+            rate = delta / ((now - last_crawled) / HOUR)
+            observed_rate = rate if observed_rate is None else RATE_ALPHA * rate + (1 - RATE_ALPHA) * observed_rate
+            change_ratio = RATE_ALPHA * (1.0 if delta > 0 else 0.0) + (1 - RATE_ALPHA) * change_ratio
+            crawls += 1
+
+        rate = estimate_rate(observed_rate, crawls, change_ratio, (now - published_at) / HOUR)
+        next_due = next_due_after(now, rate)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO tracked (url, published_at, first_seen, last_crawled, next_due, likes, comments, "
+            "collects, observed_rate, change_ratio, crawls, failures) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (url, published_at, first_seen, now, next_due, int(stats.get('likes') or 0),
+             int(stats.get('comments') or 0), int(stats.get('collects') or 0), observed_rate, change_ratio, crawls)
+        )
+        self.conn.commit()
+        return next_due
+
+    def record_failure(self, url: str, now: Optional[float] = None) -> float:
+        """抓取失败（文章可能已删除）：按失败次数指数退避。返回下次到期时间"""
+        now = now or time.time()
+        row = self.conn.execute("SELECT failures FROM tracked WHERE url = ?", (url,)).fetchone()
+        failures = (row[0] if row else 0) + 1
+        next_due = now + min(MIN_INTERVAL * 2 ** failures, MAX_INTERVAL)
+        self.conn.execute("UPDATE tracked SET failures = ?, next_due = ? WHERE url = ?", (failures, next_due, url))
+        self.conn.commit()
+        return next_due
+
+    def due(self, budget: int, now: Optional[float] = None) -> List[Dict]:
+        """查看已到期的前 budget 篇文章（最早到期优先），不修改状态"""
+        now = now or time.time()
+        rows = self.conn.execute(
+            "SELECT url, next_due, last_crawled, crawls FROM tracked WHERE next_due <= ? ORDER BY next_due LIMIT ?",
+            (now, budget)
+        ).fetchall()
+        return [{'url': url, 'next_due': next_due, 'last_crawled': last_crawled, 'crawls': crawls}
+                for url, next_due, last_crawled, crawls in rows]
+
+    def claim(self, budget: int, now: Optional[float] = None) -> List[str]:
+        """领取已到期的前 budget 篇文章，并暂时推迟，避免在抓取结果回报前被再次领取"""
+        now = now or time.time()
+        urls = [item['url'] for item in self.due(budget, now)]
+        self.conn.executemany(
+            "UPDATE tracked SET next_due = ? WHERE url = ?", ((now + CLAIM_TIMEOUT, url) for url in urls)
+        )
+        self.conn.commit()
+        return urls
+
+    def hand_off(self, budget: int, now: Optional[float] = None) -> List[str]:
+        """
+        领取已到期的前 budget 篇文章交给其他进程抓取（任务队列），并按当前速率估计重新排期
+
+        工作节点带 --recrawl-db 时抓取结果会覆盖这里的排期；不带时文章也不会在 CLAIM_TIMEOUT 后
+        重新到期、反复占用预算。
+        """
+        now = now or time.time()
+        urls = [item['url'] for item in self.due(budget, now)]
+        updates = []
+        for url in urls:
+            published_at, first_seen, observed_rate, change_ratio, crawls = self.conn.execute(
+                "SELECT published_at, first_seen, observed_rate, change_ratio, crawls FROM tracked WHERE url = ?",
+                (url,)
+            ).fetchone()
+            rate = estimate_rate(observed_rate, crawls, change_ratio, (now - (published_at or first_seen)) / HOUR)
+            updates.append((next_due_after(now, rate), url))
+        self.conn.executemany("UPDATE tracked SET next_due = ? WHERE url = ?", updates)
+        self.conn.commit()
+        return urls
+
+    def stats(self, now: Optional[float] = None) -> Dict:
+        """跟踪数量、已到期数量与未来 24 小时内到期数量"""
+        now = now or time.time()
+        total, due_now, due_day, never = self.conn.execute(
+            "SELECT COUNT(*), SUM(next_due <= ?), SUM(next_due <= ?), SUM(last_crawled IS NULL) FROM tracked",
+            (now, now + DAY)
+        ).fetchone()
+        return {'tracked': total, 'due': due_now or 0, 'due_24h': due_day or 0, 'never_crawled': never or 0}
+
+
+def _read_urls(args) -> List[str]:
+    urls = list(args.urls)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if args.from_output:
+        from .output_layout import ArticleStore
+
+        store = ArticleStore(args.from_output)
+        try:
+            urls.extend(article['url'] for article in store.iter_articles())
+        finally:
+            store.close()
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按变化可能性排序的周期性重抓调度")
+    parser.add_argument('--db', default=DEFAULT_SCHEDULE_PATH, help=f"调度数据库路径（默认：{DEFAULT_SCHEDULE_PATH}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    track_parser = subparsers.add_parser('track', help="跟踪文章")
+    track_parser.add_argument('urls', nargs='*', metavar='URL', help="文章URL")
+    track_parser.add_argument('--file', help="从文件读取URL（每行一个）")
+    track_parser.add_argument('--from-output', metavar='DIR', help="跟踪分片输出目录索引中的全部文章")
+
+    due_parser = subparsers.add_parser('due', help="领取本小时预算内最可能已变化的文章，交给其他进程抓取")
+    due_parser.add_argument('--budget', type=int, default=100, help="本次领取数量")
+    due_parser.add_argument('--enqueue', metavar='QUEUE', default=None,
+                            help="写入任务队列（SQLite 文件或 http://host:port），否则只打印")
+    due_parser.add_argument('--batch', default='recrawl', help="写入任务队列时的批次名")
+
+    run_parser = subparsers.add_parser('run', help="领取到期文章并直接抓取")
+    run_parser.add_argument('--budget', type=int, default=100, help="本次抓取数量")
+    run_parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH, default=None, metavar='DB',
+                            help="保存后更新全文索引")
+    run_parser.add_argument('--output-dir', metavar='DIR', default=None, help="分片输出目录")
+
+    subparsers.add_parser('stats', help="调度统计")
+
+    args = parser.parse_args()
+    scheduler = RecrawlScheduler(args.db)
+    try:
+        if args.command == 'track':
+            urls = _read_urls(args)
+            print(f"📌 新增跟踪 {scheduler.track(urls)}/{len(urls)} 篇文章")
+        elif args.command == 'due':
+            urls = scheduler.hand_off(args.budget)
+            if args.enqueue:
+                from .work_queue import open_queue
+
+                queue = open_queue(args.enqueue)
+                try:
+                    # 同一URL上一轮已完成的任务重新置为排队
+                    added = queue.enqueue(urls, batch=args.batch, requeue=True)
+                    print(f"📥 写入任务队列批次 {args.batch}：{added} 篇")
+                finally:
+                    queue.close()
+            else:
+                for url in urls:
+                    print(url)
+        elif args.command == 'run':
+            from .scraper import JuejinScraper
+
+            urls = scheduler.claim(args.budget)
+            print(f"🔄 本轮重抓 {len(urls)} 篇文章")
+            scraper = JuejinScraper(headless=True, index_path=args.index, output_dir=args.output_dir,
+                                    keep_browser=True, recrawl_db=args.db)
+            try:
+                for url in urls:
+                    scraper.save_article(url)
+            finally:
+                scraper.finish()
+        else:
+            stats = scheduler.stats()
+            print(f"📊 跟踪 {stats['tracked']} 篇，已到期 {stats['due']} 篇，24 小时内到期 {stats['due_24h']} 篇，"
+                  f"从未抓取 {stats['never_crawled']} 篇")
+    finally:
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+文章解析与渲染（不依赖浏览器）
+功能：
+1. 从页面源码提取标题与正文Markdown（选择器由URL所属站点的适配器提供，见 sites/）
+2. 生成带元数据表格与精选评论的Markdown文件并保存
+3. 指定输出目录时按文章ID分片保存并记录索引，否则沿用保存到主目录的方式
+
+抓取（JuejinScraper）与快照回放共用这一部分，回放时无需加载 selenium。
+"""
+
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from .output_layout import ArticleStore
+
+
+class ArticleRenderer:
+    """文章解析与渲染"""
+    
+    def __init__(self, max_comments: int = 10, output_dir: Optional[str] = None):
+        """
+        Args:
+            max_comments: 最大评论数量
+            output_dir: 分片输出根目录，为None时保存到主目录（~/<标题>.md）
+        """
+        self.max_comments = max_comments
+        self.output_dir = output_dir
+        self._store: Optional[ArticleStore] = None
+    
+    @property
+    def store(self) -> Optional[ArticleStore]:
+        """分片输出目录（首次使用时在当前线程打开索引）"""
+        if self._store is None and self.output_dir:
+            self._store = ArticleStore(self.output_dir)
+        return self._store
+    
+    def close(self) -> None:
+        """关闭分片输出目录的索引"""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+    
+    def parse_article(self, page_source: str, url: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """
+        从页面源码提取标题和正文（不依赖浏览器）
+        
+        Args:
+            page_source: 页面HTML
+            url: 文章URL，用于选择站点适配器；为None时按掘金页面解析
+            
+        Returns:
+            (标题, 正文Markdown)，失败返回None
+        """
+        from .sites import adapter_for
+        
+        return adapter_for(url).parse_article(page_source)
+    
+    def write_article(self, article_data: Dict) -> str:
+        """生成Markdown并写入文件，返回保存路径"""
+        final_markdown = self.generate_markdown(article_data)
+        
+        if self.store is not None:
+            save_path = self.store.write(article_data['url'], article_data['title'], final_markdown)
+            print(f"✅ 文章已保存到：{save_path}")
+            return save_path
+        
+        safe_filename = re.sub(r'[\/*?"<>|]', "", article_data['title'])
+        safe_filename = safe_filename.replace(' ', '_') + ".md"
+        save_path = os.path.expanduser(f"~/{safe_filename}")
+        
+        with open(save_path, 'w', encoding='utf-8') as f:
+            f.write(final_markdown)
+        
+        print(f"✅ 文章已保存到：{save_path}")
+        return save_path
+    
+    def render_snapshot(self, snapshot: Dict) -> Optional[str]:
+        """
+        从快照重新提取并渲染文章（不启动浏览器）
+        
+        Args:
+            snapshot: load_snapshot 读取的快照
+            
+        Returns:
+            保存的文件路径，失败返回None
+        """
+        parsed = self.parse_article(snapshot['page_source'], snapshot['url'])
+        if not parsed:
+            return None
+        title, markdown_content = parsed
+        
+        article_data = {
+            'title': title,
+            'url': snapshot['url'],
+            'author_name': snapshot['author_name'],
+            'author_link': snapshot['author_link'],
+            'author_profile': snapshot.get('author_profile'),
+            'content': markdown_content,
+            'comments_data': snapshot['comments_data'],
+            **snapshot['stats'],
+            **snapshot['metadata']
+        }
+        return self.write_article(article_data)
+    
+    def generate_markdown(self, article_data: Dict) -> str:
+        """生成Markdown内容"""
+        md_content = []
+        
+        # 标题
+        md_content.append(f"# {article_data['title']}\n")
+        
+        # 作者信息
+        if article_data['author_link']:
+            md_content.append(f"**作者：** [{article_data['author_name']}]({article_data['author_link']})\n")
+        else:
+            md_content.append(f"**作者：** {article_data['author_name']}\n")
+        
+        # 作者资料（启用作者资料补充时）
+        profile = article_data.get('author_profile')
+        if profile:
+            from .authors import format_profile
+            
+            summary = format_profile(profile)
+            if summary:
+                md_content.append(f"**作者资料：** {summary}\n")
+            if profile.get('bio'):
+                md_content.append(f"> {profile['bio']}\n")
+        
+        # 文章信息表格
+        md_content.append("## 📊 文章信息\n")
+        md_content.append("| 项目 | 内容 |")
+        md_content.append("|------|------|")
+        md_content.append(f"| 发表时间 | {article_data['publish_time']} |")
+        md_content.append(f"| 点赞数 | {article_data['likes']} |")
+        md_content.append(f"| 评论数 | {article_data['comments']} |")
+        md_content.append(f"| 收藏数 | {article_data['collects']} |")
+        md_content.append(f"| 阅读时长 | {article_data['read_time']} |")
+        md_content.append(f"| 专栏名称 | {article_data['column']} |")
+        md_content.append(f"| 原文链接 | [{article_data['title']}]({article_data['url']}) |\n")
+        
+        md_content.append("---\n")
+        
+        # 文章内容
+        md_content.append("## 📝 文章内容\n")
+        md_content.append(article_data['content'])
+        
+        # 精选评论
+        if article_data['comments_data']:
+            md_content.append("\n\n---\n")
+            md_content.append("## 💬 精选评论\n")
+            
+            # 按点赞数排序并取前10条
+            sorted_comments = sorted(article_data['comments_data'], key=lambda x: x['likes'], reverse=True)
+            top_comments = sorted_comments[:self.max_comments]
+            
+            for comment in top_comments:
+                # 构建评论标题，始终显示点赞和回复数
+                author = comment['author']
+                if comment.get('author_profile', {}).get('level'):
+                    author = f"{author} (Lv{comment['author_profile']['level']})"
+                title_parts = [
+                    author,
+                    f"👍 {comment['likes']}",
+                    f"💬 {comment['replies']}",
+                    comment['time']
+                ]
+                comment_title = " ".join(title_parts)
+                md_content.append(f"### {comment_title}\n")
+                md_content.append(f"{comment['content']}\n")
+                
+                # 显示子评论
+                if comment['sub_replies']:
+                    md_content.append("\n**回复：**\n")
+                    for reply in comment['sub_replies']:
+                        # 始终显示子评论的点赞数
+                        reply_title = f"{reply['author']} (👍 {reply['likes']}) - {reply['time']}"
+                        
+                        md_content.append(f"**{reply_title}**\n")
+                        md_content.append(f"> {reply['content']}\n")
+                
+                md_content.append("\n---\n")
+        
+        return "\n".join(md_content)
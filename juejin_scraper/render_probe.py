@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+渲染策略自动探测
+功能：
+1. 先直接 HTTP 请求页面源码，检查内容是否完整：有标题、正文节点存在且长度足够、正文中没有骨架屏/加载占位元素
+2. 完整时不启动浏览器直接提取；不完整或请求失败时升级为浏览器渲染
+3. 探测结果按URL模式（域名 + 路径，数字与哈希段归一为 *，例如 juejin.cn/post/*）缓存在 SQLite 中并设置有效期，
+   之后同一模式的URL直接使用缓存的策略，不再重复探测；缓存为 static 的模式遇到不完整的页面同样升级并改写缓存
+4. 统计缓存命中率与升级率，输出在运行摘要中
+
+静态提取不包含需要脚本加载的评论区（例如掘金评论）：抓取器需要评论、评论状态或评论者资料时
+不对这类站点探测，直接使用浏览器，避免用空评论覆盖已保存的文章。
+
+使用方法：
+    python -m juejin_scraper.render_probe [--db PATH] check <URL>
+    python -m juejin_scraper.render_probe [--db PATH] stats
+    python -m juejin_scraper.render_probe [--db PATH] clear [--pattern PATTERN]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .config import DEFAULT_RENDER_CACHE_PATH
+from .sites import BROWSER, STATIC
+
+DAY = 86400.0
+# 探测结果有效期：静态可用的模式较稳定；需要浏览器的模式过期后重新探测，站点改为服务端渲染时能及时发现
+TTL = {STATIC: 7 * DAY, BROWSER: 1 * DAY}
+
+# 视为ID的路径段：纯数字、较长的十六进制/字母数字混合串
+_ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-f]{8,}|(?=[A-Za-z0-9_-]*\d)[A-Za-z0-9_-]{12,})$')
+
+
+def url_pattern(url: str) -> str:
+    """URL模式：域名 + 路径，ID段替换为 *（查询参数忽略）"""
+    parts = urlsplit(url)
+    segments = [('*' if _ID_SEGMENT.match(segment) else segment) for segment in parts.path.split('/') if segment]
+    return '/'.join([(parts.netloc or '').lower(), *segments])
+
+
+def check_complete(adapter, page_source: str) -> Optional[str]:
+    """
+    检查页面源码中的文章是否完整
+
+    Args:
+        adapter: 站点适配器
+        page_source: 页面HTML
+
+    Returns:
+        不完整的原因，完整时返回None
+    """
+    soup = adapter.parse_page(page_source)
+    if not adapter.select_text(soup, adapter.title_selectors):
+        return "缺少标题"
+    root = soup.select_one(adapter.content_selector)
+    if root is None:
+        return "缺少正文节点"
+    for element in [root, *root.find_all(True)]:
+        classes = ' '.join(element.get('class') or ()).lower()
+        for marker in adapter.placeholder_markers:
+            if marker in classes:
+                return f"正文中有占位元素（{marker}）"
+    if len(root.get_text(strip=True)) < adapter.min_content_chars:
+        return "正文为空或过短"
+    return None
+
+
+class RenderProbeCache:
+    """按URL模式缓存的渲染策略"""
+
+    def __init__(self, db_path: str = DEFAULT_RENDER_CACHE_PATH):
+        """
+        Args:
+            db_path: 缓存数据库路径
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS patterns (
+                pattern TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                reason TEXT,
+                decided_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                static_ok INTEGER NOT NULL DEFAULT 0,
+                escalations INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.commit()
+        self.lock = threading.Lock()
+        # 本次运行的统计
+        self.counts: Counter = Counter()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def lookup(self, url: str, now: Optional[float] = None) -> Optional[str]:
+        """返回URL模式缓存的策略，没有或已过期时返回None"""
+        now = now or time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT strategy, expires_at FROM patterns WHERE pattern = ?",
+                                    (url_pattern(url),)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return row[0]
+
+    def record(self, url: str, strategy: str, reason: Optional[str] = None, now: Optional[float] = None) -> None:
+        """记录URL模式的探测结果（静态可用 / 需要浏览器）"""
+        now = now or time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO patterns (pattern, strategy, reason, decided_at, expires_at, static_ok, escalations) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (pattern) DO UPDATE SET strategy = excluded.strategy, reason = excluded.reason, "
+                "decided_at = excluded.decided_at, expires_at = excluded.expires_at, "
+                "static_ok = static_ok + excluded.static_ok, escalations = escalations + excluded.escalations",
+                (url_pattern(url), strategy, reason, now, now + TTL[strategy],
+                 int(strategy == STATIC), int(strategy == BROWSER))
+            )
+            self.conn.commit()
+
+    def count(self, event: str) -> None:
+        """
+        记录本次运行的事件，每篇文章恰好一个：
+        hit_static / hit_browser 缓存命中；probe_static 探测后静态可用；
+        probe_browser 探测后升级浏览器；fallback_browser 缓存为静态但页面不完整，升级浏览器
+        """
+        with self.lock:
+            self.counts[event] += 1
+
+    def run_stats(self) -> Dict[str, float]:
+        """本次运行的命中率与升级率"""
+        with self.lock:
+            c = dict(self.counts)
+        total = sum(c.values())
+        hits = c.get('hit_static', 0) + c.get('hit_browser', 0)
+        escalations = c.get('probe_browser', 0) + c.get('fallback_browser', 0)
+        static = c.get('hit_static', 0) + c.get('probe_static', 0)
+        return {
+            'total': total,
+            'cache_hits': hits,
+            'escalations': escalations,
+            'static': static,
+            'hit_rate': hits / total if total else 0.0,
+            'escalation_rate': escalations / total if total else 0.0,
+        }
+
+    def summary(self) -> str:
+        stats = self.run_stats()
+        if not stats['total']:
+            return "🧭 渲染策略：本次没有探测"
+        return (f"🧭 渲染策略：{stats['total']} 篇中静态提取 {stats['static']} 篇，"
+                f"缓存命中 {stats['cache_hits']} 篇（{stats['hit_rate']:.0%}），"
+                f"升级浏览器 {stats['escalations']} 篇（{stats['escalation_rate']:.0%}）")
+
+    def patterns(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT pattern, strategy, reason, expires_at, static_ok, escalations FROM patterns ORDER BY pattern"
+            ).fetchall()
+
+    def clear(self, pattern: Optional[str] = None) -> int:
+        with self.lock:
+            if pattern:
+                cur = self.conn.execute("DELETE FROM patterns WHERE pattern = ?", (pattern,))
+            else:
+                cur = self.conn.execute("DELETE FROM patterns")
+            self.conn.commit()
+        return cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="渲染策略自动探测")
+    parser.add_argument('--db', default=DEFAULT_RENDER_CACHE_PATH,
+                        help=f"缓存数据库路径（默认：{DEFAULT_RENDER_CACHE_PATH}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help="直接请求页面并检查内容是否完整（不写缓存）")
+    check_parser.add_argument('url', help="文章URL")
+
+    subparsers.add_parser('stats', help="列出已缓存的URL模式")
+
+    clear_parser = subparsers.add_parser('clear', help="清除缓存")
+    clear_parser.add_argument('--pattern', default=None, help="只清除该URL模式")
+
+    args = parser.parse_args()
+    if args.command == 'check':
+        from .sites import adapter_for
+
+        adapter = adapter_for(args.url)
+        start = time.perf_counter()
+        reason = check_complete(adapter, adapter.fetch(args.url))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"🔗 {url_pattern(args.url)}（{adapter.name}），耗时 {elapsed:.0f}ms")
+        print("✅ 页面源码已包含完整正文，可静态提取" if reason is None else f"⚠️ 需要浏览器：{reason}")
+        return
+
+    cache = RenderProbeCache(args.db)
+    try:
+        if args.command == 'stats':
+            rows = cache.patterns()
+            now = time.time()
+            for pattern, strategy, reason, expires_at, static_ok, escalations in rows:
+                state = "已过期" if expires_at <= now else time.strftime('%m-%d %H:%M 到期', time.localtime(expires_at))
+                note = f"（{reason}）" if reason else ""
+                print(f"{pattern:<40} {strategy:<8}{note} 静态 {static_ok} 次，升级 {escalations} 次，{state}")
+            print(f"📊 共 {len(rows)} 个URL模式")
+        else:
+            print(f"🧹 已清除 {cache.clear(args.pattern)} 个URL模式")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+快照回放
+从 --snapshot-dir 保存的原始快照并行重新执行提取与渲染，不启动浏览器、不加载 selenium。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Optional, Tuple
+
+from .render import ArticleRenderer
+from .snapshot import iter_snapshot_paths, load_snapshot
+
+# 每个工作进程一份渲染器与 Blob 存储（由 _init_worker 创建，进程退出时关闭）
+_renderer: Optional[ArticleRenderer] = None
+_blob_store = None
+
+
+def _close_worker() -> None:
+    if _renderer is not None:
+        _renderer.close()
+    if _blob_store is not None:
+        _blob_store.close()
+
+
+def _init_worker(blob_dir: Optional[str], max_comments: int, output_dir: Optional[str]) -> None:
+    """工作进程初始化：打开本进程共用的渲染器（输出索引）与 Blob 存储"""
+    global _renderer, _blob_store
+    if blob_dir:
+        from .blobstore import BlobStore
+        _blob_store = BlobStore(blob_dir)
+    _renderer = ArticleRenderer(max_comments=max_comments, output_dir=output_dir)
+    # 工作进程退出时不执行 atexit，用 multiprocessing 的退出回调关闭
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _replay_one(path: str) -> Tuple[str, Optional[str]]:
+    """回放工作进程：渲染单个快照"""
+    try:
+        return path, _renderer.render_snapshot(load_snapshot(path, _blob_store))
+    except Exception as e:
+        print(f"❌ 回放快照 {path} 时出错：{e}")
+        return path, None
+
+
+def replay_snapshots(snapshot_dir: str, workers: Optional[int] = None, blob_dir: Optional[str] = None,
+                     max_comments: int = 10, output_dir: Optional[str] = None) -> Tuple[int, int]:
+    """
+    从快照目录并行重新渲染全部文章（不启动浏览器）
+
+    Args:
+        snapshot_dir: 快照目录
+        workers: 进程数，默认为CPU核心数
+        blob_dir: 快照页面源码所在的 Blob 存储目录
+        max_comments: 最大评论数量
+        output_dir: 分片输出根目录，为None时保存到主目录
+
+    Returns:
+        (成功数, 快照总数)
+    """
+    tasks = list(iter_snapshot_paths(snapshot_dir))
+    workers = workers or os.cpu_count() or 1
+    success_count = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(blob_dir, max_comments, output_dir)) as executor:
+        for _, result in executor.map(_replay_one, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+            if result:
+                success_count += 1
+    return success_count, len(tasks)
@@ -0,0 +1,1180 @@
+# -*- coding: utf-8 -*-
+"""
+掘金文章抓取器 - 最终优化版本
+功能：
+1. 抓取掘金文章内容并转换为Markdown格式
+2. 获取文章完整元数据（作者、点赞、评论、收藏等）
+3. 抓取并排序评论（按点赞数排序，限制10条）
+4. 获取评论下的子评论（最多5条）
+5. 生成格式化的Markdown文件
+6. 保存后增量更新全文索引（可选）
+7. 近似重复文章检测，重复文章在抓取评论前跳过（可选）
+8. 性能分析：WebDriver 命令计时与单篇 cProfile/tracemalloc 采集（可选）
+9. 保存原始快照，并支持无浏览器并行回放重新渲染（可选）
+10. 快照页面源码与图片写入内容寻址的压缩 Blob 存储（可选）
+11. 多篇文章复用同一浏览器，供常驻服务保持浏览器预热（可选）
+12. 使用持久化的浏览器配置目录，跨运行复用 HTTP 缓存与会话状态（可选）
+13. 按文章ID分片保存到输出目录，可跳过索引中已保存的文章（可选）
+14. 文章统计、评论与回复按批导出为列式文件（Parquet / NumPy），便于批量分析（可选）
+15. 记录每次抓取的统计数据，供重抓调度按变化可能性排期（可选）
+16. 评论增量同步：只加载并提取上次抓取之后的新评论，已记录评论只刷新点赞数（可选）
+17. 按站点适配器选择渲染方式：服务端渲染的站点（CSDN）直接 HTTP 请求，不启动浏览器；
+    同一批URL可以混合多个站点
+18. 自动探测渲染方式：先直接请求页面并检查正文是否完整，不完整才启动浏览器，结果按URL模式缓存（可选）
+19. 多标签页模式：多个抓取器共享一个浏览器，各自使用一个标签页（可选，见 tab_pool）
+20. 作者资料：为作者与精选评论的评论者补充等级、粉丝数与简介，同一进程的抓取器共享缓存（可选，见 authors）
+
+作者：AI Assistant
+版本：2.0 Final
+"""
+
+import re
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .blobstore import BlobStore
+from .browser_profile import BrowserProfile, acquire_profile
+from .comment_state import CommentStateStore, comment_key
+from .config import DEFAULT_CACHE_SIZE_MB, DEFAULT_RENDER_CACHE_PATH
+from .dedup import NearDuplicateIndex, simhash
+from .profiling import ArticleProfiler, default_profile_path
+from .recrawl_scheduler import RecrawlScheduler
+from .render_probe import RenderProbeCache, check_complete
+from .render import ArticleRenderer
+from .search_index import ArticleSearchIndex
+from .sites import BROWSER, STATIC, SiteAdapter, adapter_for
+from .snapshot import save_snapshot
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+
+class JuejinScraper(ArticleRenderer):
+    """掘金文章抓取器"""
+    
+    def __init__(self, headless: bool = True, max_comments: int = 10, max_replies: int = 5,
+                 index_path: Optional[str] = None, dedup_path: Optional[str] = None,
+                 batch_replies: bool = True, profile: bool = False, profile_top: int = 20,
+                 snapshot_dir: Optional[str] = None, blob_dir: Optional[str] = None,
+                 keep_browser: bool = False, browser_profile: Optional[str] = None,
+                 cache_size_mb: int = DEFAULT_CACHE_SIZE_MB, output_dir: Optional[str] = None,
+                 skip_existing: bool = False, export_dir: Optional[str] = None,
+                 recrawl_db: Optional[str] = None, comment_state: Optional[str] = None,
+                 render_mode: str = 'site', render_cache: Optional[str] = None, tab_pool=None,
+                 author_cache: Optional[str] = None):
+        """
+        初始化抓取器
+        
+        Args:
+            headless: 是否使用无头模式
+            max_comments: 最大评论数量
+            max_replies: 每条评论下最大回复数量
+            index_path: 全文索引数据库路径，为None时不更新索引
+            dedup_path: 近似重复指纹库路径，为None时不做去重检测
+            batch_replies: 是否一次性批量展开全部回复（否则逐条点击并等待）
+            profile: 是否为每篇文章采集性能分析数据
+            profile_top: 性能分析摘要中列出的热点数量
+            snapshot_dir: 原始快照保存目录，为None时不保存
+            blob_dir: Blob 存储目录，指定时快照的页面源码与文章图片写入内容寻址存储
+            keep_browser: 处理完文章后不退出浏览器，下一篇直接复用（需调用 close 释放）
+            browser_profile: 持久化配置目录的根路径，为None时每次使用临时配置
+            cache_size_mb: 持久化配置目录的磁盘缓存预算（MB）
+            output_dir: 分片输出根目录，为None时保存到主目录
+            skip_existing: 输出目录索引中已有的文章直接跳过（不启动浏览器）
+            export_dir: 列式导出目录，为None时不导出（需调用 finish 写出最后一批）
+            recrawl_db: 重抓调度数据库路径，为None时不记录
+            comment_state: 评论状态数据库路径，指定时增量同步评论，为None时每次完整加载
+            render_mode: site 按站点适配器声明的方式渲染；auto 先直接请求页面，正文不完整时才使用浏览器
+                         （评论由脚本加载的站点在需要评论时不探测，直接使用浏览器）
+            render_cache: auto 模式下按URL模式缓存探测结果的数据库路径
+            tab_pool: 共享浏览器的 TabPool，指定时在其中打开一个标签页代替启动浏览器
+            author_cache: 作者资料缓存数据库路径，指定时为作者与精选评论的评论者补充资料
+        """
+        super().__init__(max_comments=max_comments, output_dir=output_dir)
+        self.headless = headless
+        self.max_replies = max_replies
+        self.index_path = index_path
+        self.dedup_path = dedup_path
+        self.batch_replies = batch_replies
+        self.profile = profile
+        self.profile_top = profile_top
+        self._profiler: Optional[ArticleProfiler] = None
+        self.snapshot_dir = snapshot_dir
+        self.blob_store = BlobStore(blob_dir) if blob_dir else None
+        self.duplicates: List[Tuple[str, str]] = []
+        self.keep_browser = keep_browser
+        self.skip_existing = skip_existing
+        self.recrawl_db = recrawl_db
+        self.scheduler: Optional[RecrawlScheduler] = RecrawlScheduler(recrawl_db) if recrawl_db else None
+        self.comment_state = comment_state
+        self.render_mode = render_mode
+        self.probe_cache: Optional[RenderProbeCache] = None
+        if render_mode == 'auto':
+            self.probe_cache = RenderProbeCache(render_cache or DEFAULT_RENDER_CACHE_PATH)
+        self.exporter = None
+        if export_dir:
+            from .columnar_export import ColumnarExporter
+            self.exporter = ColumnarExporter(export_dir)
+        self.browser_profile = browser_profile
+        self.cache_size_mb = cache_size_mb
+        self._profile: Optional[BrowserProfile] = None
+        self.tab_pool = tab_pool
+        self.authors = None
+        if author_cache:
+            from .authors import shared_enricher
+            self.authors = shared_enricher(author_cache)
+        self.driver = None
+    
+    def setup_driver(self, multi_tab: bool = False) -> "webdriver.Chrome":
+        """
+        设置并返回Chrome WebDriver
+        
+        Args:
+            multi_tab: 多标签页模式：导航立即返回（由 TabPool 在锁外等待加载），并关闭后台标签页节流
+        """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        if multi_tab:
+            options.page_load_strategy = 'none'
+            options.add_argument('--disable-background-timer-throttling')
+            options.add_argument('--disable-backgrounding-occluded-windows')
+            options.add_argument('--disable-renderer-backgrounding')
+        
+        # 持久化配置目录：启动前清理缓存，保留 Cookie 与会话状态
+        if self.browser_profile:
+            if self._profile is None:
+                self._profile = acquire_profile(self.browser_profile, self.cache_size_mb)
+                if self._profile is None:
+                    raise RuntimeError(f"{self.browser_profile} 下的配置目录均被占用")
+            self._profile.cleanup()
+            for argument in self._profile.chrome_arguments():
+                options.add_argument(argument)
+        
+        from webdriver_manager.chrome import ChromeDriverManager
+        
+        service = Service(ChromeDriverManager().install())
+        driver = webdriver.Chrome(service=service, options=options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        # 性能分析模式下统计之后的每个 WebDriver 命令
+        if self._profiler:
+            self._profiler.commands.attach(driver)
+        
+        return driver
+    
+    def get_driver(self) -> "webdriver.Chrome":
+        """返回可用的浏览器：复用模式下沿用仍存活的浏览器，否则重新启动"""
+        if self.tab_pool is not None:
+            if self.driver is not None:
+                if self.driver_alive():
+                    return self.driver
+                print("⚠️ 标签页已失效，重新打开")
+                self.close()
+            self.driver = self.tab_pool.open_tab()
+            return self.driver
+        if self.driver is not None and self.keep_browser:
+            if self.driver_alive():
+                return self.driver
+            print("⚠️ 浏览器已失效，重新启动")
+            self.close()
+        self.driver = self.setup_driver()
+        return self.driver
+    
+    def driver_alive(self) -> bool:
+        """当前浏览器（或标签页）是否仍能响应命令"""
+        try:
+            _ = self.driver.current_window_handle
+        except Exception:
+            return False
+        return True
+    
+    def close(self) -> None:
+        """退出浏览器并释放配置目录（多标签页模式下只关闭本抓取器的标签页）"""
+        if self.tab_pool is not None:
+            if self.driver is not None:
+                self.tab_pool.close_tab()
+                self.driver = None
+            return
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        if self._profile is not None:
+            self._profile.release()
+            self._profile = None
+    
+    def finish(self) -> None:
+        """结束抓取：退出浏览器、写出缓冲中的导出数据并关闭探测缓存与重抓调度（本次运行的统计仍可读取）"""
+        self.close()
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.scheduler is not None:
+            self.scheduler.close()
+        if self.probe_cache is not None:
+            self.probe_cache.close()
+    
+    def load_comments(self, driver: "webdriver.Chrome", known: Optional[Dict[str, int]] = None) -> bool:
+        """
+        加载指定数量的评论
+        
+        Args:
+            driver: WebDriver
+            known: 增量模式下已记录的评论 {评论键: 点赞数}，按最新排序时加载到其中任意一条即停止翻页
+            
+        Returns:
+            评论是否已切换为按最新排序（新评论在前）
+        """
+        from selenium.webdriver.common.by import By
+        
+        print(f"开始加载评论，目标数量：{self.max_comments}")
+        
+        # 滚动到页面底部以加载初始评论
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(2)
+        
+        # 增量模式按最新排序，新评论在前；无法切换时仍是热门排序，新评论可能排在已记录的评论之后，
+        # 不能提前停止翻页，按完整模式加载
+        latest_first = False
+        if known:
+            latest_first = self.sort_comments_latest(driver)
+            if latest_first:
+                time.sleep(1)
+            else:
+                print("⚠️ 无法按最新排序，完整加载评论后按评论键比对")
+                known = None
+        
+        comment_count = 0
+        attempts = 0
+        max_attempts = 20  # 最大尝试次数
+        
+        while comment_count < self.max_comments and attempts < max_attempts:
+            try:
+                # 检查当前评论数量
+                current_comments = driver.find_elements(By.CSS_SELECTOR, ".comment-card.comment-item")
+                comment_count = len(current_comments)
+                
+                if comment_count >= self.max_comments:
+                    print(f"已达到目标评论数量：{comment_count}")
+                    break
+                
+                # 已加载到上次记录过的评论，之后的评论都已同步
+                if known and any(key in known for key, _ in self.comment_summary(driver)):
+                    print(f"已加载到上次同步过的评论，停止翻页（当前 {comment_count} 条）")
+                    break
+                
+                # 查找并点击"加载更多"按钮
+                load_more_buttons = driver.find_elements(By.CSS_SELECTOR, ".fetch-more-comment")
+                if load_more_buttons:
+                    # 点击最后一个加载更多按钮
+                    last_button = load_more_buttons[-1]
+                    if last_button.is_displayed() and last_button.is_enabled():
+                        driver.execute_script("arguments[0].click();", last_button)
+                        print(f"点击加载更多，当前评论数：{comment_count}")
+                        time.sleep(3)  # 增加等待时间
+                    else:
+                        print("加载更多按钮不可见或不可点击")
+                        break
+                else:
+                    print("没有找到更多评论加载按钮")
+                    break
+                
+                attempts += 1
+                
+            except Exception as e:
+                print(f"加载评论时出错：{e}")
+                attempts += 1
+                time.sleep(1)
+        
+        print(f"评论加载完成，共找到 {comment_count} 条评论")
+        return latest_first
+    
+    def expand_replies(self, driver: "webdriver.Chrome", comment_element) -> None:
+        """展开评论下的回复"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            # 查找回复按钮
+            reply_buttons = comment_element.find_elements(By.CSS_SELECTOR, ".reply-btn, .show-replies")
+            if reply_buttons:
+                for button in reply_buttons:
+                    if button.is_displayed() and button.is_enabled():
+                        try:
+                            driver.execute_script("arguments[0].click();", button)
+                            time.sleep(1)
+                            print("展开回复成功")
+                        except Exception as e:
+                            print(f"展开回复失败：{e}")
+                        break
+        except Exception as e:
+            print(f"展开回复时出错：{e}")
+    
+    def expand_all_replies(self, driver: "webdriver.Chrome", timeout: float = 5, settle: float = 0.5,
+                           limit: Optional[int] = None) -> None:
+        """
+        一次页面内操作展开所有评论的回复，并统一等待子评论加载稳定
+        
+        Args:
+            driver: WebDriver
+            timeout: 等待子评论加载的最长时间（秒）
+            settle: 子评论数保持不变多久视为加载完成（秒）；按钮上的回复数尚未全部出现时，
+                    要等子评论数增加之后才开始计时
+            limit: 只展开前 limit 条评论，默认为最大评论数量
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+        
+        limit = limit or self.max_comments
+        count_script = """
+            return Array.from(document.querySelectorAll('.comment-card.comment-item')).slice(0, arguments[0])
+                .reduce((n, card) => n + card.querySelectorAll('.reply-item, .sub-comment').length, 0);
+        """
+        try:
+            # 点击前先记录已有子评论数，以及按钮上的回复数中还没显示出来的条数，同一次调用内完成
+            clicked, before, pending = driver.execute_script("""
+                const cards = Array.from(document.querySelectorAll('.comment-card.comment-item')).slice(0, arguments[0]);
+                let before = 0, clicked = 0, pending = 0;
+                for (const card of cards) {
+                    const shown = card.querySelectorAll('.reply-item, .sub-comment').length;
+                    before += shown;
+                    const button = Array.from(card.querySelectorAll('.reply-btn, .show-replies'))
+                        .find(b => b.offsetParent !== null && !b.disabled);
+                    if (button) {
+                        const total = parseInt((button.textContent.match(/\\d+/) || ['0'])[0], 10);
+                        pending += Math.max(0, total - shown);
+                        button.click();
+                        clicked++;
+                    }
+                }
+                return [clicked, before, pending];
+            """, limit)
+            print(f"批量展开回复：点击 {clicked} 个回复按钮")
+            if not clicked:
+                return
+            
+            # 按钮上的回复全部出现即完成；否则数量在 settle 时间内不再变化视为完成。
+            # 还有回复未出现（回复请求未返回）时，要等数量增加之后才开始计时；
+            # 没有待加载的回复（已展开的被收起、回复早已显示）时从点击后开始计时
+            state = {'count': before, 'since': time.time(), 'grown': False}
+            
+            def settled(d):
+                count = d.execute_script(count_script, limit)
+                now = time.time()
+                if pending and count - before >= pending:
+                    state['count'] = count
+                    return True
+                if count != state['count']:
+                    state['count'], state['since'] = count, now
+                    state['grown'] = state['grown'] or count > before
+                    return False
+                return (state['grown'] or not pending) and now - state['since'] >= settle
+            
+            try:
+                WebDriverWait(driver, timeout, poll_frequency=0.2).until(settled)
+            except TimeoutException:
+                print("等待子评论加载超时，继续提取")
+            print(f"子评论加载完成，共 {max(state['count'], 0)} 条")
+        except Exception as e:
+            print(f"批量展开回复时出错：{e}")
+    
+    def extract_replies(self, comment_element) -> List[Dict]:
+        """提取评论下的回复"""
+        from selenium.webdriver.common.by import By
+        
+        replies = []
+        try:
+            # 查找回复元素
+            reply_elements = comment_element.find_elements(By.CSS_SELECTOR, ".reply-item, .sub-comment")
+            
+            for i, reply_element in enumerate(reply_elements[:self.max_replies]):
+                try:
+                    # 提取回复作者
+                    reply_author = self._extract_reply_author(reply_element)
+                    
+                    # 提取回复内容
+                    reply_content = self._extract_reply_content(reply_element)
+                    
+                    # 提取回复时间
+                    reply_time = self._extract_reply_time(reply_element)
+                    
+                    # 提取回复点赞数
+                    reply_likes = self._extract_reply_likes(reply_element)
+                    
+                    replies.append({
+                        'author': reply_author,
+                        'content': reply_content,
+                        'time': reply_time,
+                        'likes': reply_likes
+                    })
+                    
+                except Exception as e:
+                    print(f"处理第 {i+1} 条回复时出错：{e}")
+                    continue
+                    
+        except Exception as e:
+            print(f"提取回复失败：{e}")
+        
+        return replies
+    
+    def _extract_reply_author(self, reply_element) -> str:
+        """提取回复作者名"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            author_elements = reply_element.find_elements(By.CSS_SELECTOR, ".username .name, .reply-author")
+            return author_elements[0].text.strip() if author_elements else "未知用户"
+        except:
+            return "未知用户"
+    
+    def _extract_reply_content(self, reply_element) -> str:
+        """提取回复内容"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            content_elements = reply_element.find_elements(By.CSS_SELECTOR, ".reply-content, .content")
+            content = content_elements[0].text.strip() if content_elements else ""
+            return content.replace('\n', '\n> ')
+        except:
+            return ""
+    
+    def _extract_reply_time(self, reply_element) -> str:
+        """提取回复时间"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            time_elements = reply_element.find_elements(By.CSS_SELECTOR, "*[class*='time']")
+            return time_elements[0].text.strip() if time_elements else "未知时间"
+        except:
+            return "未知时间"
+    
+    def _extract_reply_likes(self, reply_element) -> int:
+        """提取回复点赞数"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            like_elements = reply_element.find_elements(By.CSS_SELECTOR, "*[class*='digg'], *[class*='like']")
+            if like_elements:
+                like_text = like_elements[0].text.strip()
+                like_match = re.search(r'\d+', like_text)
+                return int(like_match.group()) if like_match else 0
+            return 0
+        except:
+            return 0
+    
+    def extract_comments(self, driver: "webdriver.Chrome", only: Optional[Dict[int, str]] = None) -> List[Dict]:
+        """
+        提取评论数据
+        
+        Args:
+            driver: WebDriver
+            only: 只提取这些位置的评论 {评论序号: 评论键}，提取结果带 'key' 字段；为None时提取前 max_comments 条
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        print("开始提取评论信息...")
+        comments_data = []
+        
+        try:
+            WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".comment-card.comment-item"))
+            )
+            
+            # 批量模式：一次展开全部回复，统一等待
+            if self.batch_replies:
+                self.expand_all_replies(driver, limit=max(only) + 1 if only else None)
+            
+            comment_elements = driver.find_elements(By.CSS_SELECTOR, ".comment-card.comment-item")
+            print(f"找到 {len(comment_elements)} 条评论")
+            
+            # 补充资料需要评论者主页链接，一次脚本读取全部
+            author_links = self.comment_author_links(driver) if self.authors is not None else []
+            
+            for i, comment_element in enumerate(comment_elements[:self.max_comments] if only is None else comment_elements):
+                if only is not None and i not in only:
+                    continue
+                try:
+                    # 逐条模式：展开回复
+                    if not self.batch_replies:
+                        self.expand_replies(driver, comment_element)
+                    
+                    # 提取作者名
+                    author_element = comment_element.find_element(By.CSS_SELECTOR, ".username .name")
+                    author = author_element.text.strip()
+                    
+                    # 提取评论内容
+                    content_element = comment_element.find_element(By.CSS_SELECTOR, ".comment-content .content")
+                    content = content_element.text.strip().replace('\n', '\n> ')
+                    
+                    # 提取时间
+                    time_text = self._extract_comment_time(comment_element)
+                    
+                    # 提取点赞数 - 优化提取逻辑
+                    like_count = self._extract_comment_likes_optimized(comment_element)
+                    
+                    # 提取回复数 - 优化提取逻辑
+                    reply_count = self._extract_comment_replies_optimized(comment_element)
+                    
+                    # 提取子评论
+                    replies = self.extract_replies(comment_element)
+                    
+                    comment = {
+                        'author': author,
+                        'content': content,
+                        'time': time_text,
+                        'likes': like_count,
+                        'replies': reply_count,
+                        'sub_replies': replies
+                    }
+                    if i < len(author_links) and author_links[i]:
+                        comment['author_link'] = author_links[i]
+                    if only is not None:
+                        comment['key'] = only[i]
+                    comments_data.append(comment)
+                    
+                    print(f"处理第 {i+1} 条评论：{author} - 点赞:{like_count} 回复:{reply_count} 子回复:{len(replies)}")
+                    
+                except Exception as e:
+                    print(f"处理第 {i+1} 条评论时出错：{e}")
+                    continue
+                    
+        except Exception as e:
+            print(f"提取评论失败：{e}")
+        
+        return comments_data
+    
+    def comment_author_links(self, driver: "webdriver.Chrome") -> List[str]:
+        """一次页面内脚本读取全部已加载评论的评论者主页链接，按页面顺序（没有链接的为空字符串）"""
+        try:
+            return driver.execute_script("""
+                return Array.from(document.querySelectorAll('.comment-card.comment-item')).map(card => {
+                    const link = card.querySelector("a[href*='/user/']");
+                    return link ? link.href : '';
+                });
+            """) or []
+        except Exception as e:
+            print(f"读取评论者链接失败：{e}")
+            return []
+    
+    def comment_summary(self, driver: "webdriver.Chrome") -> List[Tuple[str, int]]:
+        """一次页面内脚本读取全部已加载评论的 (评论键, 点赞数)，按页面顺序"""
+        rows = driver.execute_script("""
+            return Array.from(document.querySelectorAll('.comment-card.comment-item')).map(card => {
+                const name = card.querySelector('.username .name');
+                const content = card.querySelector('.comment-content .content');
+                const likes = Array.from(card.querySelectorAll(".like-btn, .digg-btn, [class*='like'], [class*='digg']"))
+                    .map(b => (b.innerText || '').trim() || b.getAttribute('data-likes') || b.getAttribute('data-count') || '')
+                    .find(t => /^\\d+$/.test(t));
+                return [card.getAttribute('data-comment-id') || card.getAttribute('comment-id') || '',
+                        name ? name.innerText.trim() : '', content ? content.innerText.trim() : '',
+                        likes ? parseInt(likes, 10) : 0];
+            });
+        """) or []
+        return [(comment_key(comment_id, author, content), likes) for comment_id, author, content, likes in rows]
+    
+    def sort_comments_latest(self, driver: "webdriver.Chrome") -> bool:
+        """把评论区切换为按最新排序，页面没有排序选项时返回False"""
+        try:
+            return bool(driver.execute_script("""
+                const box = document.querySelector('.comment-list-box, .comment-box') || document;
+                const tab = Array.from(box.querySelectorAll('span, div, li, button'))
+                    .find(el => el.children.length === 0 && el.innerText.trim() === '最新');
+                if (!tab) return false;
+                tab.click();
+                return true;
+            """))
+        except Exception as e:
+            print(f"切换评论排序失败：{e}")
+            return False
+    
+    def sync_comments(self, driver: "webdriver.Chrome", url: str) -> List[Dict]:
+        """
+        增量同步评论：只加载并提取上次抓取之后的新评论，已记录的评论只刷新点赞数，
+        合并进评论状态库后返回最新的 max_comments 条（与完整加载一致；状态库保留全部已记录评论）
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
+        store = CommentStateStore(self.comment_state)
+        try:
+            known = store.known(url)
+            if known:
+                print(f"🔁 增量同步评论：已记录 {len(known)} 条")
+            latest_first = self.load_comments(driver, known)
+            
+            try:
+                WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ".comment-card.comment-item"))
+                )
+            except TimeoutException:
+                pass
+            summary = self.comment_summary(driver)
+            
+            # 最新在前：第一条已记录评论之前的都是新评论，按页面位置提取；
+            # 未能按最新排序时逐条按评论键比对，未记录的都是新评论。已记录的评论只取点赞数
+            only, likes, reached_known = {}, {}, False
+            for i, (key, count) in enumerate(summary):
+                if key in known:
+                    likes[key] = count
+                    reached_known = latest_first
+                elif not reached_known and len(only) < self.max_comments and key not in only.values():
+                    only[i] = key
+            new_comments = self.extract_comments(driver, only) if only else []
+            
+            result = store.merge(url, new_comments, likes)
+            print(f"💬 新增评论 {result['added']} 条，点赞变化 {result['refreshed']} 条（{result['like_delta']:+d}）")
+            return store.comments(url, self.max_comments)
+        finally:
+            store.close()
+    
+    def _extract_comment_time(self, comment_element) -> str:
+        """提取评论时间"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            time_elements = comment_element.find_elements(By.CSS_SELECTOR, "*[class*='time']")
+            return time_elements[0].text.strip() if time_elements else "未知时间"
+        except:
+            return "未知时间"
+    
+    def _extract_comment_likes_optimized(self, comment_element) -> int:
+        """优化提取评论点赞数"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            # 方法1：查找点赞按钮上的数字
+            like_buttons = comment_element.find_elements(By.CSS_SELECTOR, ".like-btn, .digg-btn, [class*='like'], [class*='digg']")
+            for button in like_buttons:
+                try:
+                    # 查找按钮内的数字文本
+                    button_text = button.text.strip()
+                    if button_text and button_text.isdigit():
+                        return int(button_text)
+                    
+                    # 查找按钮的data属性
+                    data_likes = button.get_attribute("data-likes") or button.get_attribute("data-count")
+                    if data_likes and data_likes.isdigit():
+                        return int(data_likes)
+                        
+                except:
+                    continue
+            
+            # 方法2：查找包含点赞数的span元素
+            like_spans = comment_element.find_elements(By.CSS_SELECTOR, "span[class*='count'], span[class*='num'], span[class*='like']")
+            for span in like_spans:
+                try:
+                    span_text = span.text.strip()
+                    if span_text and span_text.isdigit():
+                        return int(span_text)
+                except:
+                    continue
+            
+            # 方法3：查找所有包含数字的文本，判断是否为点赞数
+            all_text = comment_element.text
+            like_patterns = [
+                r'点赞\s*(\d+)',
+                r'(\d+)\s*赞',
+                r'(\d+)\s*like',
+                r'like\s*(\d+)'
+            ]
+            
+            for pattern in like_patterns:
+                match = re.search(pattern, all_text, re.IGNORECASE)
+                if match:
+                    return int(match.group(1))
+            
+            return 0
+            
+        except Exception as e:
+            print(f"提取点赞数时出错：{e}")
+            return 0
+    
+    def _extract_comment_replies_optimized(self, comment_element) -> int:
+        """优化提取评论回复数"""
+        from selenium.webdriver.common.by import By
+        
+        try:
+            # 方法1：查找回复按钮上的数字
+            reply_buttons = comment_element.find_elements(By.CSS_SELECTOR, ".reply-btn, .show-replies, [class*='reply']")
+            for button in reply_buttons:
+                try:
+                    button_text = button.text.strip()
+                    if button_text and button_text.isdigit():
+                        return int(button_text)
+                    
+                    # 查找按钮的data属性
+                    data_replies = button.get_attribute("data-replies") or button.get_attribute("data-count")
+                    if data_replies and data_replies.isdigit():
+                        return int(data_replies)
+                        
+                except:
+                    continue
+            
+            # 方法2：查找包含回复数的span元素
+            reply_spans = comment_element.find_elements(By.CSS_SELECTOR, "span[class*='count'], span[class*='num'], span[class*='reply']")
+            for span in reply_spans:
+                try:
+                    span_text = span.text.strip()
+                    if span_text and span_text.isdigit():
+                        return int(span_text)
+                except:
+                    continue
+            
+            # 方法3：查找所有包含数字的文本，判断是否为回复数
+            all_text = comment_element.text
+            reply_patterns = [
+                r'回复\s*(\d+)',
+                r'(\d+)\s*回复',
+                r'(\d+)\s*reply',
+                r'reply\s*(\d+)'
+            ]
+            
+            for pattern in reply_patterns:
+                match = re.search(pattern, all_text, re.IGNORECASE)
+                if match:
+                    return int(match.group(1))
+            
+            return 0
+            
+        except Exception as e:
+            print(f"提取回复数时出错：{e}")
+            return 0
+    
+    def extract_author_info(self, driver: "webdriver.Chrome") -> Tuple[str, str]:
+        """提取作者信息"""
+        from selenium.webdriver.common.by import By
+        
+        print("提取作者信息...")
+        
+        # 方法1：查找所有用户链接
+        try:
+            user_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/user/']")
+            print(f"找到 {len(user_links)} 个用户链接")
+            
+            for link in user_links:
+                try:
+                    href = link.get_attribute("href")
+                    if href and "/user/" in href and "posts" in href:
+                        try:
+                            name_element = link.find_element(By.CSS_SELECTOR, ".name, .username")
+                            author_name = name_element.text.strip()
+                            if author_name:
+                                if href.startswith('/'):
+                                    href = "https://juejin.cn" + href
+                                print(f"找到作者：{author_name}")
+                                return author_name, href
+                        except:
+                            continue
+                except:
+                    continue
+        except Exception as e:
+            print(f"方法1提取作者信息失败：{e}")
+        
+        # 方法2：备用方法
+        try:
+            author_element = driver.find_element(By.CSS_SELECTOR, ".user-name, .username, .author-name")
+            author_name = author_element.text.strip()
+            print(f"备用方法找到作者：{author_name}")
+            return author_name, ""
+        except Exception as e:
+            print(f"备用方法也失败：{e}")
+            return "未知作者", ""
+    
+    def extract_article_stats(self, driver: "webdriver.Chrome") -> Dict[str, int]:
+        """提取文章统计数据（点赞、评论、收藏）"""
+        from selenium.webdriver.common.by import By
+        
+        print("提取文章统计数据...")
+        stats = {'likes': 0, 'comments': 0, 'collects': 0}
+        
+        try:
+            panel_buttons = driver.find_elements(By.CSS_SELECTOR, ".panel-btn.with-badge")
+            print(f"找到 {len(panel_buttons)} 个统计按钮")
+            
+            for button in panel_buttons:
+                try:
+                    badge_value = button.get_attribute("badge")
+                    if not badge_value:
+                        continue
+                    
+                    svg_element = button.find_element(By.CSS_SELECTOR, "svg")
+                    svg_class = svg_element.get_attribute("class")
+                    
+                    if "icon-zan" in svg_class:
+                        stats['likes'] = int(badge_value)
+                        print(f"点赞数：{stats['likes']}")
+                    elif "icon-comment" in svg_class:
+                        stats['comments'] = int(badge_value)
+                        print(f"评论数：{stats['comments']}")
+                    elif "icon-collect" in svg_class:
+                        stats['collects'] = int(badge_value)
+                        print(f"收藏数：{stats['collects']}")
+                        
+                except Exception as e:
+                    print(f"处理统计按钮时出错：{e}")
+                    continue
+            
+        except Exception as e:
+            print(f"提取统计数据失败：{e}")
+        
+        return stats
+    
+    def extract_additional_metadata(self, driver: "webdriver.Chrome") -> Dict[str, str]:
+        """提取额外的元数据"""
+        from selenium.webdriver.common.by import By
+        
+        metadata = {}
+        
+        # 提取发表时间
+        try:
+            time_element = driver.find_element(By.CSS_SELECTOR, "*[class*='time']")
+            metadata['publish_time'] = time_element.text.strip()
+            print(f"发表时间：{metadata['publish_time']}")
+        except:
+            metadata['publish_time'] = "未知时间"
+        
+        # 提取阅读时长
+        try:
+            page_text = driver.execute_script("return document.body.innerText;")
+            read_match = re.search(r'阅读(\d+分钟)', page_text)
+            metadata['read_time'] = read_match.group(1) if read_match else "未知"
+            print(f"阅读时长：{metadata['read_time']}")
+        except:
+            metadata['read_time'] = "未知"
+        
+        # 提取专栏名称
+        try:
+            column_elements = driver.find_elements(By.XPATH, "//*[contains(text(), '专栏')]")
+            if column_elements:
+                for elem in column_elements:
+                    text = elem.text.strip()
+                    if '专栏' in text and len(text) < 50:
+                        metadata['column'] = text
+                        break
+                else:
+                    metadata['column'] = "无专栏"
+            else:
+                metadata['column'] = "无专栏"
+            print(f"专栏名称：{metadata['column']}")
+        except:
+            metadata['column'] = "无专栏"
+        
+        return metadata
+    
+    def update_index(self, save_path: str) -> None:
+        """将保存的文章增量写入全文索引"""
+        try:
+            index = ArticleSearchIndex(self.index_path)
+            try:
+                if index.add_article(save_path):
+                    print(f"🔎 已更新全文索引：{self.index_path}")
+                else:
+                    print("🔎 文章内容未变化，跳过索引")
+            finally:
+                index.close()
+        except Exception as e:
+            print(f"更新全文索引失败：{e}")
+    
+    def update_schedule(self, url: str, stats: Optional[Dict[str, int]] = None,
+                        publish_time: Optional[str] = None) -> None:
+        """记录本次抓取的统计数据并重新排期；stats 为None表示抓取失败"""
+        try:
+            if stats is None:
+                self.scheduler.record_failure(url)
+            else:
+                next_due = self.scheduler.record_crawl(url, stats, publish_time)
+                print(f"🗓️ 下次重抓：{time.strftime('%Y-%m-%d %H:%M', time.localtime(next_due))}")
+        except Exception as e:
+            print(f"更新重抓调度失败：{e}")
+    
+    def find_duplicate(self, url: str, fingerprint: int) -> Optional[Dict]:
+        """在指纹索引中查找近似重复文章（排除同一URL的重新抓取）"""
+        try:
+            index = NearDuplicateIndex(self.dedup_path)
+            try:
+                matches = index.find_similar(fingerprint, exclude_key=url)
+            finally:
+                index.close()
+            return matches[0] if matches else None
+        except Exception as e:
+            print(f"近似重复检测失败：{e}")
+            return None
+    
+    def record_fingerprint(self, url: str, fingerprint: int, title: str, save_path: str) -> None:
+        """将保存的文章指纹写入近似重复索引"""
+        try:
+            index = NearDuplicateIndex(self.dedup_path)
+            try:
+                index.add(url, fingerprint, title, save_path)
+            finally:
+                index.close()
+        except Exception as e:
+            print(f"记录文章指纹失败：{e}")
+    
+    def save_article(self, url: str) -> Optional[str]:
+        """
+        抓取并保存文章
+        
+        Args:
+            url: 文章URL
+            
+        Returns:
+            保存的文件路径，失败返回None
+        """
+        if self.skip_existing and self.store is not None:
+            existing = self.store.lookup(url)
+            if existing:
+                print(f"⏭️ 已保存过，跳过：{existing['path']}")
+                return existing['path']
+        
+        if not self.profile:
+            return self._save_article(url)
+        
+        # 性能分析模式：采集 cProfile / tracemalloc / WebDriver 命令统计
+        self._profiler = ArticleProfiler(top_n=self.profile_top)
+        # 复用的浏览器不会再经过 setup_driver，由本篇的采集器接管
+        if self.driver is not None:
+            self._profiler.commands.attach(self.driver)
+        try:
+            with self._profiler:
+                save_path = self._save_article(url)
+            summary_path = self._profiler.dump(save_path or default_profile_path(url))
+            print(self._profiler.summary(detailed=False))
+            print(f"📈 性能分析结果已保存到：{summary_path}")
+            return save_path
+        finally:
+            self._profiler.commands.detach()
+            self._profiler = None
+    
+    def check_duplicate(self, url: str, markdown_content: str) -> Tuple[Optional[int], bool]:
+        """计算正文指纹并做近似重复检测，返回 (指纹, 是否重复)；未启用去重时指纹为None"""
+        if not self.dedup_path:
+            return None, False
+        fingerprint = simhash(markdown_content)
+        duplicate = self.find_duplicate(url, fingerprint)
+        if duplicate:
+            print(f"⏭️ 与已保存文章近似重复（汉明距离 {duplicate['distance']}）：{duplicate['title']} {duplicate['doc_key']}")
+            self.duplicates.append((url, duplicate['doc_key']))
+            return fingerprint, True
+        return fingerprint, False
+    
+    def store_article(self, article_data: Dict, fingerprint: Optional[int]) -> str:
+        """保存Markdown，并写入列式导出、全文索引与指纹库，返回保存路径"""
+        # 生成并保存Markdown
+        save_path = self.write_article(article_data)
+        
+        # 追加到列式导出缓冲
+        if self.exporter is not None:
+            self.exporter.add(article_data)
+        
+        # 更新全文索引
+        if self.index_path:
+            self.update_index(save_path)
+        
+        # 记录文章指纹
+        if fingerprint is not None:
+            self.record_fingerprint(article_data['url'], fingerprint, article_data['title'], save_path)
+        
+        return save_path
+    
+    def needs_comments(self, adapter: SiteAdapter) -> bool:
+        """
+        该站点的文章是否需要浏览器加载评论
+        
+        评论由脚本加载时，静态提取只能得到空评论：需要评论、增量同步评论状态或补充评论者资料时
+        走静态路径会用空评论覆盖已保存的文章，并绕过评论状态。
+        """
+        return adapter.comments_scripted and (self.max_comments > 0 or bool(self.comment_state)
+                                              or self.authors is not None)
+    
+    def probe_static(self, url: str, adapter: SiteAdapter) -> Optional[str]:
+        """
+        auto 模式：按URL模式缓存决定是否直接请求页面，并检查正文是否完整
+        
+        Returns:
+            可静态提取时返回页面源码，需要浏览器时返回None
+        """
+        cached = self.probe_cache.lookup(url)
+        if cached == BROWSER:
+            self.probe_cache.count('hit_browser')
+            return None
+        
+        try:
+            page_source = adapter.fetch(url)
+            reason = check_complete(adapter, page_source)
+        except Exception as e:
+            page_source, reason = None, f"请求失败：{e}"
+        
+        if reason is None:
+            self.probe_cache.count('hit_static' if cached == STATIC else 'probe_static')
+            if cached is None:
+                self.probe_cache.record(url, STATIC)
+            return page_source
+        
+        self.probe_cache.count('fallback_browser' if cached == STATIC else 'probe_browser')
+        self.probe_cache.record(url, BROWSER, reason)
+        print(f"🧭 页面源码不完整（{reason}），改用浏览器")
+        return None
+    
+    def _save_static(self, url: str, adapter: SiteAdapter, page_source: Optional[str] = None) -> Optional[str]:
+        """直接请求页面源码并提取（服务端渲染的站点，不启动浏览器）"""
+        try:
+            print(f"开始处理文章（{adapter.name}，静态请求）：{url}")
+            if page_source is None:
+                page_source = adapter.fetch(url)
+            article_data = adapter.extract(page_source, url)
+            if not article_data:
+                if self.recrawl_db:
+                    self.update_schedule(url)
+                return None
+            
+            fingerprint, duplicate = self.check_duplicate(url, article_data['content'])
+            if duplicate:
+                return None
+            
+            stats = {name: article_data[name] for name in ('likes', 'comments', 'collects')}
+            if self.recrawl_db:
+                self.update_schedule(url, stats, article_data['publish_time'])
+            
+            if self.authors is not None:
+                article_data['author_profile'] = self.authors.enrich(article_data['author_link'], [])
+            
+            if self.snapshot_dir:
+                snapshot_file = save_snapshot(self.snapshot_dir, url, page_source, {
+                    'author_name': article_data['author_name'],
+                    'author_link': article_data['author_link'],
+                    'author_profile': article_data.get('author_profile'),
+                    'stats': stats,
+                    'metadata': {k: article_data[k] for k in ('publish_time', 'read_time', 'column')},
+                    'comments_data': [],
+                }, blob_store=self.blob_store)
+                print(f"📦 快照已保存到：{snapshot_file}")
+            
+            return self.store_article(article_data, fingerprint)
+        
+        except Exception as e:
+            print(f"❌ 处理文章时出错：{e}")
+            if self.recrawl_db:
+                self.update_schedule(url)
+            return None
+    
+    def _save_article(self, url: str) -> Optional[str]:
+        """抓取并保存文章（实际流程）"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        adapter = adapter_for(url)
+        if self.probe_cache is not None and not self.needs_comments(adapter):
+            page_source = self.probe_static(url, adapter)
+            if page_source is not None:
+                return self._save_static(url, adapter, page_source)
+        elif self.probe_cache is None and adapter.render == STATIC:
+            return self._save_static(url, adapter)
+        
+        try:
+            self.get_driver()
+            self.driver.get(url)
+            
+            # 等待文章加载
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, adapter.wait_selector))
+            )
+            
+            print(f"开始处理文章：{url}")
+            
+            # 解析标题和正文（正文在评论加载前即可完整获取）
+            parsed = self.parse_article(self.driver.page_source, url)
+            if not parsed:
+                if self.recrawl_db:
+                    self.update_schedule(url)
+                return None
+            title, markdown_content = parsed
+            
+            # 近似重复检测，在耗时的评论抓取之前跳过
+            fingerprint, duplicate = self.check_duplicate(url, markdown_content)
+            if duplicate:
+                return None
+            
+            # 提取作者信息
+            author_name, author_link = self.extract_author_info(self.driver)
+            
+            # 提取文章统计数据
+            stats = self.extract_article_stats(self.driver)
+            
+            # 提取额外元数据
+            metadata = self.extract_additional_metadata(self.driver)
+            
+            # 记录统计数据，供重抓调度排期
+            if self.recrawl_db:
+                self.update_schedule(url, stats, metadata.get('publish_time'))
+            
+            if self.comment_state:
+                # 增量同步评论，与已记录的评论合并
+                comments_data = self.sync_comments(self.driver, url)
+            else:
+                # 加载评论
+                self.load_comments(self.driver)
+                
+                # 提取评论数据
+                comments_data = self.extract_comments(self.driver)
+            
+            # 补充作者与评论者资料（共享缓存，同一作者在有效期内只请求一次）
+            author_profile = None
+            if self.authors is not None:
+                author_profile = self.authors.enrich(author_link, comments_data)
+            
+            # 保存原始快照，供之后无浏览器回放
+            if self.snapshot_dir:
+                asset_urls = []
+                if self.blob_store is not None:
+                    asset_urls = self.driver.execute_script(
+                        "return Array.from(document.querySelectorAll('#article-root img')).map(img => img.src);"
+                    ) or []
+                snapshot_file = save_snapshot(self.snapshot_dir, url, self.driver.page_source, {
+                    'author_name': author_name,
+                    'author_link': author_link,
+                    'author_profile': author_profile,
+                    'stats': stats,
+                    'metadata': metadata,
+                    'comments_data': comments_data,
+                }, blob_store=self.blob_store, asset_urls=asset_urls)
+                print(f"📦 快照已保存到：{snapshot_file}")
+            
+            # 准备文章数据
+            article_data = {
+                'title': title,
+                'url': url,
+                'author_name': author_name,
+                'author_link': author_link,
+                'author_profile': author_profile,
+                'content': markdown_content,
+                'comments_data': comments_data,
+                **stats,
+                **metadata
+            }
+            
+            return self.store_article(article_data, fingerprint)
+            
+        except Exception as e:
+            print(f"❌ 处理文章时出错：{e}")
+            if self.recrawl_db:
+                self.update_schedule(url)
+            return None
+        
+        finally:
+            if not self.keep_browser:
+                self.close()
@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+"""
+掘金文章全文索引
+功能：
+1. 基于 SQLite FTS5 为已保存的 Markdown 文章建立全文索引（标题、作者、正文、评论）
+2. 每次 save_article 保存后增量更新索引（按内容哈希判断是否需要重建）
+3. 支持从目录全量重建索引，解析与哈希计算使用全部 CPU 核心
+4. 命令行查询，结果按相关度排序并高亮片段
+
+使用方法：
+    python -m juejin_scraper.search_index search <关键词> [--limit N]
+    python -m juejin_scraper.search_index rebuild <目录> [--recursive] [--full]
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .config import DEFAULT_INDEX_PATH
+
+
+# 生成的Markdown中用于划分区块的标记（与 ArticleRenderer.generate_markdown 保持一致）
+CONTENT_MARKER = "## 📝 文章内容"
+COMMENTS_MARKER = "## 💬 精选评论"
+
+# bm25 各列权重：标题 > 作者 > 正文 > 评论
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 0.5)
+
+# trigram 分词器无法匹配不足 3 个字符的词（如"缓存"），这类词改为逐行子串扫描
+MIN_TRIGRAM_LENGTH = 3
+
+
+def content_hash(title: str, author: str, body: str, comments: str) -> str:
+    """计算索引字段的内容哈希"""
+    digest = hashlib.sha1()
+    for field in (title, author, body, comments):
+        digest.update(field.encode('utf-8'))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def parse_saved_markdown(text: str) -> Optional[Dict[str, str]]:
+    """
+    解析 generate_markdown 生成的文章文件
+
+    Args:
+        text: Markdown 文件内容
+
+    Returns:
+        包含 title/author/url/body/comments 的字典，不是抓取生成的文章时返回None
+    """
+    if CONTENT_MARKER not in text:
+        return None
+
+    header, _, rest = text.partition(CONTENT_MARKER)
+    body, _, comments = rest.partition(COMMENTS_MARKER)
+
+    title_match = re.search(r'^# (.+)$', header, re.MULTILINE)
+    author_match = re.search(r'^\*\*作者：\*\* (?:\[(.+?)\]\(.*?\)|(.+))$', header, re.MULTILINE)
+    url_match = re.search(r'^\| 原文链接 \| \[.*\]\((.+?)\) \|$', header, re.MULTILINE)
+
+    return {
+        'title': title_match.group(1).strip() if title_match else "",
+        'author': (author_match.group(1) or author_match.group(2)).strip() if author_match else "",
+        'url': url_match.group(1) if url_match else "",
+        'body': body.strip(),
+        'comments': comments.strip(),
+    }
+
+
+def index_fields(text: str) -> Optional[Tuple[Dict[str, str], str]]:
+    """
+    从保存的 Markdown 提取索引字段并计算内容哈希
+
+    保存后增量更新与目录重建都经过这里，同一文件两条路径得到的哈希一致。
+
+    Returns:
+        (字段, 内容哈希)，不是抓取生成的文章时返回None
+    """
+    fields = parse_saved_markdown(text)
+    if fields is None:
+        return None
+    return fields, content_hash(fields['title'], fields['author'], fields['body'], fields['comments'])
+
+
+def _scan_file(task: Tuple[str, Optional[str]]) -> Optional[Tuple[str, str, Optional[Dict[str, str]]]]:
+    """
+    工作进程：读取并解析单个文件
+
+    Args:
+        task: (文件路径, 索引中已有的内容哈希)
+
+    Returns:
+        (路径, 内容哈希, 解析结果)；哈希未变化时解析结果为None；非文章文件返回None
+    """
+    path, known_hash = task
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    parsed = index_fields(text)
+    if parsed is None:
+        return None
+
+    fields, digest = parsed
+    if digest == known_hash:
+        return path, digest, None
+    return path, digest, fields
+
+
+def iter_markdown_files(root: str, recursive: bool = False) -> Iterator[str]:
+    """列出目录下的 .md 文件"""
+    if recursive:
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if name.endswith('.md'):
+                    yield os.path.join(dirpath, name)
+    else:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md') and entry.is_file():
+                    yield entry.path
+
+
+class ArticleSearchIndex:
+    """基于 SQLite FTS5 的文章全文索引"""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        初始化索引
+
+        Args:
+            db_path: 索引数据库路径
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        """创建索引表"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                url TEXT,
+                title TEXT,
+                content_hash TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'"
+        ).fetchone()
+        if not exists:
+            # trigram 分词器支持中文子串匹配，旧版 SQLite 不支持时退回 unicode61
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE articles_fts USING fts5(title, author, body, comments, tokenize='trigram')"
+                )
+            except sqlite3.OperationalError:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE articles_fts USING fts5(title, author, body, comments)"
+                )
+        self.conn.commit()
+        sql = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'articles_fts'"
+        ).fetchone()[0]
+        self.trigram = 'trigram' in sql
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def known_hashes(self) -> Dict[str, str]:
+        """返回索引中 路径 -> 内容哈希 的映射"""
+        return dict(self.conn.execute("SELECT path, content_hash FROM documents"))
+
+    def _upsert(self, path: str, url: str, title: str, author: str, body: str, comments: str,
+                digest: str) -> bool:
+        """写入单篇文章，内容未变化时跳过。返回是否发生写入"""
+        row = self.conn.execute(
+            "SELECT id, content_hash FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[1] == digest:
+            return False
+
+        if row:
+            doc_id = row[0]
+            self.conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (doc_id,))
+            self.conn.execute(
+                "UPDATE documents SET url = ?, title = ?, content_hash = ?, indexed_at = ? WHERE id = ?",
+                (url, title, digest, time.time(), doc_id)
+            )
+        else:
+            cursor = self.conn.execute(
+                "INSERT INTO documents (path, url, title, content_hash, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (path, url, title, digest, time.time())
+            )
+            doc_id = cursor.lastrowid
+
+        self.conn.execute(
+            "INSERT INTO articles_fts (rowid, title, author, body, comments) VALUES (?, ?, ?, ?, ?)",
+            (doc_id, title, author, body, comments)
+        )
+        return True
+
+    def add_article(self, path: str, text: Optional[str] = None) -> bool:
+        """
+        保存文章后增量更新索引
+
+        Args:
+            path: 文章保存路径
+            text: 已写入的 Markdown 内容，为None时从文件读取
+
+        Returns:
+            索引是否发生更新
+        """
+        if text is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        parsed = index_fields(text)
+        if parsed is None:
+            return False
+
+        fields, digest = parsed
+        changed = self._upsert(os.path.abspath(path), fields['url'], fields['title'], fields['author'],
+                               fields['body'], fields['comments'], digest)
+        self.conn.commit()
+        return changed
+
+    def remove(self, path: str) -> None:
+        """从索引中删除文章"""
+        path = os.path.abspath(path)
+        row = self.conn.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (row[0],))
+            self.conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+            self.conn.commit()
+
+    def rebuild(self, root: str, recursive: bool = False, full: bool = False,
+                workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        扫描目录重建索引
+
+        Args:
+            root: 文章目录
+            recursive: 是否递归子目录
+            full: 是否清空后从头重建（否则按内容哈希增量更新）
+            workers: 解析进程数，默认使用全部CPU核心
+
+        Returns:
+            统计信息（scanned/updated/unchanged/removed）
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        root = os.path.abspath(os.path.expanduser(root))
+        if full:
+            self.conn.execute("DELETE FROM articles_fts")
+            self.conn.execute("DELETE FROM documents")
+            self.conn.commit()
+
+        known = self.known_hashes()
+        tasks = [(path, known.get(path)) for path in iter_markdown_files(root, recursive)]
+        stats = {'scanned': len(tasks), 'updated': 0, 'unchanged': 0, 'removed': 0}
+        seen = set()
+
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(_scan_file, tasks, chunksize=chunksize):
+                if result is None:
+                    continue
+                path, digest, fields = result
+                seen.add(path)
+                if fields is None:
+                    stats['unchanged'] += 1
+                    continue
+                self._upsert(path, fields['url'], fields['title'], fields['author'],
+                             fields['body'], fields['comments'], digest)
+                stats['updated'] += 1
+
+        # 清理已被删除的文件
+        prefix = root.rstrip(os.sep) + os.sep
+        for path in known:
+            if path.startswith(prefix) and path not in seen:
+                if not recursive and os.path.dirname(path) != root:
+                    continue
+                self.remove(path)
+                stats['removed'] += 1
+
+        self.conn.commit()
+        return stats
+
+    def search(self, query: str, limit: int = 10, raw: bool = False,
+               highlight: Tuple[str, str] = ('**', '**')) -> List[Dict]:
+        """
+        全文检索
+
+        trigram 索引匹配不到不足 3 个字符的词，这些词改用子串过滤；
+        只有短词时退化为全表扫描，按各列命中次数加权排序。
+
+        Args:
+            query: 检索关键词（多个关键词以空格分隔，需同时命中）
+            limit: 返回结果数量
+            raw: 是否直接使用 FTS5 查询语法
+            highlight: 片段高亮的起止标记
+
+        Returns:
+            按相关度排序的结果列表
+        """
+        short_terms: List[str] = []
+        if not raw:
+            terms = query.split()
+            if self.trigram:
+                short_terms = [term.lower() for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+                terms = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+            query = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        if not query and not short_terms:
+            return []
+        if not query:
+            return self._scan_short_terms(short_terms, limit, highlight)
+
+        start, end = highlight
+        all_columns = "lower(articles_fts.title || char(10) || articles_fts.author || char(10) || " \
+                      "articles_fts.body || char(10) || articles_fts.comments)"
+        short_filter = "".join(f" AND instr({all_columns}, ?) > 0" for _ in short_terms)
+        rows = self.conn.execute(f"""
+            SELECT d.path, d.url, d.title, bm25(articles_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS score,
+                   snippet(articles_fts, -1, ?, ?, '…', 24)
+            FROM articles_fts JOIN documents d ON d.id = articles_fts.rowid
+            WHERE articles_fts MATCH ?{short_filter}
+            ORDER BY score
+            LIMIT ?
+        """, (start, end, query, *short_terms, limit)).fetchall()
+
+        return [
+            {'path': path, 'url': url, 'title': title, 'score': -score, 'snippet': snippet}
+            for path, url, title, score, snippet in rows
+        ]
+
+    def _scan_short_terms(self, terms: List[str], limit: int,
+                          highlight: Tuple[str, str]) -> List[Dict]:
+        """只有短词时逐行子串匹配，得分为各列命中次数按 BM25_WEIGHTS 加权之和"""
+        columns = ('title', 'author', 'body', 'comments')
+        scores = []
+        params: List = []
+        for term in terms:
+            for column, weight in zip(columns, BM25_WEIGHTS, strict=True):
+                scores.append(
+                    f"{weight} * (length(lower(f.{column})) - length(replace(lower(f.{column}), ?, ''))) "
+                    f"/ {len(term)}"
+                )
+                params.append(term)
+        filters = " AND ".join(
+            "instr(lower(f.title || char(10) || f.author || char(10) || f.body || char(10) || f.comments), ?) > 0"
+            for _ in terms
+        )
+        rows = self.conn.execute(f"""
+            SELECT d.path, d.url, d.title, {' + '.join(scores)} AS score, f.body, f.comments
+            FROM articles_fts f JOIN documents d ON d.id = f.rowid
+            WHERE {filters}
+            ORDER BY score DESC
+            LIMIT ?
+        """, (*params, *terms, limit)).fetchall()
+
+        return [
+            {'path': path, 'url': url, 'title': title, 'score': score,
+             'snippet': _substring_snippet(body if any(t in body.lower() for t in terms) else comments,
+                                           terms, highlight)}
+            for path, url, title, score, body, comments in rows
+        ]
+
+
+def _substring_snippet(text: str, terms: List[str], highlight: Tuple[str, str], width: int = 32) -> str:
+    """截取第一个命中词附近的片段并高亮全部命中词（子串扫描没有 FTS5 的 snippet 可用）"""
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    if not positions:
+        return text[:width * 2]
+    first = min(positions)
+    begin = max(0, first - width)
+    finish = min(len(text), first + width)
+    fragment = text[begin:finish]
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    start, end = highlight
+    fragment = pattern.sub(lambda m: f"{start}{m.group(0)}{end}", fragment)
+    return ("…" if begin > 0 else "") + fragment + ("…" if finish < len(text) else "")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="掘金文章全文索引")
+    parser.add_argument('--db', default=DEFAULT_INDEX_PATH, help="索引数据库路径")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help="检索文章")
+    search_parser.add_argument('query', nargs='+', help="检索关键词")
+    search_parser.add_argument('--limit', type=int, default=10, help="返回结果数量")
+    search_parser.add_argument('--raw', action='store_true', help="直接使用 FTS5 查询语法")
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="扫描目录重建索引")
+    rebuild_parser.add_argument('root', nargs='?', default="~", help="文章目录，默认为用户主目录")
+    rebuild_parser.add_argument('--recursive', action='store_true', help="递归扫描子目录")
+    rebuild_parser.add_argument('--full', action='store_true', help="清空索引后从头重建")
+    rebuild_parser.add_argument('--workers', type=int, default=None, help="解析进程数，默认为CPU核心数")
+
+    args = parser.parse_args()
+    index = ArticleSearchIndex(args.db)
+
+    try:
+        if args.command == 'rebuild':
+            start = time.time()
+            stats = index.rebuild(args.root, recursive=args.recursive, full=args.full, workers=args.workers)
+            print(f"✅ 索引完成：扫描 {stats['scanned']} 个文件，更新 {stats['updated']}，"
+                  f"未变化 {stats['unchanged']}，删除 {stats['removed']}，耗时 {time.time() - start:.2f}s")
+        else:
+            highlight = ('\033[1;31m', '\033[0m') if sys.stdout.isatty() else ('**', '**')
+            results = index.search(" ".join(args.query), limit=args.limit, raw=args.raw, highlight=highlight)
+            if not results:
+                print("没有找到匹配的文章")
+                return
+            for i, result in enumerate(results, 1):
+                print(f"{i}. {result['title']}  (得分 {result['score']:.3f})")
+                print(f"   {result['path']}")
+                if result['url']:
+                    print(f"   {result['url']}")
+                print(f"   {result['snippet'].replace(chr(10), ' ')}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,771 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown 存档的增量静态站点构建
+功能：
+1. 把存档目录下的 Markdown（抓取保存的文章、周报/ 等笔记）渲染为可浏览的 HTML 站点，
+   输出目录与源目录结构相同，本地图片按原相对路径复制，页面中的图片与 .md 链接无需改写
+2. 依赖清单（输出目录下的 .site_build.db）：记录每个源文件的修改时间、大小与内容哈希，
+   每个页面引用的本地图片，以及共享模板（页面、列表、样式）的哈希；
+   修改时间与大小未变的文件不重新读取
+3. 只重建受影响的页面：源文件内容变化或页面模板变化；已删除的源文件同时删除页面。
+   页面只链接图片，图片变化时只重新复制图片。需要重建的页面较多时用多进程并行渲染
+4. 首页、分区页（按顶层目录）与按月归档页增量生成：只重新生成变化页面所在的分区与月份，
+   内容哈希未变的列表页不重写；一篇文章的变化与存档规模无关
+5. --changed 直接给出变化的文件（例如 git diff --name-only 或抓取器刚保存的文件），跳过全量扫描
+
+安装 markdown 包时用它转换（表格、围栏代码块）；否则使用内置的简化转换（标题、段落、列表、引用、
+代码块、表格、链接、图片、粗体 / 斜体 / 行内代码）。
+正文与评论来自抓取的网页，不可信：两种转换都把原始 HTML 转义为文本，链接与图片只保留
+http / https 与相对地址。
+
+模板目录（--templates）中的 page.html / list.html / style.css 覆盖内置模板，使用 string.Template 语法：
+    page.html：$site_title $title $date $section $section_link $root $content
+    list.html：$site_title $title $root $content
+
+使用方法：
+    python -m juejin_scraper.site_build <源目录> <输出目录> build [--templates DIR] [--workers N]
+        [--changed PATH ...] [--exclude GLOB ...] [--full]
+    python -m juejin_scraper.site_build <源目录> <输出目录> stats
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import html
+import os
+import re
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote
+
+MANIFEST_FILENAME = ".site_build.db"
+# 渲染规则变化时递增，全部页面随之重建
+BUILD_VERSION = "2"
+SITE_TITLE = "文章存档"
+# 需要重建的页面少于该数量时在当前进程渲染（进程池启动开销大于收益）
+PARALLEL_THRESHOLD = 16
+RECENT_COUNT = 30
+LIST_DIR = "_lists"
+ROOT_SECTION_SLUG = "_root"
+SKIP_DIRS = {'__pycache__', 'node_modules', '.git', '.idea', '.venv', 'venv'}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title - $site_title</title>
+<link rel="stylesheet" href="${root}style.css">
+</head>
+<body>
+<nav><a href="${root}index.html">$site_title</a> / <a href="$section_link">$section</a></nav>
+<article>
+<p class="meta">$date</p>
+$content
+</article>
+</body>
+</html>
+"""
+
+LIST_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title - $site_title</title>
+<link rel="stylesheet" href="${root}style.css">
+</head>
+<body>
+<nav><a href="${root}index.html">$site_title</a></nav>
+<main>
+<h1>$title</h1>
+$content
+</main>
+</body>
+</html>
+"""
+
+STYLE = """body { max-width: 860px; margin: 2em auto; padding: 0 1em; font: 16px/1.7 -apple-system, "PingFang SC",
+  "Microsoft YaHei", sans-serif; color: #222; }
+nav { margin-bottom: 1.5em; color: #888; }
+a { color: #1e80ff; text-decoration: none; }
+pre { background: #f6f8fa; padding: 0.8em; overflow-x: auto; }
+code { font-family: Menlo, Consolas, monospace; font-size: 0.9em; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #ddd; padding: 0.3em 0.6em; }
+blockquote { margin: 0; padding-left: 1em; border-left: 4px solid #ddd; color: #555; }
+img { max-width: 100%; }
+.meta, .summary { color: #888; }
+ul.entries li { margin: 0.5em 0; }
+"""
+
+_DATE_IN_TABLE = re.compile(r'^\| 发表时间 \| (\d{4})-(\d{1,2})-(\d{1,2})', re.MULTILINE)
+_DATE_IN_NAME = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})|^(\d{4})(\d{2})(\d{2})\d{6,}')
+_MD_IMAGE = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+_LIST_ITEM = re.compile(r'^\s*([-*+]|\d+[.)])\s+')
+_URL_SCHEME = re.compile(r'^([a-z][a-z0-9+.-]*):', re.IGNORECASE)
+_URL_ATTR = re.compile(r'\b(href|src)="([^"]*)"')
+_MD_HREF = re.compile(r'href="(?![a-z][a-z0-9+.-]*:|/|#)([^"#?]+?)\.md([#?][^"]*)?"', re.IGNORECASE)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def output_path(rel: str) -> str:
+    """源文件相对路径 -> 页面相对路径"""
+    return rel[:-3] + '.html'
+
+
+def root_prefix(rel: str) -> str:
+    """从该相对路径所在目录回到站点根目录的前缀"""
+    return '../' * rel.count('/')
+
+
+def section_of(rel: str, sharded: bool) -> str:
+    """分区：顶层目录名；抓取输出目录的哈希分片（两位十六进制）归入"文章"，根目录下的文件为空字符串"""
+    if '/' not in rel:
+        return ''
+    top = rel.split('/', 1)[0]
+    if sharded and re.fullmatch(r'[0-9a-f]{2}', top):
+        return '文章'
+    return top
+
+
+def section_slug(section: str) -> str:
+    return section or ROOT_SECTION_SLUG
+
+
+def section_title(section: str) -> str:
+    return section or "根目录"
+
+
+def local_images(text: str, rel: str) -> List[str]:
+    """Markdown 中引用的本地图片（相对源目录的路径，未检查是否存在）"""
+    base = os.path.dirname(rel)
+    images = []
+    for match in _MD_IMAGE.finditer(text):
+        src = match.group(1)
+        if re.match(r'^[a-z][a-z0-9+.-]*:', src, re.IGNORECASE) or src.startswith(('/', '#')):
+            continue
+        path = os.path.normpath(os.path.join(base, unquote(src.split('?', 1)[0].split('#', 1)[0])))
+        if not path.startswith('..') and path not in images:
+            images.append(path.replace(os.sep, '/'))
+    return images
+
+
+def page_metadata(text: str, rel: str, mtime: float) -> Dict[str, str]:
+    """标题（第一个一级标题，否则文件名）、日期（发表时间 / 文件名中的日期 / 修改时间）与摘要"""
+    from .search_index import CONTENT_MARKER
+
+    name = os.path.basename(rel)[:-3]
+    title_match = re.search(r'^# (.+)$', text, re.MULTILINE)
+    title = title_match.group(1).strip() if title_match else name
+
+    date = None
+    match = _DATE_IN_TABLE.search(text) or _DATE_IN_NAME.search(name)
+    if match:
+        year, month, day = [g for g in match.groups() if g is not None]
+        date = f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
+    if date is None:
+        date = time.strftime('%Y-%m-%d', time.localtime(mtime))
+
+    # 抓取保存的文章从正文开始取摘要，跳过作者与信息表格
+    body = text.partition(CONTENT_MARKER)[2] or text
+    summary = ''
+    for line in body.splitlines():
+        line = line.strip()
+        if not line or line.startswith(('#', '|', '!', '```', '>', '<', '---', '**作者')):
+            continue
+        summary = re.sub(r'[*_`]|!?\[([^\]]*)\]\([^)]*\)', lambda m: m.group(1) or '', line)
+        break
+    return {'title': title, 'date': date, 'month': date[:7], 'summary': summary[:120]}
+
+
+def safe_url(url: str) -> bool:
+    """链接 / 图片地址是否可以输出：http、https 或相对地址（浏览器会忽略协议名中的空白与控制字符）"""
+    match = _URL_SCHEME.match(re.sub(r'[\x00-\x20]', '', html.unescape(url)))
+    return match is None or match.group(1).lower() in ('http', 'https')
+
+
+def _attr(value: str) -> str:
+    """已转义（quote=False）的文本 -> 双引号属性值"""
+    return html.escape(html.unescape(value), quote=True)
+
+
+def _inline(text: str) -> str:
+    """行内 Markdown：代码、图片、链接、粗体、斜体（先转义 HTML）"""
+    codes: List[str] = []
+
+    def keep_code(match):
+        codes.append(f"<code>{html.escape(match.group(1))}</code>")
+        return f"\x00{len(codes) - 1}\x00"
+
+    def image(match):
+        if not safe_url(match.group(2)):
+            return match.group(1)
+        return f'<img src="{_attr(match.group(2))}" alt="{_attr(match.group(1))}">'
+
+    def link(match):
+        if not safe_url(match.group(2)):
+            return match.group(1)
+        return f'<a href="{_attr(match.group(2))}">{match.group(1)}</a>'
+
+    text = re.sub(r'`([^`]+)`', keep_code, text)
+    text = html.escape(text, quote=False)
+    text = re.sub(r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)', image, text)
+    text = re.sub(r'\[([^\]]+)\]\(([^)\s]+)(?:\s+"[^"]*")?\)', link, text)
+    text = re.sub(r'\*\*(.+?)\*\*|__(.+?)__', lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+    text = re.sub(r'(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\w)', r'<em>\1</em>', text)
+    return re.sub(r'\x00(\d+)\x00', lambda m: codes[int(m.group(1))], text)
+
+
+def simple_markdown(text: str) -> str:
+    """内置的简化 Markdown 转换（未安装 markdown 包时使用）"""
+    out: List[str] = []
+    lines = text.splitlines()
+    i = 0
+    paragraph: List[str] = []
+
+    def flush():
+        if paragraph:
+            out.append(f"<p>{_inline(' '.join(paragraph))}</p>")
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            flush()
+            lang = stripped[3:].strip()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith('```'):
+                code.append(lines[i])
+                i += 1
+            attr = f' class="language-{html.escape(lang)}"' if lang else ''
+            out.append(f"<pre><code{attr}>{html.escape(chr(10).join(code))}</code></pre>")
+        elif not stripped:
+            flush()
+        elif re.match(r'^#{1,6}\s', stripped):
+            flush()
+            level = len(stripped) - len(stripped.lstrip('#'))
+            out.append(f"<h{level}>{_inline(stripped[level:].strip())}</h{level}>")
+        elif re.fullmatch(r'(-{3,}|\*{3,}|_{3,})', stripped):
+            flush()
+            out.append("<hr>")
+        elif stripped.startswith('>'):
+            flush()
+            quoted = []
+            while i < len(lines) and lines[i].strip().startswith('>'):
+                quoted.append(lines[i].strip()[1:].lstrip())
+                i += 1
+            out.append(f"<blockquote>{simple_markdown(chr(10).join(quoted))}</blockquote>")
+            continue
+        elif stripped.startswith('|') and i + 1 < len(lines) and re.fullmatch(r'\|?[\s:|-]+\|?', lines[i + 1].strip()):
+            flush()
+
+            def cells(row):
+                return [cell.strip() for cell in row.strip().strip('|').split('|')]
+
+            rows = [f"<tr>{''.join(f'<th>{_inline(c)}</th>' for c in cells(line))}</tr>"]
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith('|'):
+                rows.append(f"<tr>{''.join(f'<td>{_inline(c)}</td>' for c in cells(lines[i]))}</tr>")
+                i += 1
+            out.append(f"<table>{''.join(rows)}</table>")
+            continue
+        elif re.match(r'^([-*+]|\d+[.)])\s', stripped):
+            flush()
+            tag = 'ol' if stripped[0].isdigit() else 'ul'
+            items = []
+            while i < len(lines) and _LIST_ITEM.match(lines[i]):
+                items.append(f"<li>{_inline(_LIST_ITEM.sub('', lines[i]))}</li>")
+                i += 1
+            out.append(f"<{tag}>{''.join(items)}</{tag}>")
+            continue
+        else:
+            paragraph.append(stripped)
+        i += 1
+    flush()
+    return "\n".join(out)
+
+
+def markdown_to_html(text: str) -> str:
+    """Markdown 转 HTML：优先使用 markdown 包（原始 HTML 转义，不安全的链接与图片地址替换为 #）"""
+    try:
+        import markdown
+    except ImportError:
+        return simple_markdown(text)
+    md = markdown.Markdown(extensions=['tables', 'fenced_code'])
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    return _URL_ATTR.sub(lambda m: m.group(0) if safe_url(m.group(2)) else f'{m.group(1)}="#"', md.convert(text))
+
+
+def _render_page(task: Tuple[str, str, str, str, str, str]) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """
+    渲染工作进程：转换并写出一个页面
+
+    Args:
+        task: (源目录, 源文件相对路径, 输出目录, 页面模板, 分区, 分区列表页链接)
+
+    Returns:
+        (源文件相对路径, 页面元数据与引用的图片, 错误信息)
+    """
+    source_root, rel, out_root, template, section, section_link = task
+    try:
+        path = os.path.join(source_root, rel)
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        meta = page_metadata(text, rel, os.path.getmtime(path))
+        content = _MD_HREF.sub(lambda m: f'href="{m.group(1)}.html{m.group(2) or ""}"', markdown_to_html(text))
+        root = root_prefix(rel)
+        page = Template(template).safe_substitute(
+            site_title=SITE_TITLE, title=html.escape(meta['title']), date=meta['date'],
+            section=html.escape(section_title(section)), section_link=root + section_link, root=root,
+            content=content,
+        )
+        write_atomic(os.path.join(out_root, output_path(rel)), page)
+        meta['images'] = local_images(text, rel)
+        return rel, meta, None
+    except Exception as e:
+        return rel, None, str(e)
+
+
+def write_atomic(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class SiteBuilder:
+    """增量站点构建：依赖清单保存在输出目录"""
+
+    def __init__(self, source_root: str, out_root: str, templates: Optional[str] = None,
+                 workers: Optional[int] = None, excludes: Iterable[str] = ()):
+        """
+        Args:
+            source_root: Markdown 存档目录
+            out_root: 站点输出目录
+            templates: 模板目录（page.html / list.html / style.css），缺少的使用内置模板
+            workers: 并行渲染的进程数，默认为CPU核心数
+            excludes: 排除的相对路径通配符
+        """
+        self.source_root = os.path.abspath(os.path.expanduser(source_root))
+        self.out_root = os.path.abspath(os.path.expanduser(out_root))
+        self.workers = workers or os.cpu_count() or 1
+        self.excludes = list(excludes)
+        self.templates = {
+            'page': self._template(templates, 'page.html', PAGE_TEMPLATE),
+            'list': self._template(templates, 'list.html', LIST_TEMPLATE),
+            'style': self._template(templates, 'style.css', STYLE),
+        }
+        from .output_layout import INDEX_FILENAME
+
+        # 抓取输出目录（ArticleStore）的哈希分片归入同一分区
+        self.sharded = os.path.exists(os.path.join(self.source_root, INDEX_FILENAME))
+        os.makedirs(self.out_root, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.out_root, MANIFEST_FILENAME), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                hash TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS pages (
+                source TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                date TEXT NOT NULL,
+                month TEXT NOT NULL,
+                section TEXT NOT NULL,
+                summary TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pages_month ON pages (section, month, date);
+            CREATE INDEX IF NOT EXISTS pages_date ON pages (section, date);
+            CREATE INDEX IF NOT EXISTS pages_recent ON pages (date);
+            CREATE TABLE IF NOT EXISTS deps (
+                dep TEXT NOT NULL,
+                source TEXT NOT NULL,
+                PRIMARY KEY (dep, source)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS deps_source ON deps (source);
+            CREATE TABLE IF NOT EXISTS listings (path TEXT PRIMARY KEY, hash TEXT NOT NULL) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _template(directory: Optional[str], name: str, default: str) -> str:
+        if directory:
+            path = os.path.join(os.path.expanduser(directory), name)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+        return default
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _excluded(self, rel: str) -> bool:
+        return any(fnmatch.fnmatch(rel, pattern) for pattern in self.excludes)
+
+    def _walk(self) -> Iterator[str]:
+        """源目录下的全部 Markdown（相对路径），跳过输出目录、隐藏目录与排除项"""
+        for directory, dirnames, filenames in os.walk(self.source_root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS
+                           and os.path.join(directory, d) != self.out_root]
+            for filename in filenames:
+                if filename.endswith('.md'):
+                    rel = os.path.relpath(os.path.join(directory, filename), self.source_root).replace(os.sep, '/')
+                    if not self._excluded(rel):
+                        yield rel
+
+    def _check(self, rels: Iterable[str]) -> Tuple[Set[str], Set[str], List[Tuple[str, int, int, str]]]:
+        """
+        按修改时间与大小检查文件，变化的才重新计算哈希
+
+        Returns:
+            (内容变化的文件, 已不存在的文件, 需要更新的 files 记录)
+        """
+        known = {}
+        rels = list(rels)
+        for start in range(0, len(rels), 500):
+            chunk = rels[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for path, mtime_ns, size, digest in self.conn.execute(
+                    f"SELECT path, mtime_ns, size, hash FROM files WHERE path IN ({placeholders})", chunk):
+                known[path] = (mtime_ns, size, digest)
+        changed, missing, updates = set(), set(), []
+        for rel in rels:
+            try:
+                st = os.stat(os.path.join(self.source_root, rel))
+            except OSError:
+                missing.add(rel)
+                continue
+            old = known.get(rel)
+            if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                continue
+            digest = file_hash(os.path.join(self.source_root, rel))
+            updates.append((rel, st.st_mtime_ns, st.st_size, digest))
+            if not old or old[2] != digest:
+                changed.add(rel)
+        return changed, missing, updates
+
+    def build(self, changed_paths: Optional[Iterable[str]] = None, full: bool = False) -> Dict[str, float]:
+        """
+        增量构建
+
+        Args:
+            changed_paths: 已知变化的文件（Markdown、图片或模板目录中的文件），为None时扫描整个源目录
+            full: 忽略依赖清单，重建全部页面与列表页
+
+        Returns:
+            统计：pages（重建页面数）/ removed / images / listings / errors / seconds
+        """
+        start = time.time()
+        stats = {'pages': 0, 'removed': 0, 'images': 0, 'listings': 0, 'errors': 0}
+
+        # 模板与渲染规则变化时全部页面重建；列表页模板变化时全部列表页重新生成
+        page_key = text_hash(BUILD_VERSION, self.templates['page'])
+        list_key = text_hash(BUILD_VERSION, self.templates['list'])
+        full = full or self._meta('page_template') != page_key
+        full_listings = full or self._meta('list_template') != list_key
+        style_path = os.path.join(self.out_root, 'style.css')
+        if full or self._meta('style') != text_hash(self.templates['style']) or not os.path.exists(style_path):
+            write_atomic(style_path, self.templates['style'])
+
+        if changed_paths is None or full:
+            known_sources = {row[0] for row in self.conn.execute("SELECT source FROM pages")}
+            candidates = set(self._walk())
+            deleted = known_sources - candidates
+            deps = {row[0] for row in self.conn.execute("SELECT DISTINCT dep FROM deps")}
+        else:
+            rels = set()
+            for path in changed_paths:
+                absolute = os.path.abspath(os.path.expanduser(path))
+                rel = os.path.relpath(absolute, self.source_root).replace(os.sep, '/')
+                if not rel.startswith('..'):
+                    rels.add(rel)
+            candidates = {rel for rel in rels if rel.endswith('.md') and not self._excluded(rel)}
+            deleted = {rel for rel in candidates if not os.path.exists(os.path.join(self.source_root, rel))}
+            candidates -= deleted
+            known_sources = {rel for rel in candidates | deleted
+                             if self.conn.execute("SELECT 1 FROM pages WHERE source = ?", (rel,)).fetchone()}
+            deps = {rel for rel in rels if not rel.endswith('.md')
+                    and self.conn.execute("SELECT 1 FROM deps WHERE dep = ?", (rel,)).fetchone()}
+
+        changed, _, updates = self._check(candidates)
+        # 页面只链接图片，图片变化时重新复制即可，不需要重建页面
+        changed_deps, missing_deps, dep_updates = self._check(deps)
+        dirty = set(candidates) if full else (changed | (candidates - known_sources))
+        dirty -= deleted
+        # 需要重建的页面渲染成功后才记入依赖清单，失败的页面下次构建时重试
+        rendered_updates = {update[0]: update for update in updates if update[0] in dirty}
+        updates = [update for update in updates if update[0] not in dirty]
+
+        # 受影响的列表页：变化页面的新旧分区与月份
+        touched: Set[Tuple[str, str]] = set()
+        for rel in dirty | deleted:
+            row = self.conn.execute("SELECT section, month FROM pages WHERE source = ?", (rel,)).fetchone()
+            if row:
+                touched.add(row)
+
+        with self.conn:
+            for rel in deleted:
+                try:
+                    os.remove(os.path.join(self.out_root, output_path(rel)))
+                except OSError:
+                    pass
+                self.conn.execute("DELETE FROM pages WHERE source = ?", (rel,))
+                self.conn.execute("DELETE FROM deps WHERE source = ?", (rel,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+                stats['removed'] += 1
+            for image in missing_deps:
+                try:
+                    os.remove(os.path.join(self.out_root, image))
+                except OSError:
+                    pass
+                self.conn.execute("DELETE FROM files WHERE path = ?", (image,))
+            self.conn.executemany("INSERT OR REPLACE INTO files (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)",
+                                  updates + dep_updates)
+
+        images: Set[str] = set()
+        for rel, meta, error in self._render(sorted(dirty)):
+            if error:
+                print(f"❌ 渲染失败：{rel}（{error}）")
+                stats['errors'] += 1
+                # 源文件未变化（例如模板变化触发的重建）时也要重试
+                with self.conn:
+                    self.conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+                continue
+            section = section_of(rel, self.sharded)
+            touched.add((section, meta['month']))
+            existing = [image for image in meta['images'] if os.path.isfile(os.path.join(self.source_root, image))]
+            images.update(existing)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO pages (source, title, date, month, section, summary) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (rel, meta['title'], meta['date'], meta['month'], section, meta['summary'])
+                )
+                self.conn.execute("DELETE FROM deps WHERE source = ?", (rel,))
+                self.conn.executemany("INSERT INTO deps (dep, source) VALUES (?, ?)",
+                                      ((image, rel) for image in existing))
+                if rel in rendered_updates:
+                    self.conn.execute("INSERT OR REPLACE INTO files (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)",
+                                      rendered_updates[rel])
+            stats['pages'] += 1
+
+        # 新引用的图片记入依赖清单
+        _, _, image_updates = self._check(images - deps)
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO files (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)",
+                                  image_updates)
+        stats['images'] = self._copy_images(images | changed_deps, full)
+        stats['listings'] = self._build_listings(touched, full_listings)
+
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('page_template', ?)", (page_key,))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('list_template', ?)", (list_key,))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('style', ?)",
+                              (text_hash(self.templates['style']),))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)", (str(time.time()),))
+        stats['seconds'] = time.time() - start
+        return stats
+
+    def _render(self, rels: List[str]) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+        tasks = []
+        for rel in rels:
+            section = section_of(rel, self.sharded)
+            tasks.append((self.source_root, rel, self.out_root, self.templates['page'], section,
+                          f"{LIST_DIR}/{quote(section_slug(section))}/index.html"))
+        if len(tasks) < PARALLEL_THRESHOLD or self.workers == 1:
+            yield from map(_render_page, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(_render_page, tasks, chunksize=max(1, len(tasks) // (self.workers * 4)))
+
+    def _copy_images(self, images: Iterable[str], full: bool) -> int:
+        """复制引用的本地图片（目标已存在且大小、修改时间相同的跳过）"""
+        copied = 0
+        for image in images:
+            source = os.path.join(self.source_root, image)
+            target = os.path.join(self.out_root, image)
+            try:
+                st = os.stat(source)
+                if not full and os.path.exists(target):
+                    target_st = os.stat(target)
+                    if target_st.st_size == st.st_size and target_st.st_mtime_ns == st.st_mtime_ns:
+                        continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(source, target)
+                copied += 1
+            except OSError as e:
+                print(f"⚠️ 复制图片失败：{image}（{e}）")
+        return copied
+
+    def _write_listing(self, rel: str, title: str, content: str, full: bool) -> bool:
+        """写出列表页，内容哈希未变时跳过"""
+        page = Template(self.templates['list']).safe_substitute(
+            site_title=SITE_TITLE, title=html.escape(title), root=root_prefix(rel), content=content,
+        )
+        digest = text_hash(page)
+        row = self.conn.execute("SELECT hash FROM listings WHERE path = ?", (rel,)).fetchone()
+        target = os.path.join(self.out_root, rel)
+        if not full and row and row[0] == digest and os.path.exists(target):
+            return False
+        write_atomic(target, page)
+        self.conn.execute("INSERT OR REPLACE INTO listings (path, hash) VALUES (?, ?)", (rel, digest))
+        return True
+
+    def _entries(self, rows, root: str) -> str:
+        items = []
+        for source, title, date, summary in rows:
+            summary_html = f'<div class="summary">{html.escape(summary)}</div>' if summary else ''
+            items.append(f'<li><a href="{root}{quote(output_path(source))}">{html.escape(title)}</a> '
+                         f'<span class="meta">{date}</span>{summary_html}</li>')
+        return f'<ul class="entries">{"".join(items)}</ul>'
+
+    def _build_listings(self, touched: Set[Tuple[str, str]], full: bool) -> int:
+        """重新生成受影响的月份页、分区页与首页"""
+        if full:
+            touched = set(self.conn.execute("SELECT DISTINCT section, month FROM pages"))
+            touched.update((row[0], None) for row in self.conn.execute(
+                "SELECT DISTINCT section FROM pages"))
+        if not touched:
+            return 0
+        written = 0
+        with self.conn:
+            for section, month in sorted(touched, key=lambda item: (item[0], item[1] or '')):
+                if month is None:
+                    continue
+                rel = f"{LIST_DIR}/{section_slug(section)}/{month}.html"
+                rows = self.conn.execute(
+                    "SELECT source, title, date, summary FROM pages WHERE section = ? AND month = ? "
+                    "ORDER BY date DESC, title", (section, month)
+                ).fetchall()
+                if not rows:
+                    self._remove_listing(rel)
+                    continue
+                written += self._write_listing(rel, f"{section_title(section)} · {month}",
+                                               self._entries(rows, root_prefix(rel)), full)
+
+            for section in sorted({section for section, _ in touched}):
+                rel = f"{LIST_DIR}/{section_slug(section)}/index.html"
+                months = self.conn.execute(
+                    "SELECT month, COUNT(*) FROM pages WHERE section = ? GROUP BY month ORDER BY month DESC",
+                    (section,)
+                ).fetchall()
+                if not months:
+                    self._remove_listing(rel)
+                    continue
+                recent = self.conn.execute(
+                    "SELECT source, title, date, summary FROM pages WHERE section = ? ORDER BY date DESC, title "
+                    "LIMIT ?", (section, RECENT_COUNT)
+                ).fetchall()
+                archive = "".join(f'<li><a href="{quote(month)}.html">{month}</a>（{count}）</li>'
+                                  for month, count in months)
+                content = (f"<h2>最近</h2>{self._entries(recent, root_prefix(rel))}"
+                           f"<h2>按月归档</h2><ul>{archive}</ul>")
+                written += self._write_listing(rel, section_title(section), content, full)
+
+            sections = self.conn.execute(
+                "SELECT section, COUNT(*), MAX(date) FROM pages GROUP BY section ORDER BY MAX(date) DESC"
+            ).fetchall()
+            recent = self.conn.execute(
+                "SELECT source, title, date, summary FROM pages ORDER BY date DESC, title LIMIT ?", (RECENT_COUNT,)
+            ).fetchall()
+            links = "".join(
+                f'<li><a href="{LIST_DIR}/{quote(section_slug(section))}/index.html">'
+                f'{html.escape(section_title(section))}</a>（{count} 篇，最近 {latest}）</li>'
+                for section, count, latest in sections
+            )
+            content = f"<h2>分区</h2><ul>{links}</ul><h2>最近</h2>{self._entries(recent, '')}"
+            written += self._write_listing("index.html", SITE_TITLE, content, full)
+        return written
+
+    def _remove_listing(self, rel: str) -> None:
+        try:
+            os.remove(os.path.join(self.out_root, rel))
+        except OSError:
+            pass
+        self.conn.execute("DELETE FROM listings WHERE path = ?", (rel,))
+
+    def stats(self) -> Dict:
+        pages = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        sections = self.conn.execute("SELECT section, COUNT(*) FROM pages GROUP BY section ORDER BY section").fetchall()
+        images = self.conn.execute("SELECT COUNT(DISTINCT dep) FROM deps").fetchone()[0]
+        built_at = self._meta('built_at')
+        return {'pages': pages, 'sections': sections, 'images': images,
+                'built_at': float(built_at) if built_at else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown 存档的增量静态站点构建")
+    parser.add_argument('source', help="Markdown 存档目录")
+    parser.add_argument('output', help="站点输出目录")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="增量构建")
+    build_parser.add_argument('--templates', metavar='DIR', default=None,
+                              help="模板目录（page.html / list.html / style.css），缺少的使用内置模板")
+    build_parser.add_argument('--workers', type=int, default=None, help="并行渲染的进程数，默认为CPU核心数")
+    build_parser.add_argument('--changed', nargs='+', metavar='PATH', default=None,
+                              help="只检查这些文件（Markdown 或图片），跳过全量扫描")
+    build_parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                              help="排除匹配的相对路径（可多次指定）")
+    build_parser.add_argument('--full', action='store_true', help="忽略依赖清单，全部重建")
+
+    subparsers.add_parser('stats', help="已构建的页面与分区")
+
+    args = parser.parse_args()
+    if args.command == 'stats':
+        builder = SiteBuilder(args.source, args.output)
+        try:
+            stats = builder.stats()
+        finally:
+            builder.close()
+        built = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['built_at'])) if stats['built_at'] else "从未"
+        print(f"📊 {stats['pages']} 个页面，引用本地图片 {stats['images']} 张，上次构建：{built}")
+        for section, count in stats['sections']:
+            print(f"  {section_title(section)}：{count}")
+        return
+
+    builder = SiteBuilder(args.source, args.output, templates=args.templates, workers=args.workers,
+                          excludes=args.exclude)
+    try:
+        stats = builder.build(args.changed, full=args.full)
+    finally:
+        builder.close()
+    print(f"🏗️ 重建页面 {stats['pages']} 个，删除 {stats['removed']} 个，复制图片 {stats['images']} 张，"
+          f"更新列表页 {stats['listings']} 个，失败 {stats['errors']} 个，耗时 {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
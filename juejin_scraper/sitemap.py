@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+站点地图与订阅源流式导入
+功能：
+1. 读取 sitemap 索引（sitemapindex）与子 sitemap（urlset）、RSS（item/link）与 Atom（entry/link）订阅源，
+   来源可以是 URL 或本地文件，gzip 压缩按文件头自动识别并边下载边解压
+2. 流式解析：iterparse 逐条产出 (URL, lastmod)，处理完的条目立即从树中移除，内存占用与文件大小无关；
+   子 sitemap 在读完上一个之后才开始下载
+3. 按正则（--pattern，可多次指定，任一命中即可）与 lastmod（--since）过滤；
+   sitemap 索引中 lastmod 早于 --since 的子 sitemap 整个跳过，不再下载
+4. 过滤后的URL按块经过URL前沿（frontier：规范化、跳过已见过的文章、按来源与 lastmod 计算优先级）
+   写入任务队列（--queue，与 work_queue 相同的 SQLite 文件或队列服务），
+   或逐行输出规范URL到标准输出（不记入已见集合）；全程不把URL列表放在内存中
+
+没有 lastmod 的条目无法判断新旧，--since 过滤时保留。
+
+使用方法：
+    python -m juejin_scraper.sitemap https://juejin.cn/sitemap.xml --pattern '/post/\\d+' --since 2024-01-01 \\
+        --queue ~/.juejin_queue.db --batch archive
+    python -m juejin_scraper.sitemap sitemap-1.xml.gz feed.xml > urls.txt
+"""
+
+import argparse
+import gzip
+import io
+import itertools
+import os
+import re
+import sys
+import time
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from .config import DEFAULT_FRONTIER_PATH
+
+# 条目元素：sitemap 索引的子 sitemap、urlset 的URL、RSS 的 item、Atom 的 entry
+_ENTRY_TAGS = {'sitemap', 'url', 'item', 'entry'}
+_DATE_TAGS = ('lastmod', 'updated', 'published', 'pubDate', 'date')
+
+USER_AGENT = 'Mozilla/5.0 (compatible; juejin-scraper sitemap reader)'
+
+
+@lru_cache(maxsize=256)
+def _local(tag: str) -> str:
+    """去掉命名空间的标签名（标签种类很少，缓存结果）"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_date(text: Optional[str]) -> Optional[float]:
+    """解析 W3C 日期时间（sitemap / Atom）或 RFC 822 日期（RSS），返回时间戳；无法解析返回None"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            value = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def open_source(source: str, timeout: float = 30) -> BinaryIO:
+    """打开 URL 或本地文件，gzip 内容自动解压（流式）"""
+    if source.startswith(('http://', 'https://')):
+        request = urllib.request.Request(source, headers={'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip'})
+        stream = io.BufferedReader(urllib.request.urlopen(request, timeout=timeout))
+    else:
+        stream = open(os.path.expanduser(source), 'rb')
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    return stream
+
+
+def _resolve(base: str, location: str) -> str:
+    """子 sitemap 位置：绝对 URL 原样返回，相对位置按来源（URL 或本地文件所在目录）解析"""
+    if location.startswith(('http://', 'https://')) or base.startswith(('http://', 'https://')):
+        return urljoin(base, location)
+    return os.path.join(os.path.dirname(os.path.expanduser(base)), location)
+
+
+def iter_entries(stream: BinaryIO) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    流式解析一个 sitemap / 订阅源
+
+    Yields:
+        (条目类型, 位置, 日期文本)；条目类型为 sitemap / url / item / entry
+    """
+    # 从根到当前节点的路径，条目处理完后从其父节点中移除
+    path: List[ET.Element] = []
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            path.append(element)
+            continue
+        path.pop()
+        kind = _local(element.tag)
+        if kind not in _ENTRY_TAGS:
+            continue
+        location, date = None, None
+        for child in element:
+            name = _local(child.tag)
+            if name in ('loc', 'link') and location is None:
+                # Atom 的链接在 href 属性中（rel 缺省或为 alternate）
+                if child.get('href') is not None:
+                    if child.get('rel', 'alternate') == 'alternate':
+                        location = child.get('href')
+                else:
+                    location = (child.text or '').strip() or None
+            elif name == 'guid' and location is None and (child.text or '').startswith('http'):
+                location = child.text.strip()
+            elif name in _DATE_TAGS and date is None:
+                date = child.text
+        # 已处理的条目立即释放，父节点（urlset / channel / feed）不累积子节点
+        element.clear()
+        if path:
+            path[-1].remove(element)
+        if location:
+            yield kind, location, date
+
+
+class SitemapReader:
+    """递归读取 sitemap 索引与订阅源，按规则过滤后产出URL"""
+
+    def __init__(self, patterns: Iterable[str] = (), since: Optional[float] = None, timeout: float = 30,
+                 max_depth: int = 3):
+        """
+        Args:
+            patterns: URL 正则，任一命中即保留；为空时全部保留
+            since: 只保留 lastmod 不早于该时间戳的条目
+            timeout: 下载超时（秒）
+            max_depth: sitemap 索引的最大嵌套层数
+        """
+        self.patterns = [re.compile(p) for p in patterns]
+        self.since = since
+        self.timeout = timeout
+        self.max_depth = max_depth
+        self.counts: Counter = Counter()
+
+    def _keep_date(self, date: Optional[str]) -> bool:
+        if self.since is None:
+            return True
+        stamp = parse_date(date)
+        return stamp is None or stamp >= self.since
+
+    def _matches(self, url: str) -> bool:
+        return not self.patterns or any(p.search(url) for p in self.patterns)
+
+    def urls(self, source: str, depth: int = 0) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        产出来源中通过过滤的 (URL, 日期文本)，sitemap 索引展开为其子 sitemap
+
+        Args:
+            source: URL 或本地文件
+            depth: 当前嵌套层数
+        """
+        self.counts['sitemaps'] += 1
+        children: List[str] = []
+        try:
+            with open_source(source, self.timeout) as stream:
+                for kind, location, date in iter_entries(stream):
+                    if kind == 'sitemap':
+                        # 子 sitemap 只记录位置（数量远少于URL），读完索引后逐个展开
+                        if self._keep_date(date):
+                            children.append(_resolve(source, location))
+                        else:
+                            self.counts['sitemaps_skipped'] += 1
+                        continue
+                    self.counts['entries'] += 1
+                    if not self._matches(location):
+                        self.counts['unmatched'] += 1
+                    elif not self._keep_date(date):
+                        self.counts['too_old'] += 1
+                    else:
+                        self.counts['kept'] += 1
+                        yield location, date
+        except (OSError, ET.ParseError, EOFError) as e:
+            self.counts['errors'] += 1
+            print(f"⚠️ 读取失败：{source}（{e}）", file=sys.stderr)
+
+        if depth >= self.max_depth and children:
+            print(f"⚠️ sitemap 嵌套超过 {self.max_depth} 层，忽略 {len(children)} 个子 sitemap", file=sys.stderr)
+            return
+        for child in children:
+            yield from self.urls(child, depth + 1)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="站点地图与订阅源流式导入")
+    parser.add_argument('sources', nargs='+', metavar='SOURCE', help="sitemap / 订阅源的 URL 或本地文件（支持 .gz）")
+    parser.add_argument('--pattern', action='append', default=[], metavar='REGEX',
+                        help="只保留匹配该正则的URL（可多次指定）")
+    parser.add_argument('--since', default=None, metavar='DATE',
+                        help="只保留 lastmod 不早于该日期的条目（YYYY-MM-DD 或 ISO 8601）")
+    parser.add_argument('--limit', type=int, default=None, metavar='N', help="最多导入 N 个URL")
+    parser.add_argument('--queue', default=None, metavar='DB|URL',
+                        help="写入任务队列（SQLite 文件或队列服务地址），默认输出到标准输出")
+    parser.add_argument('--batch', default='default', help="任务批次")
+    parser.add_argument('--requeue', action='store_true', help="已完成或已失败的同一任务重新排队")
+    parser.add_argument('--chunk', type=int, default=1000, metavar='N', help="每次写入队列的URL数")
+    parser.add_argument('--timeout', type=float, default=30, help="下载超时（秒）")
+    parser.add_argument('--frontier', default=DEFAULT_FRONTIER_PATH, metavar='DB',
+                        help=f"URL前沿的已见集合（默认：{DEFAULT_FRONTIER_PATH}）")
+    parser.add_argument('--no-frontier', action='store_true', help="只规范化URL，不按已见集合过滤")
+    parser.add_argument('--source', default='sitemap', help="URL来源，决定优先级（sitemap/feed/author/tag）")
+    args = parser.parse_args()
+
+    since = None
+    if args.since:
+        since = parse_date(args.since)
+        if since is None:
+            parser.error(f"无法解析日期：{args.since}")
+
+    from .frontier import Frontier
+
+    reader = SitemapReader(args.pattern, since=since, timeout=args.timeout)
+    items = ((url, parse_date(date)) for source in args.sources for url, date in reader.urls(source))
+    if args.limit:
+        items = itertools.islice(items, args.limit)
+
+    # 只有写入队列（交给工作节点）时记入已见集合；重新入队不按已见集合过滤
+    record = bool(args.queue) and not args.requeue and not args.no_frontier
+    frontier = Frontier(args.frontier if record else None)
+    start = time.time()
+    added = 0
+    try:
+        if args.queue:
+            from .work_queue import open_queue
+
+            queue = open_queue(args.queue)
+            try:
+                for chunk in _chunks(items, args.chunk):
+                    admitted = frontier.admit(chunk, source=args.source, record=record)
+                    added += queue.enqueue(admitted, batch=args.batch, requeue=args.requeue)
+                    print(f"📥 已读取 {reader.counts['kept']} 个URL，新入队 {added} 个", file=sys.stderr)
+            finally:
+                queue.close()
+        else:
+            for chunk in _chunks(items, args.chunk):
+                for url, _ in frontier.admit(chunk, source=args.source, record=False):
+                    sys.stdout.write(url + '\n')
+    finally:
+        frontier.close()
+
+    counts = reader.counts
+    print(f"🗺️ 读取 {counts['sitemaps']} 个 sitemap/订阅源（跳过 {counts['sitemaps_skipped']} 个，"
+          f"失败 {counts['errors']} 个），条目 {counts['entries']} 个：保留 {counts['kept']}，"
+          f"不匹配 {counts['unmatched']}，早于 --since {counts['too_old']}"
+          + (f"，新入队 {added}" if args.queue else "")
+          + f"，耗时 {time.time() - start:.1f}s", file=sys.stderr)
+    print(frontier.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
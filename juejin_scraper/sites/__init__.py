@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+站点适配器
+按URL选择站点适配器；未匹配任何站点的URL按掘金页面处理（与原先的行为一致）。
+
+新增站点：继承 SiteAdapter，声明域名、渲染策略与选择器，再加入 ADAPTERS。
+"""
+
+from typing import List, Optional
+
+from .base import BROWSER, STATIC, SiteAdapter
+from .csdn import CsdnAdapter
+from .juejin import JuejinAdapter
+
+
+ADAPTERS: List[SiteAdapter] = [JuejinAdapter(), CsdnAdapter()]
+DEFAULT_ADAPTER = ADAPTERS[0]
+
+__all__ = ['ADAPTERS', 'BROWSER', 'STATIC', 'SiteAdapter', 'adapter_for']
+
+
+def adapter_for(url: Optional[str]) -> SiteAdapter:
+    """返回URL所属站点的适配器"""
+    if url:
+        for adapter in ADAPTERS:
+            if adapter.matches(url):
+                return adapter
+    return DEFAULT_ADAPTER
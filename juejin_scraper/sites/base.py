@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+站点适配器基类
+每个站点声明：
+1. 匹配的域名
+2. 渲染策略：static（直接 HTTP 请求页面源码即可提取）或 browser（需要浏览器执行脚本，例如评论异步加载）
+3. 标题、正文、作者、发表时间、统计数据的选择器与元数据规则，以及转换前需要删除的装饰元素
+4. 文章ID规则与规范URL：同一篇文章的不同URL（查询参数、跟踪参数、锚点、旧域名）归一为同一个ID
+5. 作者资料接口：从作者主页链接取用户ID，请求 JSON 接口并整理为统一字段（见 authors）
+
+static 站点完全不启动浏览器；browser 站点的正文同样由适配器从页面源码中提取。
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, Tag
+
+
+STATIC = 'static'
+BROWSER = 'browser'
+
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+_DATETIME_PATTERN = re.compile(r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}(?:[ T]\d{1,2}:\d{2}(?::\d{2})?)?')
+
+# 不影响页面内容的跟踪参数（前缀匹配 utm_）
+TRACKING_PARAMS = {'spm', 'from', 'source', 'share_token', 'share_from', 'ref', 'referrer', 'fbclid', 'gclid',
+                   'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'timestamp',
+                   'request_id', 'biz_id', 'depth_1-utm_source', 'ops_request_misc'}
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    通用URL归一：协议与域名小写、去掉默认端口与锚点、去掉跟踪参数并按参数名排序、去掉路径末尾的斜杠
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_'))
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def parse_count(text: str) -> int:
+    """解析页面上的计数文本（"1,234"、"1.2k"、"3.4w"、"5万"）"""
+    match = re.search(r'(\d+(?:[.,]\d+)*)\s*([kKwW万千]?)', text or '')
+    if not match:
+        return 0
+    number = float(match.group(1).replace(',', ''))
+    unit = match.group(2).lower()
+    scale = {'k': 1000, '千': 1000, 'w': 10000, '万': 10000}.get(unit, 1)
+    return int(number * scale)
+
+
+class SiteAdapter:
+    """站点适配器：子类只需覆盖类属性，特殊规则再覆盖对应方法"""
+
+    name = 'generic'
+    # 匹配的域名（子域名同样匹配）
+    hosts: Tuple[str, ...] = ()
+    # 提取文章所需的最便宜的渲染方式
+    render = STATIC
+    # 评论区由脚本异步加载：静态提取拿不到评论，需要评论时必须使用浏览器
+    comments_scripted = False
+    # 浏览器渲染时等待出现的元素（CSS 选择器）
+    wait_selector = 'body'
+    # 依次尝试的标题选择器
+    title_selectors: Tuple[str, ...] = ('h1', 'title')
+    content_selector = 'article'
+    # 转换为 Markdown 前删除的装饰元素（行号、复制按钮等）
+    strip_selectors: Tuple[str, ...] = ()
+    author_selector = ''
+    publish_time_selector = ''
+    # 正文中出现这些 class 片段（骨架屏、加载占位）说明内容尚未渲染
+    placeholder_markers: Tuple[str, ...] = ('skeleton', 'placeholder', 'loading')
+    # 正文文本少于该长度视为未渲染完整
+    min_content_chars = 50
+    # {'likes' / 'comments' / 'collects': 依次尝试的选择器}，取第一个命中元素的文本计数
+    stat_selectors: Dict[str, Tuple[str, ...]] = {}
+    headers = DEFAULT_HEADERS
+    # 从URL路径提取文章ID的正则（命名分组 id，其他命名分组可用于规范URL），为空时没有稳定的文章ID
+    id_pattern = ''
+    # 规范URL模板，按 id_pattern 的命名分组填充
+    canonical_template = ''
+    # 从作者主页链接路径提取用户ID的正则（命名分组 id）
+    user_pattern = ''
+    # 作者资料 JSON 接口模板，按 user_pattern 的命名分组填充；为空时不补充作者资料
+    profile_api = ''
+
+    def matches(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or '').lower()
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    def _match_id(self, url: str) -> Optional[re.Match]:
+        # 只识别本站域名；未匹配任何站点、按默认适配器处理的URL（例如本地模拟服务）保持原域名
+        if not self.id_pattern or not self.matches(url):
+            return None
+        return re.search(self.id_pattern, urlsplit(url).path)
+
+    def article_id(self, url: str) -> Optional[str]:
+        """文章ID（站点名:ID），URL中没有可识别的ID时返回None"""
+        match = self._match_id(url)
+        return f"{self.name}:{match.group('id')}" if match else None
+
+    def canonical_url(self, url: str) -> str:
+        """同一篇文章的各种URL写法归一后的规范URL"""
+        match = self._match_id(url)
+        if match and self.canonical_template:
+            return self.canonical_template.format(**match.groupdict())
+        return normalize_url(url)
+
+    def _match_user(self, link: str) -> Optional[re.Match]:
+        if not self.user_pattern or not self.profile_api or not link:
+            return None
+        return re.search(self.user_pattern, urlsplit(link).path)
+
+    def author_key(self, link: str) -> Optional[str]:
+        """作者缓存键：本站为 站点名:用户ID，其他域名（镜像、本地模拟服务）为 域名:用户ID；不支持时返回None"""
+        match = self._match_user(link)
+        if not match:
+            return None
+        owner = self.name if self.matches(link) else (urlsplit(link).netloc or '').lower()
+        return f"{owner}:{match.group('id')}"
+
+    def profile_url(self, link: str) -> Optional[str]:
+        """作者资料接口地址"""
+        match = self._match_user(link)
+        if not match:
+            return None
+        url = self.profile_api.format(**match.groupdict())
+        if not self.matches(link):
+            # 镜像站点与本地模拟服务：同一接口路径，发往页面所在的域名
+            api, page = urlsplit(url), urlsplit(link)
+            url = urlunsplit((page.scheme, page.netloc, api.path, api.query, ''))
+        return url
+
+    def parse_profile(self, data: Any) -> Optional[Dict]:
+        """
+        整理作者资料接口的响应
+
+        Returns:
+            统一字段的资料（name/level/followers/following/articles/likes_received/views_received/bio/title），
+            用户不存在时返回None
+        """
+        return None
+
+    def fetch_profile(self, link: str, timeout: float = 10, session=None) -> Optional[Dict]:
+        """
+        请求作者资料
+
+        Args:
+            link: 作者主页链接
+            timeout: 超时（秒）
+            session: requests.Session，为None时不复用连接
+
+        Returns:
+            整理后的资料，用户不存在时返回None；网络错误抛出异常
+        """
+        import requests
+
+        url = self.profile_url(link)
+        if url is None:
+            return None
+        response = (session or requests).get(url, headers={**self.headers, 'Accept': 'application/json'},
+                                             timeout=timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return self.parse_profile(response.json())
+
+    def fetch(self, url: str, timeout: float = 15) -> str:
+        """直接请求页面源码（static 渲染）"""
+        import requests
+
+        response = requests.get(url, headers=self.headers, timeout=timeout)
+        response.raise_for_status()
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = response.apparent_encoding
+        return response.text
+
+    def parse_page(self, page_source: str) -> BeautifulSoup:
+        from ..page_parser import DEFAULT_PARSER
+        return BeautifulSoup(page_source, DEFAULT_PARSER)
+
+    def select_text(self, soup: BeautifulSoup, selectors) -> str:
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element is not None:
+                text = element.get_text().strip()
+                if text:
+                    return text
+        return ''
+
+    def parse_article(self, page_source: str) -> Optional[Tuple[str, str]]:
+        """
+        从页面源码提取标题和正文
+
+        Returns:
+            (标题, 正文Markdown)，失败返回None
+        """
+        return self._parse_soup(self.parse_page(page_source))
+
+    def _parse_soup(self, soup: BeautifulSoup) -> Optional[Tuple[str, str]]:
+        from ..dom_markdown import article_to_markdown
+
+        title = self.select_text(soup, self.title_selectors)
+        if not title:
+            print("错误：无法找到文章标题")
+            return None
+        print(f"文章标题：{title}")
+
+        container = soup.select_one(self.content_selector)
+        if container is None:
+            print("错误：无法找到文章内容")
+            return None
+        for selector in self.strip_selectors:
+            for element in container.select(selector):
+                element.decompose()
+        return title, article_to_markdown(container)
+
+    def extract_author(self, soup: BeautifulSoup, url: str) -> Tuple[str, str]:
+        """返回 (作者名, 作者主页链接)"""
+        element = soup.select_one(self.author_selector) if self.author_selector else None
+        if element is None:
+            return "未知作者", ""
+        link = element if element.name == 'a' else element.find_parent('a')
+        href = link.get('href', '') if isinstance(link, Tag) else ''
+        return element.get_text().strip() or "未知作者", urljoin(url, href) if href else ""
+
+    def extract_stats(self, soup: BeautifulSoup) -> Dict[str, int]:
+        stats = {'likes': 0, 'comments': 0, 'collects': 0}
+        for name, selectors in self.stat_selectors.items():
+            stats[name] = parse_count(self.select_text(soup, selectors))
+        return stats
+
+    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+        metadata = {'publish_time': "未知时间", 'read_time': "未知", 'column': "无专栏"}
+        if self.publish_time_selector:
+            element = soup.select_one(self.publish_time_selector)
+            if element is not None:
+                text = element.get('datetime') or element.get_text()
+                match = _DATETIME_PATTERN.search(text)
+                metadata['publish_time'] = match.group() if match else text.strip() or "未知时间"
+        return metadata
+
+    def extract(self, page_source: str, url: str) -> Optional[Dict]:
+        """
+        不依赖浏览器提取完整文章数据（不含评论）
+
+        Returns:
+            与浏览器抓取相同字段的 article_data，失败返回None
+        """
+        soup = self.parse_page(page_source)
+        # 作者、统计与元数据先提取，正文转换会就地修改节点
+        author_name, author_link = self.extract_author(soup, url)
+        stats = self.extract_stats(soup)
+        metadata = self.extract_metadata(soup)
+        parsed = self._parse_soup(soup)
+        if not parsed:
+            return None
+        title, content = parsed
+        return {
+            'title': title,
+            'url': url,
+            'author_name': author_name,
+            'author_link': author_link,
+            'content': content,
+            'comments_data': [],
+            **stats,
+            **metadata,
+        }
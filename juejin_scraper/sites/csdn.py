@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+CSDN 博客适配器
+文章页由服务端渲染，标题、正文、作者、发表时间与统计数据都在页面源码中，直接 HTTP 请求即可，不需要浏览器。
+"""
+
+from typing import Dict
+
+from bs4 import BeautifulSoup
+
+from .base import STATIC, SiteAdapter
+
+
+class CsdnAdapter(SiteAdapter):
+    """blog.csdn.net"""
+
+    name = 'csdn'
+    hosts = ('blog.csdn.net',)
+    render = STATIC
+    wait_selector = '#content_views'
+    title_selectors = ('#articleContentId', 'h1.title-article', 'title')
+    content_selector = '#content_views'
+    # 代码块行号、复制按钮、登录后复制提示
+    strip_selectors = ('.pre-numbering', '.hljs-button', '.signin', 'svg')
+    author_selector = '.article-bar-top .follow-nickName, .follow-nickName'
+    publish_time_selector = '.article-bar-top .time, .time'
+    id_pattern = r'^/(?P<user>[^/]+)/article/details/(?P<id>\d+)'
+    canonical_template = 'https://blog.csdn.net/{user}/article/details/{id}'
+    stat_selectors = {
+        'likes': ('#spanCount', '.tool-item-thumbs .count'),
+        'comments': ('.tool-item-comment .count',),
+        'collects': ('#get-collection .count', '.tool-item-collect .count'),
+    }
+
+    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+        metadata = super().extract_metadata(soup)
+        # "分类专栏：" 后的第一个标签
+        for box in soup.select('.tags-box'):
+            if '分类专栏' in box.get_text():
+                tag = box.select_one('a.tag-link')
+                if tag is not None and tag.get_text().strip():
+                    metadata['column'] = tag.get_text().strip()
+                break
+        return metadata
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+掘金适配器
+正文、作者与统计数据随页面源码一起返回，但评论区由脚本异步加载，抓取评论需要浏览器。
+作者资料来自 user_api 的 JSON 接口（err_no 非 0 表示用户不存在）。
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from bs4 import BeautifulSoup
+
+from .base import BROWSER, SiteAdapter, parse_count
+
+
+class JuejinAdapter(SiteAdapter):
+    """juejin.cn"""
+
+    name = 'juejin'
+    hosts = ('juejin.cn', 'juejin.im')
+    render = BROWSER
+    comments_scripted = True
+    wait_selector = '#article-root'
+    title_selectors = ('h1.article-title', 'title')
+    content_selector = '#article-root'
+    author_selector = '.author-info-block .author-name .name'
+    publish_time_selector = '.author-info-block time, .author-info-block .time'
+    id_pattern = r'^/post/(?P<id>\d+)'
+    canonical_template = 'https://juejin.cn/post/{id}'
+    user_pattern = r'^/user/(?P<id>\d+)'
+    profile_api = 'https://api.juejin.cn/user_api/v1/user/get?aid=2608&user_id={id}&not_self=0'
+
+    # 统计按钮的图标 class -> 字段
+    STAT_ICONS = {'icon-zan': 'likes', 'icon-comment': 'comments', 'icon-collect': 'collects'}
+
+    def parse_page(self, page_source: str) -> BeautifulSoup:
+        # 只为标题、正文与元数据区块建立节点
+        from ..page_parser import parse_article_page
+        return parse_article_page(page_source)
+
+    def extract_stats(self, soup: BeautifulSoup) -> Dict[str, int]:
+        stats = {'likes': 0, 'comments': 0, 'collects': 0}
+        for button in soup.select('.panel-btn.with-badge'):
+            svg = button.find('svg')
+            classes = (svg.get('class') or []) if svg is not None else []
+            for icon, name in self.STAT_ICONS.items():
+                if icon in classes:
+                    stats[name] = parse_count(button.get('badge', ''))
+        return stats
+
+    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+        metadata = super().extract_metadata(soup)
+        block = soup.select_one('.author-info-block')
+        if block is not None:
+            match = re.search(r'阅读(\d+分钟)', block.get_text())
+            if match:
+                metadata['read_time'] = match.group(1)
+        return metadata
+
+    def parse_profile(self, data: Any) -> Optional[Dict]:
+        if not isinstance(data, dict) or data.get('err_no') or not data.get('data'):
+            return None
+        user = data['data']
+        title = ' @ '.join(part for part in (user.get('job_title'), user.get('company')) if part)
+        return {
+            'name': user.get('user_name', ''),
+            'level': int(user.get('level') or 0),
+            'followers': int(user.get('follower_count') or 0),
+            'following': int(user.get('followee_count') or 0),
+            'articles': int(user.get('post_article_count') or 0),
+            'likes_received': int(user.get('got_digg_count') or 0),
+            'views_received': int(user.get('got_view_count') or 0),
+            'bio': (user.get('description') or '').strip(),
+            'title': title,
+        }
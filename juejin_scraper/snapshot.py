@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+掘金文章原始快照
+功能：
+1. 抓取时保存每篇文章的原始快照：最终 page_source、作者、统计数据、元数据和评论 JSON
+2. 回放时从快照读取，无需浏览器即可重新执行提取与渲染
+
+快照为 gzip 压缩的 JSON，每篇文章一个文件，文件名由文章 ID 决定，重新抓取时覆盖。
+指定 Blob 存储时，页面源码与文章图片写入内容寻址存储，快照中只保存哈希。
+"""
+
+import gzip
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional
+
+from .output_layout import article_id, file_stem
+
+if TYPE_CHECKING:
+    from .blobstore import BlobStore
+
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".json.gz"
+
+
+def snapshot_key(url: str) -> str:
+    """由文章URL得到快照文件名（文章ID的文件名形式）"""
+    return file_stem(article_id(url))
+
+
+def snapshot_path(snapshot_dir: str, url: str) -> str:
+    """快照文件路径"""
+    return os.path.join(os.path.expanduser(snapshot_dir), snapshot_key(url) + SNAPSHOT_SUFFIX)
+
+
+def store_assets(blob_store: "BlobStore", asset_urls: Iterable[str], timeout: float = 10) -> Dict[str, str]:
+    """
+    下载文章资源（图片）并流式写入 Blob 存储
+
+    Args:
+        blob_store: Blob 存储
+        asset_urls: 资源URL
+        timeout: 单个请求超时（秒）
+
+    Returns:
+        资源URL -> 内容哈希
+    """
+    import requests
+
+    assets = {}
+    with requests.Session() as session:
+        for asset_url in dict.fromkeys(asset_urls):
+            if not asset_url or not asset_url.startswith(('http://', 'https://')):
+                continue
+            try:
+                with session.get(asset_url, stream=True, timeout=timeout) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    assets[asset_url] = blob_store.put_stream(response.raw)
+            except Exception as e:
+                print(f"下载资源失败：{asset_url} {e}")
+    return assets
+
+
+def save_snapshot(snapshot_dir: str, url: str, page_source: str, captured: Dict,
+                  blob_store: Optional["BlobStore"] = None, asset_urls: Iterable[str] = ()) -> str:
+    """
+    保存文章快照
+
+    Args:
+        snapshot_dir: 快照目录
+        url: 文章URL
+        page_source: 最终页面源码
+        captured: 浏览器阶段提取的数据（author_name/author_link/stats/metadata/comments_data）
+        blob_store: Blob 存储，指定时页面源码与资源写入存储，快照只记录哈希
+        asset_urls: 需要一并保存的资源URL（仅在指定 blob_store 时下载）
+
+    Returns:
+        快照文件路径
+    """
+    path = snapshot_path(snapshot_dir, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'url': url,
+        'captured_at': time.time(),
+        **captured,
+    }
+    if blob_store is not None:
+        snapshot['page_source_blob'] = blob_store.put_bytes(page_source.encode('utf-8'))
+        snapshot['assets'] = store_assets(blob_store, asset_urls)
+    else:
+        snapshot['page_source'] = page_source
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(path: str, blob_store: Optional["BlobStore"] = None) -> Dict:
+    """
+    读取快照
+
+    Args:
+        path: 快照文件路径
+        blob_store: Blob 存储，快照的页面源码保存在存储中时必须提供
+
+    Returns:
+        快照数据（page_source 已还原）
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的快照版本：{snapshot.get('version')}")
+    if 'page_source' not in snapshot:
+        if blob_store is None:
+            raise ValueError(f"快照的页面源码保存在 Blob 存储中，需要指定存储目录：{path}")
+        snapshot['page_source'] = blob_store.get(snapshot['page_source_blob']).decode('utf-8')
+    return snapshot
+
+
+def iter_snapshot_paths(snapshot_dir: str) -> Iterator[str]:
+    """列出目录下的全部快照文件"""
+    with os.scandir(os.path.expanduser(snapshot_dir)) as entries:
+        for entry in entries:
+            if entry.name.endswith(SNAPSHOT_SUFFIX) and entry.is_file():
+                yield entry.path
+
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+长时间运行的浏览器监管
+功能：
+1. 浏览器回收：同一个浏览器处理满 N 篇文章，或浏览器进程树（chromedriver 与全部 Chrome 子进程）
+   的常驻内存超过阈值时，处理完当前文章后退出浏览器，下一篇重新启动，内存不随运行时长累积
+2. 看门狗：单篇文章超过期限仍未完成（卡在 driver.get / execute_script 等命令中）时，
+   强制结束浏览器进程树，阻塞中的 WebDriver 调用随之报错返回，下一篇启动新浏览器
+3. 被看门狗中断的文章标记为超时，由调用方重新入队（命令行在本轮末尾重试，工作队列按失败重试）
+
+进程树与内存通过 /proc 读取（Linux）；其他平台只结束 chromedriver 进程，内存阈值不生效。
+多标签页模式下各标签页共享浏览器：页数与内存回收由 TabPool 在标签页空闲时进行，监管器只负责看门狗；
+强制重启会中断同一浏览器中的其他文章，这些文章同样按超时返回，由调用方重新入队。
+
+使用方法：
+    python -m juejin_scraper --max-pages 200 --max-rss 1500 --deadline 180 URL [URL ...]
+    python -m juejin_scraper.work_queue work --max-pages 200 --max-rss 1500 --deadline 180
+"""
+
+import os
+import signal
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .config import DEFAULT_DEADLINE, DEFAULT_MAX_PAGES, DEFAULT_MAX_RSS_MB
+
+
+def process_tree(pid: int) -> List[int]:
+    """pid 及其全部子孙进程（读取 /proc，不可用时只返回 pid）"""
+    parents: Dict[int, int] = {}
+    try:
+        names = os.listdir('/proc')
+    except OSError:
+        return [pid]
+    for name in names:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as f:
+                # 进程名可能含空格与括号，从最后一个右括号之后解析
+                parents[int(name)] = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree, frontier = [pid], {pid}
+    while frontier:
+        frontier = {child for child, parent in parents.items() if parent in frontier}
+        tree.extend(frontier)
+    return tree
+
+
+def tree_rss_mb(pid: int) -> float:
+    """进程树的常驻内存之和（MB），无法读取时返回 0"""
+    total = 0
+    for member in process_tree(pid):
+        try:
+            with open(f'/proc/{member}/statm') as f:
+                total += int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024 if total else 0.0
+
+
+def driver_pid(driver) -> Optional[int]:
+    """chromedriver 进程号（Chrome 是它的子进程）"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+def kill_browser(driver) -> None:
+    """强制结束 chromedriver 与全部 Chrome 子进程"""
+    pid = driver_pid(driver)
+    if pid is None:
+        return
+    # 先结束子进程，避免 chromedriver 退出后 Chrome 被过继而遗留
+    for member in reversed(process_tree(pid)):
+        try:
+            os.kill(member, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+
+
+class BrowserSupervisor:
+    """监管一个抓取器的浏览器：按页数 / 内存回收，超过期限强制重启"""
+
+    def __init__(self, scraper, max_pages: Optional[int] = DEFAULT_MAX_PAGES,
+                 max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB, deadline: Optional[float] = DEFAULT_DEADLINE):
+        """
+        Args:
+            scraper: JuejinScraper（keep_browser=True 时回收才有意义）
+            max_pages: 同一浏览器处理的最大文章数，为None时不按页数回收
+            max_rss_mb: 浏览器进程树常驻内存上限（MB），为None时不按内存回收
+            deadline: 单篇文章期限（秒），为None时不启用看门狗
+        """
+        self.scraper = scraper
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.deadline = deadline
+        self.pages = 0
+        self.peak_rss_mb = 0.0
+        self.counts: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def _watchdog(self, url: str, fired: threading.Event) -> None:
+        driver = self.scraper.driver
+        if driver is None:
+            return
+        fired.set()
+        print(f"⏰ 超过 {self.deadline:.0f}s 仍未完成，强制重启浏览器：{url}")
+        if self.scraper.tab_pool is not None:
+            # 记录结束次数，同一浏览器中其他标签页的文章据此识别为被连带中断
+            self.scraper.tab_pool.kill()
+        else:
+            kill_browser(driver)
+
+    def run(self, url: str) -> Tuple[Optional[str], bool]:
+        """
+        在监管下抓取一篇文章
+
+        Returns:
+            (保存路径或None, 是否因超时被中断)；超时的文章应重新入队
+        """
+        pool = self.scraper.tab_pool
+        if pool is None:
+            return self._run(url, None)
+        # 共享的浏览器待回收时先等回收完成；结束时由 TabPool 计数并在标签页空闲后回收
+        pool.begin_article()
+        try:
+            return self._run(url, pool)
+        finally:
+            pool.end_article(self.scraper.driver is not None)
+
+    def _run(self, url: str, pool) -> Tuple[Optional[str], bool]:
+        fired = threading.Event()
+        kills = pool.kills if pool is not None else 0
+        timer = None
+        if self.deadline:
+            timer = threading.Timer(self.deadline, self._watchdog, args=(url, fired))
+            timer.daemon = True
+            timer.start()
+        try:
+            save_path = self.scraper.save_article(url)
+        except Exception as e:
+            if not fired.is_set() and (pool is None or pool.kills == kills):
+                raise
+            print(f"❌ 浏览器被看门狗结束：{e}")
+            save_path = None
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if fired.is_set():
+            # 结束的进程不可复用，丢弃后下一篇重新启动；看门狗触发时恰好完成的文章仍算成功
+            self.scraper.close()
+            self.pages = 0
+            with self.lock:
+                self.counts['hung'] += 1
+            return save_path, save_path is None
+
+        if pool is not None and save_path is None and pool.kills != kills:
+            # 其他标签页的看门狗结束了共享的浏览器，本篇随之失败：按超时处理，由调用方重新入队
+            print(f"⏰ 浏览器被其他标签页的看门狗重启，本篇重新入队：{url}")
+            self.scraper.close()
+            with self.lock:
+                self.counts['interrupted'] += 1
+            return None, True
+
+        self.after_article()
+        return save_path, False
+
+    def after_article(self) -> None:
+        """处理完一篇文章：检查页数与内存，超过阈值时回收浏览器"""
+        driver = self.scraper.driver
+        if driver is None or self.scraper.tab_pool is not None:
+            # 未保留浏览器（或静态提取未启动浏览器）；多标签页模式不回收共享的浏览器
+            return
+        self.pages += 1
+        reason = None
+        if self.max_pages and self.pages >= self.max_pages:
+            reason = 'pages'
+        pid = driver_pid(driver)
+        if pid is not None:
+            rss = tree_rss_mb(pid)
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+            if reason is None and self.max_rss_mb and rss > self.max_rss_mb:
+                reason = 'rss'
+                print(f"♻️ 浏览器内存 {rss:.0f} MB 超过 {self.max_rss_mb:.0f} MB，回收浏览器")
+        if reason is None:
+            return
+        if reason == 'pages':
+            print(f"♻️ 浏览器已处理 {self.pages} 篇文章，回收浏览器")
+        self.scraper.close()
+        self.pages = 0
+        with self.lock:
+            self.counts[f'recycled_{reason}'] += 1
+
+    def summary(self) -> str:
+        return (f"🩺 浏览器监管：按页数回收 {self.counts['recycled_pages']} 次，按内存回收 "
+                f"{self.counts['recycled_rss']} 次，超时重启 {self.counts['hung']} 次，"
+                f"浏览器内存峰值 {self.peak_rss_mb:.0f} MB")
+
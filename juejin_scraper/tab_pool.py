@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+单浏览器多标签页并发
+功能：
+1. 一个 Chrome 进程同时打开多个标签页，每个标签页由一个线程驱动、处理一篇文章；
+   浏览器主进程、GPU 与网络进程由全部标签页共享，每篇进行中的文章只多占一个标签页（渲染进程）的内存
+2. WebDriver 会话一次只能执行一个命令：所有命令（包括元素上的命令）经过同一把锁，
+   执行前自动切换到当前线程的标签页；页面加载、评论接口请求与 sleep 等待都在锁外进行，各标签页互相重叠
+3. 页面以 pageLoadStrategy=none 发起导航，在锁外轮询新文档就绪，一个标签页的慢加载不阻塞其他标签页
+4. 调度：每个标签页线程从共享队列领取下一篇，空闲的标签页立即接手；
+   单个标签页出错只关闭并重开该标签页，浏览器整体失效时重启浏览器，其他标签页重新打开后继续
+5. 浏览器数与每个浏览器的标签页数可分别设置（例如 2 个浏览器 × 4 个标签页）
+6. 回收：共享的浏览器处理满 N 篇文章或进程树内存超过阈值时，不再开始新文章，
+   等进行中的文章全部结束（标签页空闲）后退出浏览器，下一篇重新启动
+
+后台标签页的定时器节流会拖慢评论的异步加载，多标签页模式启动浏览器时关闭节流。
+
+使用方法：
+    python -m juejin_scraper --browsers 2 --tabs 4 URL [URL ...]
+    python -m juejin_scraper.work_queue work --browsers 2 --tabs 4
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.remote.command import Command
+
+# 导航前在旧文档上打的标记：新文档没有该标记且已解析完成即视为加载完成
+_MARK_STALE = "window.__tabPoolStale = true;"
+_NEW_DOCUMENT_READY = "return window.__tabPoolStale !== true && document.readyState !== 'loading';"
+
+
+class TabPool:
+    """一个浏览器中的一组标签页，供多个线程共享同一个 WebDriver 会话"""
+
+    def __init__(self, launcher, load_timeout: float = 30, poll_interval: float = 0.05,
+                 max_pages: Optional[int] = None, max_rss_mb: Optional[float] = None):
+        """
+        Args:
+            launcher: 负责启动浏览器的 JuejinScraper（只使用其浏览器配置，不抓取文章）
+            load_timeout: 页面加载超时（秒）
+            poll_interval: 锁外轮询页面就绪的间隔（秒）
+            max_pages: 同一浏览器处理的最大文章数，为None时不按页数回收
+            max_rss_mb: 浏览器进程树常驻内存上限（MB），为None时不按内存回收
+        """
+        self.launcher = launcher
+        self.load_timeout = load_timeout
+        self.poll_interval = poll_interval
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.lock = threading.RLock()
+        # 进行中的文章数；待回收时新文章在此等待，最后一篇结束时回收
+        self.idle = threading.Condition(self.lock)
+        self.busy = 0
+        self.pages = 0
+        self.peak_rss_mb = 0.0
+        # 待回收的原因（'pages' / 'rss'），为None时不回收
+        self.retiring: Optional[str] = None
+        self.local = threading.local()
+        self.driver = None
+        self._execute = None
+        # 浏览器当前切换到的标签页
+        self.current: Optional[str] = None
+        # 浏览器重启后递增，旧标签页句柄随之失效
+        self.generation = 0
+        # 看门狗强制结束浏览器的次数：文章开始与结束时不同，说明它被其他标签页的超时连带中断
+        self.kills = 0
+        self.counts: Counter = Counter()
+
+    def _launch(self) -> None:
+        driver = self.launcher.setup_driver(multi_tab=True)
+        original = driver.execute
+        self._execute = original
+        # 初始窗口不分配给任何线程，关闭标签页时浏览器不会因为没有窗口而退出
+        self.current = original(Command.W3C_GET_CURRENT_WINDOW_HANDLE)['value']
+
+        def execute(driver_command, params=None):
+            handle = getattr(self.local, 'handle', None)
+            if handle is None:
+                with self.lock:
+                    return original(driver_command, params)
+            if driver_command == Command.GET:
+                return self._navigate(original, handle, params['url'])
+            with self.lock:
+                self._switch(original, handle)
+                return original(driver_command, params)
+
+        driver.execute = execute
+        self.driver = driver
+        self.generation += 1
+        self.counts['launches'] += 1
+
+    def _switch(self, original, handle: str) -> None:
+        """切换到标签页（调用方持有锁）"""
+        if handle != self.current:
+            original(Command.SWITCH_TO_WINDOW, {'handle': handle})
+            self.current = handle
+
+    def _navigate(self, original, handle: str, url: str):
+        """发起导航后在锁外等待新文档就绪"""
+        with self.lock:
+            self._switch(original, handle)
+            try:
+                original(Command.W3C_EXECUTE_SCRIPT, {'script': _MARK_STALE, 'args': []})
+            except WebDriverException:
+                pass
+            result = original(Command.GET, {'url': url})
+
+        deadline = time.monotonic() + self.load_timeout
+        while True:
+            try:
+                with self.lock:
+                    self._switch(original, handle)
+                    ready = original(Command.W3C_EXECUTE_SCRIPT, {'script': _NEW_DOCUMENT_READY, 'args': []})['value']
+            except WebDriverException as e:
+                # 文档切换过程中脚本可能执行失败；标签页已不存在时直接抛出
+                if 'no such window' in str(e).lower():
+                    raise
+                ready = False
+            if ready:
+                return result
+            if time.monotonic() > deadline:
+                raise TimeoutException(f"页面加载超时：{url}")
+            time.sleep(self.poll_interval)
+
+    def _alive(self) -> bool:
+        try:
+            self._execute(Command.W3C_GET_WINDOW_HANDLES)
+            return True
+        except Exception:
+            return False
+
+    def kill(self) -> None:
+        """
+        强制结束共享的浏览器（看门狗调用）
+
+        不获取锁：卡住的标签页线程可能正持有锁等待 WebDriver 命令返回，结束进程后命令报错、锁随之释放
+        """
+        from .supervisor import kill_browser
+
+        driver = self.driver
+        if driver is None:
+            return
+        self.kills += 1
+        self.counts['killed'] += 1
+        kill_browser(driver)
+
+    def begin_article(self) -> None:
+        """开始一篇文章；浏览器待回收时等回收完成再开始"""
+        with self.lock:
+            while self.retiring is not None:
+                self.idle.wait()
+            self.busy += 1
+
+    def end_article(self, used_browser: bool) -> None:
+        """
+        结束一篇文章：检查页数与内存，超过阈值时标记待回收，最后一篇进行中的文章结束时回收浏览器
+
+        Args:
+            used_browser: 本篇是否使用了浏览器（静态提取的文章不计页数）
+        """
+        from .supervisor import driver_pid, tree_rss_mb
+
+        driver = self.driver
+        pid = driver_pid(driver) if used_browser and driver is not None else None
+        # 读取 /proc 较慢，在锁外进行
+        rss = tree_rss_mb(pid) if pid is not None else 0.0
+        with self.lock:
+            self.busy -= 1
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+            if used_browser and self.driver is not None and self.driver is driver and self.retiring is None:
+                self.pages += 1
+                if self.max_pages and self.pages >= self.max_pages:
+                    self.retiring = 'pages'
+                    print(f"♻️ 浏览器已处理 {self.pages} 篇文章，等标签页空闲后回收")
+                elif self.max_rss_mb and rss > self.max_rss_mb:
+                    self.retiring = 'rss'
+                    print(f"♻️ 浏览器内存 {rss:.0f} MB 超过 {self.max_rss_mb:.0f} MB，等标签页空闲后回收")
+            if self.retiring is not None and self.busy == 0:
+                self._quit()
+                self.counts[f'recycled_{self.retiring}'] += 1
+                self.retiring = None
+                self.idle.notify_all()
+
+    def _quit(self) -> None:
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+            self._execute = None
+            self.current = None
+        self.pages = 0
+
+    def open_tab(self):
+        """为当前线程打开一个标签页，返回共享的 WebDriver（之后本线程的命令都作用于该标签页）"""
+        with self.lock:
+            if self.driver is None:
+                self._launch()
+            elif not self._alive():
+                print("⚠️ 浏览器已失效，重新启动")
+                self._quit()
+                self._launch()
+            handle = self._execute(Command.NEW_WINDOW, {'type': 'tab'})['value']['handle']
+            self.local.handle = handle
+            self.local.generation = self.generation
+            self.counts['tabs_opened'] += 1
+            return self.driver
+
+    def close_tab(self) -> None:
+        """关闭当前线程的标签页（浏览器已重启时旧标签页随旧浏览器一起消失）"""
+        handle = getattr(self.local, 'handle', None)
+        self.local.handle = None
+        if handle is None:
+            return
+        with self.lock:
+            if self.driver is None or self.local.generation != self.generation:
+                return
+            try:
+                self._switch(self._execute, handle)
+                self._execute(Command.CLOSE)
+            except Exception:
+                pass
+            self.current = None
+            self.counts['tabs_closed'] += 1
+
+    def close(self) -> None:
+        """退出浏览器并释放启动器占用的配置目录"""
+        with self.lock:
+            self._quit()
+        self.launcher.close()
+
+
+class TabScheduler:
+    """浏览器 × 标签页的工作线程：每个标签页一个线程和一个 JuejinScraper"""
+
+    def __init__(self, browsers: int = 1, tabs: int = 4, max_pages: Optional[int] = None,
+                 max_rss_mb: Optional[float] = None, **scraper_options):
+        """
+        Args:
+            browsers: 浏览器数量
+            tabs: 每个浏览器的标签页数量
+            max_pages: 每个浏览器处理满该数量的文章后回收，为None时不按页数回收
+            max_rss_mb: 浏览器进程树内存超过该值（MB）时回收，为None时不按内存回收
+            scraper_options: 传给 JuejinScraper 的参数；浏览器配置（headless、browser_profile、cache_size_mb）
+                             用于启动浏览器，其余用于每个标签页的抓取器
+        """
+        from .scraper import JuejinScraper
+
+        launcher_keys = ('headless', 'browser_profile', 'cache_size_mb')
+        launcher_options = {k: scraper_options.pop(k) for k in launcher_keys if k in scraper_options}
+        scraper_options['keep_browser'] = True
+        self.browsers = browsers
+        self.tabs = tabs
+        self.pools = [TabPool(JuejinScraper(**launcher_options), max_pages=max_pages, max_rss_mb=max_rss_mb)
+                      for _ in range(browsers)]
+        self.scrapers = [JuejinScraper(headless=launcher_options.get('headless', True), tab_pool=pool,
+                                       **scraper_options)
+                         for pool in self.pools for _ in range(tabs)]
+
+    def run(self, target: Callable) -> None:
+        """
+        每个标签页一个线程执行 target(scraper)，全部结束后关闭标签页与浏览器
+
+        Args:
+            target: 工作函数，在标签页线程中调用
+        """
+        def work(scraper):
+            try:
+                target(scraper)
+            finally:
+                scraper.finish()
+
+        threads = [threading.Thread(target=work, args=(scraper,), name=f"tab-{i}")
+                   for i, scraper in enumerate(self.scrapers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for pool in self.pools:
+                pool.close()
+
+    def crawl(self, urls: List[str], deadline: Optional[float] = None) -> List[Tuple[str, Optional[str]]]:
+        """
+        抓取全部URL，空闲的标签页领取下一篇
+
+        Args:
+            urls: 文章URL
+            deadline: 单篇文章期限（秒），超时时强制重启浏览器，文章重新入队一次；
+                      同一浏览器中被连带中断的其他文章同样重新入队一次
+
+        Returns:
+            [(URL, 保存路径或None)]，按完成顺序
+        """
+        from .supervisor import BrowserSupervisor
+
+        pending: "queue.Queue[Tuple[int, str, bool]]" = queue.Queue()
+        for i, url in enumerate(urls, 1):
+            pending.put((i, url, True))
+        results: List[Tuple[str, Optional[str]]] = []
+
+        def target(scraper):
+            # 页数与内存回收由共享浏览器的 TabPool 负责
+            supervisor = BrowserSupervisor(scraper, max_pages=None, max_rss_mb=None, deadline=deadline)
+            while True:
+                try:
+                    i, url, retry = pending.get_nowait()
+                except queue.Empty:
+                    return
+                print(f"\n🔄 [{i}/{len(urls)}] {threading.current_thread().name} 处理文章：{url}")
+                try:
+                    save_path, hung = supervisor.run(url)
+                except Exception as e:
+                    # 只影响本标签页：关闭后下一篇重新打开
+                    print(f"❌ 标签页出错：{e}")
+                    scraper.close()
+                    save_path, hung = None, False
+                if hung and retry:
+                    pending.put((i, url, False))
+                    continue
+                results.append((url, save_path))
+                print(f"{'✅' if save_path else '❌'} [{i}/{len(urls)}] {url}")
+
+        self.run(target)
+        return results
+
+    def duplicates(self) -> List[Tuple[str, str]]:
+        return [item for scraper in self.scrapers for item in scraper.duplicates]
+
+    def stats(self) -> Dict[str, int]:
+        """浏览器启动、回收次数与标签页开关次数"""
+        total: Counter = Counter()
+        for pool in self.pools:
+            total.update(pool.counts)
+        return dict(total)
+
+    def peak_rss_mb(self) -> float:
+        return max((pool.peak_rss_mb for pool in self.pools), default=0.0)
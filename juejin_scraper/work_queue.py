@@ -0,0 +1,676 @@
+# -*- coding: utf-8 -*-
+"""
+多机共享的租约式任务队列
+功能：
+1. 任务按 (批次, URL) 去重入队；工作节点以租约方式领取，租约带令牌与过期时间（可见性超时）
+2. 处理期间定期心跳续约；节点宕机后租约过期，任务自动重新可领取
+3. 完成与失败只接受当前租约令牌，过期后被他人重新领取的旧租约无法再提交，完成结果只记录一次
+4. 超过最大尝试次数的任务标记为失败，可手动重新入队
+5. 两种后端接口一致：共享卷上的 SQLite 文件（SQLiteWorkQueue），
+   或由一台机器运行 serve、其他节点通过 HTTP 访问（HTTPWorkQueue）
+6. 任务带优先级，按优先级从高到低、同优先级按入队顺序领取；入队的URL先经过URL前沿（frontier）规范化与去重
+
+队列服务默认只监听 127.0.0.1；对其他主机开放需显式指定 --host，并用共享令牌
+（--token 或环境变量 JUEJIN_QUEUE_TOKEN）校验请求，工作节点使用同一令牌。
+
+注意：租约过期按各节点本机时钟判断，节点需要同步时间（NTP），可见性超时应远大于时钟偏差。
+共享卷上的 SQLite 使用回滚日志而非 WAL（WAL 依赖共享内存，跨主机不可用）。
+
+使用方法：
+    python -m juejin_scraper.work_queue --queue <DB|http://host:port> enqueue <URL> ... [--file urls.txt]
+        [--frontier DB | --no-frontier] [--source manual]
+    python -m juejin_scraper.work_queue --queue <DB|http://host:port> work [--browsers N]
+    python -m juejin_scraper.work_queue --queue <DB|http://host:port> stats
+    python -m juejin_scraper.work_queue --queue <DB> serve [--port N] [--host 0.0.0.0 --token SECRET]
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from .config import (DEFAULT_AUTHOR_CACHE_PATH, DEFAULT_CACHE_SIZE_MB, DEFAULT_COMMENT_STATE_PATH,
+                     DEFAULT_DEADLINE, DEFAULT_DEDUP_PATH, DEFAULT_FRONTIER_PATH, DEFAULT_INDEX_PATH,
+                     DEFAULT_MAX_PAGES, DEFAULT_MAX_RSS_MB, DEFAULT_RENDER_CACHE_PATH, DEFAULT_SCHEDULE_PATH)
+
+
+DEFAULT_QUEUE_PATH = os.path.expanduser("~/.juejin_queue.db")
+DEFAULT_BATCH = "default"
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_QUEUE_HOST = '127.0.0.1'
+QUEUE_TOKEN_ENV = 'JUEJIN_QUEUE_TOKEN'
+
+# 入队项：URL，或 (URL, 优先级)
+JobItem = Union[str, Sequence]
+
+
+def default_worker_id() -> str:
+    """主机名:进程号:线程名，写入租约便于排查"""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+class SQLiteWorkQueue:
+    """基于 SQLite 文件的租约队列"""
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_PATH, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        Args:
+            db_path: 队列数据库路径（多机时放在共享卷上）
+            visibility_timeout: 租约有效期（秒），超时未心跳的任务会被重新领取
+            max_attempts: 最大尝试次数
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # 自行管理事务：领取需要 BEGIN IMMEDIATE 抢占写锁
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                batch TEXT NOT NULL,
+                url TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                enqueued_at REAL NOT NULL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT,
+                priority REAL NOT NULL DEFAULT 0,
+                UNIQUE (batch, url)
+            )
+        """)
+        # 旧版本创建的队列没有优先级列
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        if 'priority' not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (batch, state, lease_expires)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_priority ON jobs (batch, state, priority DESC, id)")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def _write(self, sql: str, params: tuple) -> int:
+        with self.lock:
+            return self.conn.execute(sql, params).rowcount
+
+    def enqueue(self, urls: Iterable[JobItem], batch: str = DEFAULT_BATCH, requeue: bool = False) -> int:
+        """
+        批量入队，已存在的 (批次, URL) 跳过
+
+        Args:
+            urls: 文章URL，或 (URL, 优先级)；优先级缺省为 0
+            batch: 批次
+            requeue: 已完成或已失败的同一任务重新置为排队（周期性重抓）
+
+        Returns:
+            新入队（含重新入队）的任务数
+        """
+        now = time.time()
+        sql = "INSERT OR IGNORE INTO jobs (batch, url, enqueued_at, priority) VALUES (?, ?, ?, ?)"
+        if requeue:
+            sql = (
+                "INSERT INTO jobs (batch, url, enqueued_at, priority) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (batch, url) DO UPDATE SET state = 'queued', attempts = 0, "
+                "enqueued_at = excluded.enqueued_at, finished_at = NULL, error = NULL, priority = excluded.priority "
+                "WHERE state IN ('done', 'failed')"
+            )
+
+        def rows():
+            for item in urls:
+                if isinstance(item, str):
+                    yield batch, item, now, 0.0
+                else:
+                    yield batch, item[0], now, float(item[1])
+
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self.conn.total_changes
+                self.conn.executemany(sql, rows())
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+
+    def lease(self, worker_id: str, batch: str = DEFAULT_BATCH, limit: int = 1) -> List[Dict]:
+        """
+        领取可处理的任务：未领取的，或租约已过期的
+
+        Args:
+            worker_id: 工作节点标识
+            batch: 批次
+            limit: 最多领取数量
+
+        Returns:
+            租约列表，每项包含 id/url/token/attempts/expires
+        """
+        now = time.time()
+        expires = now + self.visibility_timeout
+        leases = []
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 过期且已用完尝试次数的任务不再重试
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'failed', finished_at = ?, error = COALESCE(error, '租约多次过期') "
+                    "WHERE batch = ? AND state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, batch, now, self.max_attempts)
+                )
+                # 先接手租约过期的任务，再按优先级领取排队中的任务（两次查询各自走索引）
+                rows = self.conn.execute(
+                    "SELECT id, url, attempts FROM jobs WHERE batch = ? AND state = 'leased' AND lease_expires < ? "
+                    "ORDER BY id LIMIT ?",
+                    (batch, now, limit)
+                ).fetchall()
+                if len(rows) < limit:
+                    rows += self.conn.execute(
+                        "SELECT id, url, attempts FROM jobs WHERE batch = ? AND state = 'queued' "
+                        "ORDER BY priority DESC, id LIMIT ?",
+                        (batch, limit - len(rows))
+                    ).fetchall()
+                for job_id, url, attempts in rows:
+                    token = uuid.uuid4().hex
+                    self.conn.execute(
+                        "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                        "lease_token = ?, lease_expires = ? WHERE id = ?",
+                        (worker_id, token, expires, job_id)
+                    )
+                    leases.append({'id': job_id, 'url': url, 'token': token,
+                                   'attempts': attempts + 1, 'expires': expires})
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return leases
+
+    def heartbeat(self, lease: Dict) -> bool:
+        """续约，返回 False 表示租约已失效（已被他人领取或已结束）"""
+        expires = time.time() + self.visibility_timeout
+        updated = self._write(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (expires, lease['id'], lease['token'])
+        )
+        if updated:
+            lease['expires'] = expires
+        return updated == 1
+
+    def complete(self, lease: Dict, result: Optional[Dict] = None) -> bool:
+        """
+        记录完成；只有持有当前租约令牌的节点能够提交
+
+        Returns:
+            是否记录成功（False 表示租约已被他人接手，结果被丢弃）
+        """
+        return self._write(
+            "UPDATE jobs SET state = 'done', finished_at = ?, result = ?, error = NULL, lease_expires = NULL "
+            "WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (time.time(), json.dumps(result or {}, ensure_ascii=False), lease['id'], lease['token'])
+        ) == 1
+
+    def fail(self, lease: Dict, error: str, retry: bool = True) -> bool:
+        """
+        记录失败；未超过最大尝试次数且 retry 为真时重新入队
+
+        Returns:
+            是否记录成功
+        """
+        return self._write(
+            "UPDATE jobs SET state = CASE WHEN ? AND attempts < ? THEN 'queued' ELSE 'failed' END, "
+            "error = ?, lease_expires = NULL, "
+            "finished_at = CASE WHEN ? AND attempts < ? THEN NULL ELSE ? END "
+            "WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (retry, self.max_attempts, error, retry, self.max_attempts, time.time(), lease['id'], lease['token'])
+        ) == 1
+
+    def release(self, lease: Dict) -> bool:
+        """放弃租约（节点正常退出时），任务立即可被重新领取且不计入尝试次数"""
+        return self._write(
+            "UPDATE jobs SET state = 'queued', attempts = attempts - 1, lease_expires = NULL "
+            "WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (lease['id'], lease['token'])
+        ) == 1
+
+    def retry_failed(self, batch: str = DEFAULT_BATCH) -> int:
+        """失败任务重新入队并清零尝试次数"""
+        return self._write(
+            "UPDATE jobs SET state = 'queued', attempts = 0, finished_at = NULL WHERE batch = ? AND state = 'failed'",
+            (batch,)
+        )
+
+    def stats(self, batch: str = DEFAULT_BATCH) -> Dict:
+        """各状态任务数，租约中的任务区分有效与已过期"""
+        now = time.time()
+        with self.lock:
+            counts = {'queued': 0, 'leased': 0, 'expired': 0, 'done': 0, 'failed': 0}
+            for state, expired, count in self.conn.execute(
+                "SELECT state, state = 'leased' AND lease_expires < ?, COUNT(*) FROM jobs "
+                "WHERE batch = ? GROUP BY 1, 2",
+                (now, batch)
+            ):
+                counts['expired' if expired else state] += count
+            owners = [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT lease_owner FROM jobs WHERE batch = ? AND state = 'leased' AND lease_expires >= ?",
+                (batch, now)
+            )]
+        counts['workers'] = owners
+        return counts
+
+
+class HTTPWorkQueue:
+    """通过 HTTP 访问由 serve 托管的队列，接口与 SQLiteWorkQueue 一致"""
+
+    def __init__(self, base_url: str, timeout: float = 30, token: Optional[str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = token
+
+    def _call(self, method: str, **params):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            f"{self.base_url}/{method}", data=json.dumps(params).encode('utf-8'), headers=headers
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['result']
+
+    def close(self) -> None:
+        pass
+
+    def enqueue(self, urls: Iterable[JobItem], batch: str = DEFAULT_BATCH, requeue: bool = False) -> int:
+        return self._call('enqueue', urls=[item if isinstance(item, str) else list(item) for item in urls],
+                          batch=batch, requeue=requeue)
+
+    def lease(self, worker_id: str, batch: str = DEFAULT_BATCH, limit: int = 1) -> List[Dict]:
+        return self._call('lease', worker_id=worker_id, batch=batch, limit=limit)
+
+    def heartbeat(self, lease: Dict) -> bool:
+        result = self._call('heartbeat', lease=lease)
+        if result:
+            lease['expires'] = result
+        return bool(result)
+
+    def complete(self, lease: Dict, result: Optional[Dict] = None) -> bool:
+        return self._call('complete', lease=lease, result=result)
+
+    def fail(self, lease: Dict, error: str, retry: bool = True) -> bool:
+        return self._call('fail', lease=lease, error=error, retry=retry)
+
+    def release(self, lease: Dict) -> bool:
+        return self._call('release', lease=lease)
+
+    def retry_failed(self, batch: str = DEFAULT_BATCH) -> int:
+        return self._call('retry_failed', batch=batch)
+
+    def stats(self, batch: str = DEFAULT_BATCH) -> Dict:
+        return self._call('stats', batch=batch)
+
+
+def open_queue(spec: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS, token: Optional[str] = None):
+    """http(s):// 开头时连接队列服务（令牌默认取环境变量 JUEJIN_QUEUE_TOKEN），否则打开 SQLite 文件"""
+    if spec.startswith(('http://', 'https://')):
+        return HTTPWorkQueue(spec, token=token or os.environ.get(QUEUE_TOKEN_ENV))
+    return SQLiteWorkQueue(spec, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+
+
+class QueueRequestHandler(BaseHTTPRequestHandler):
+    """把 POST /<方法名> 转发给 SQLiteWorkQueue"""
+
+    METHODS = ('enqueue', 'lease', 'heartbeat', 'complete', 'fail', 'release', 'retry_failed', 'stats')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        supplied = self.headers.get('Authorization') or ''
+        return hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8'))
+
+    def do_POST(self):
+        method = self.path.strip('/')
+        if not self._authorized():
+            status, data = 401, {'error': '令牌无效'}
+        elif method not in self.METHODS:
+            status, data = 404, {'error': f'未知方法：{method}'}
+        else:
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length) or b'{}')
+                queue = self.server.work_queue
+                if method == 'heartbeat':
+                    lease = params['lease']
+                    result = lease['expires'] if queue.heartbeat(lease) else False
+                else:
+                    result = getattr(queue, method)(**params)
+                status, data = 200, {'result': result}
+            except Exception as e:
+                status, data = 400, {'error': str(e)}
+
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def is_loopback(host: str) -> bool:
+    """监听地址是否只对本机开放"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve_queue(queue: SQLiteWorkQueue, host: str = DEFAULT_QUEUE_HOST, port: int = 8770,
+                token: Optional[str] = None) -> None:
+    """
+    托管队列供其他节点通过 HTTP 访问
+
+    Args:
+        queue: SQLite 队列
+        host: 监听地址，默认只监听本机
+        port: 监听端口
+        token: 共享令牌，请求需带 Authorization: Bearer <令牌>；监听非本机地址时必须提供
+    """
+    if not token and not is_loopback(host):
+        raise ValueError(f"监听 {host} 会对其他主机开放队列，需要提供共享令牌")
+    server = ThreadingHTTPServer((host, port), QueueRequestHandler)
+    server.work_queue = queue
+    server.token = token
+    print(f"🚀 任务队列服务已启动：http://{host}:{server.server_address[1]}（{queue.db_path}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class LeaseKeeper:
+    """后台线程定期为租约心跳，租约丢失时置 lost 标记"""
+
+    def __init__(self, queue, lease: Dict, interval: float):
+        self.queue = queue
+        self.lease = lease
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.lease):
+                    self.lost = True
+                    print(f"⚠️ 任务 {self.lease['id']} 的租约已失效，结果将不会被记录")
+                    return
+            except Exception as e:
+                print(f"⚠️ 任务 {self.lease['id']} 心跳失败：{e}")
+
+
+def run_worker(queue, scraper, batch: str = DEFAULT_BATCH, heartbeat_interval: Optional[float] = None,
+               idle_exit: bool = True, poll_interval: float = 5, stop: Optional[threading.Event] = None,
+               supervisor=None) -> int:
+    """
+    从队列领取任务并抓取，直到队列为空（idle_exit）或收到 stop
+
+    Args:
+        queue: SQLiteWorkQueue 或 HTTPWorkQueue
+        scraper: JuejinScraper（建议 keep_browser=True）
+        batch: 批次
+        heartbeat_interval: 心跳间隔，默认为可见性超时的三分之一
+        idle_exit: 没有可领取任务时退出，否则继续轮询
+        poll_interval: 轮询间隔（秒）
+        stop: 外部停止信号
+        supervisor: 监管该抓取器的 BrowserSupervisor，超时被中断的任务按失败重新入队
+
+    Returns:
+        本节点成功记录完成的任务数
+    """
+    worker_id = default_worker_id()
+    interval = heartbeat_interval or getattr(queue, 'visibility_timeout', DEFAULT_VISIBILITY_TIMEOUT) / 3
+    stop = stop or threading.Event()
+    completed = 0
+
+    while not stop.is_set():
+        leases = queue.lease(worker_id, batch=batch)
+        if not leases:
+            if idle_exit:
+                break
+            stop.wait(poll_interval)
+            continue
+
+        lease = leases[0]
+        print(f"\n📋 [{worker_id}] 领取任务 {lease['id']}（第 {lease['attempts']} 次）：{lease['url']}")
+        duplicates_before = len(scraper.duplicates)
+        with LeaseKeeper(queue, lease, interval):
+            try:
+                if supervisor is not None:
+                    save_path, hung = supervisor.run(lease['url'])
+                else:
+                    save_path, hung = scraper.save_article(lease['url']), False
+                error = None if save_path else ("超时，浏览器已被看门狗重启" if hung else "抓取失败")
+            except Exception as e:
+                save_path, error = None, str(e)
+
+        if save_path:
+            recorded = queue.complete(lease, {'path': save_path, 'worker': worker_id})
+        elif len(scraper.duplicates) > duplicates_before:
+            recorded = queue.complete(lease, {'duplicate_of': scraper.duplicates[-1][1], 'worker': worker_id})
+        else:
+            recorded = queue.fail(lease, error)
+
+        if save_path and recorded:
+            completed += 1
+        elif not recorded:
+            print(f"⚠️ 任务 {lease['id']} 已由其他节点接手，本次结果未记录")
+    return completed
+
+
+def _read_urls(args) -> List[str]:
+    urls = list(args.urls)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多机共享的租约式任务队列")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_PATH,
+                        help=f"队列 SQLite 文件或队列服务地址 http://host:port（默认：{DEFAULT_QUEUE_PATH}）")
+    parser.add_argument('--batch', default=DEFAULT_BATCH, help="任务批次名")
+    parser.add_argument('--visibility-timeout', type=float, default=DEFAULT_VISIBILITY_TIMEOUT, metavar='SECONDS',
+                        help="租约有效期，超时未心跳的任务会被重新领取")
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS, help="最大尝试次数")
+    parser.add_argument('--token', default=os.environ.get(QUEUE_TOKEN_ENV),
+                        help=f"队列服务的共享令牌（默认取环境变量 {QUEUE_TOKEN_ENV}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help="添加任务")
+    enqueue_parser.add_argument('urls', nargs='*', metavar='URL', help="文章URL")
+    enqueue_parser.add_argument('--file', help="从文件读取URL（每行一个）")
+    enqueue_parser.add_argument('--frontier', default=DEFAULT_FRONTIER_PATH, metavar='DB',
+                                help="URL前沿的已见集合，跳过以前入队过的文章")
+    enqueue_parser.add_argument('--no-frontier', action='store_true',
+                                help="只规范化URL，不按已见集合过滤（重新入队已见过的文章）")
+    enqueue_parser.add_argument('--source', default='manual', help="URL来源，决定优先级（manual/feed/sitemap/author/tag）")
+
+    work_parser = subparsers.add_parser('work', help="领取并处理任务")
+    work_parser.add_argument('--browsers', type=int, default=1, help="本节点的浏览器（工作线程）数量")
+    work_parser.add_argument('--tabs', type=int, default=1,
+                             help="每个浏览器的标签页数，大于1时每个标签页一个工作线程、共享浏览器进程")
+    work_parser.add_argument('--forever', action='store_true', help="队列为空时继续等待新任务")
+    work_parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH, default=None, metavar='DB',
+                             help="保存后更新全文索引")
+    work_parser.add_argument('--dedup', nargs='?', const=DEFAULT_DEDUP_PATH, default=None, metavar='DB',
+                             help="跳过与已保存文章近似重复的文章")
+    work_parser.add_argument('--recrawl-db', nargs='?', const=DEFAULT_SCHEDULE_PATH, default=None, metavar='DB',
+                             help="记录统计数据供重抓调度排期")
+    work_parser.add_argument('--comment-state', nargs='?', const=DEFAULT_COMMENT_STATE_PATH, default=None,
+                             metavar='DB', help="增量同步评论，只抓取上次之后的新评论")
+    work_parser.add_argument('--author-cache', nargs='?', const=DEFAULT_AUTHOR_CACHE_PATH, default=None, metavar='DB',
+                             help="补充作者与评论者资料，本节点的工作线程共享该缓存")
+    work_parser.add_argument('--render', choices=['site', 'auto'], default='site',
+                             help="auto：先直接请求页面，正文不完整才启动浏览器（需要评论的掘金文章仍使用浏览器）")
+    work_parser.add_argument('--max-comments', type=int, default=10, metavar='N',
+                             help="最多保存的评论数量（0 表示不抓取评论）")
+    work_parser.add_argument('--render-cache', metavar='DB', default=None,
+                             help=f"auto 模式的探测结果缓存（默认：{DEFAULT_RENDER_CACHE_PATH}）")
+    work_parser.add_argument('--snapshot-dir', metavar='DIR', default=None, help="保存每篇文章的原始快照")
+    work_parser.add_argument('--output-dir', metavar='DIR', default=None,
+                             help="按文章ID分片保存到该目录并维护索引（默认保存到主目录）")
+    work_parser.add_argument('--export-dir', metavar='DIR', default=None,
+                             help="按批导出文章统计、评论与回复为列式文件")
+    work_parser.add_argument('--browser-profile', metavar='DIR', default=None, help="持久化浏览器配置目录")
+    work_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB, metavar='MB',
+                             help="持久化配置的磁盘缓存预算")
+    work_parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES, metavar='N',
+                             help="同一浏览器处理 N 篇后重启（0 关闭）")
+    work_parser.add_argument('--max-rss', type=float, default=DEFAULT_MAX_RSS_MB, metavar='MB',
+                             help="浏览器进程树内存超过该值时重启（0 关闭）")
+    work_parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE, metavar='SECONDS',
+                             help="单篇文章超过该时长强制重启浏览器，任务重新入队（0 关闭）")
+
+    subparsers.add_parser('stats', help="查看任务状态")
+    subparsers.add_parser('retry-failed', help="失败任务重新入队")
+
+    serve_parser = subparsers.add_parser('serve', help="通过 HTTP 托管 SQLite 队列")
+    serve_parser.add_argument('--host', default=DEFAULT_QUEUE_HOST,
+                              help="监听地址（默认只监听本机；对其他主机开放时必须提供令牌）")
+    serve_parser.add_argument('--port', type=int, default=8770, help="监听端口")
+
+    args = parser.parse_args()
+    if args.command == 'serve' and not args.token and not is_loopback(args.host):
+        parser.error(f"--host {args.host} 会对其他主机开放队列，需要同时指定 --token 或设置 {QUEUE_TOKEN_ENV}")
+    queue = open_queue(args.queue, args.visibility_timeout, args.max_attempts, token=args.token)
+
+    try:
+        if args.command == 'enqueue':
+            from .frontier import Frontier
+
+            urls = _read_urls(args)
+            frontier = Frontier(None if args.no_frontier else args.frontier)
+            try:
+                items = frontier.admit(urls, source=args.source)
+            finally:
+                frontier.close()
+            print(frontier.summary())
+            print(f"📥 新增 {queue.enqueue(items, batch=args.batch)}/{len(urls)} 个任务")
+        elif args.command == 'stats':
+            stats = queue.stats(batch=args.batch)
+            print(f"📊 批次 {args.batch}：排队 {stats['queued']}，处理中 {stats['leased']}，"
+                  f"租约过期 {stats['expired']}，完成 {stats['done']}，失败 {stats['failed']}")
+            for owner in stats['workers']:
+                print(f"  🖥️ {owner}")
+        elif args.command == 'retry-failed':
+            print(f"🔁 重新入队 {queue.retry_failed(batch=args.batch)} 个失败任务")
+        elif args.command == 'serve':
+            if isinstance(queue, HTTPWorkQueue):
+                parser.error("serve 需要 SQLite 队列文件")
+            serve_queue(queue, host=args.host, port=args.port, token=args.token)
+        else:
+            _work(queue, args)
+    finally:
+        queue.close()
+
+
+def _work(queue, args) -> None:
+    from .scraper import JuejinScraper
+    from .supervisor import BrowserSupervisor
+
+    stop = threading.Event()
+    totals = []
+
+    options = dict(headless=True, max_comments=args.max_comments, index_path=args.index, dedup_path=args.dedup,
+                   snapshot_dir=args.snapshot_dir, keep_browser=True,
+                   browser_profile=args.browser_profile, cache_size_mb=args.cache_size,
+                   output_dir=args.output_dir, export_dir=args.export_dir,
+                   recrawl_db=args.recrawl_db, comment_state=args.comment_state,
+                   render_mode=args.render, render_cache=args.render_cache, author_cache=args.author_cache)
+
+    def work(scraper):
+        supervisor = BrowserSupervisor(scraper, max_pages=args.max_pages or None, max_rss_mb=args.max_rss or None,
+                                       deadline=args.deadline or None)
+        totals.append(run_worker(queue, scraper, batch=args.batch, idle_exit=not args.forever, stop=stop,
+                                 supervisor=supervisor))
+        if scraper.tab_pool is None:
+            # 多标签页模式下回收由共享浏览器的 TabPool 负责，结束后统一汇总
+            print(supervisor.summary())
+        if scraper.probe_cache is not None:
+            print(scraper.probe_cache.summary())
+
+    if args.tabs > 1:
+        from .tab_pool import TabScheduler
+
+        scheduler = TabScheduler(browsers=args.browsers, tabs=args.tabs, max_pages=args.max_pages or None,
+                                 max_rss_mb=args.max_rss or None, **options)
+        runner = threading.Thread(target=scheduler.run, args=(work,), name="tab-scheduler")
+        threads = [runner]
+    else:
+        def worker():
+            scraper = JuejinScraper(**options)
+            try:
+                work(scraper)
+            finally:
+                scraper.finish()
+
+        threads = [threading.Thread(target=worker, name=f"worker-{i}") for i in range(args.browsers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        print("🛑 收到中断，处理完当前任务后退出...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+    print(f"\n🎉 本节点完成 {sum(totals)} 篇文章")
+    if args.tabs > 1:
+        stats = scheduler.stats()
+        print(f"🩺 浏览器回收：按页数 {stats.get('recycled_pages', 0)} 次，按内存 {stats.get('recycled_rss', 0)} 次，"
+              f"看门狗重启 {stats.get('killed', 0)} 次，浏览器内存峰值 {scheduler.peak_rss_mb():.0f} MB")
+    if args.author_cache:
+        from .authors import shared_enricher
+        print(shared_enricher(args.author_cache).summary())
+
+
+if __name__ == "__main__":
+    main()
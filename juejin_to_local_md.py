@@ -1,18 +1,19 @@
-import requests
-from bs4 import BeautifulSoup
-import html_to_markdown
+from __future__ import annotations
+
 import sys
 import re
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Dict, Tuple
+
+# selenium / bs4 / html_to_markdown 在用到时才导入，打印用法时不必等待加载
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 def get_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     options = webdriver.ChromeOptions()
     options.add_argument('--headless')
     options.add_argument('--no-sandbox')
@@ -23,6 +24,10 @@ def get_driver():
 
 def extract_author_info(driver: webdriver.Chrome) -> Tuple[str, str]:
     """提取作者信息"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     print("提取作者信息...")
     try:
         # Wait for the author info block to be present
@@ -48,6 +53,8 @@ def extract_author_info(driver: webdriver.Chrome) -> Tuple[str, str]:
 
 def extract_article_stats(driver: webdriver.Chrome) -> Dict[str, int]:
     """提取文章统计数据（点赞、评论、收藏）"""
+    from selenium.webdriver.common.by import By
+
     print("提取文章统计数据...")
     stats = {'likes': 0, 'comments': 0, 'collects': 0}
     try:
@@ -74,6 +81,8 @@ def extract_article_stats(driver: webdriver.Chrome) -> Dict[str, int]:
 
 def extract_additional_metadata(driver: webdriver.Chrome) -> Dict[str, str]:
     """提取额外的元数据"""
+    from selenium.webdriver.common.by import By
+
     metadata = {}
     print("提取额外元数据...")
     try:
@@ -92,6 +101,12 @@ def extract_additional_metadata(driver: webdriver.Chrome) -> Dict[str, str]:
     return metadata
 
 def save_juejin_article_as_md(url, driver):
+    from bs4 import BeautifulSoup
+    import html_to_markdown
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     try:
         driver.get(url)
         WebDriverWait(driver, 10).until(